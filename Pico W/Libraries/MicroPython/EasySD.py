@@ -4,6 +4,50 @@ import uos
 import errno
 
 
+def path_exists(path: str) -> bool:
+    """Return True if a file or directory exists."""
+    try:
+        uos.stat(path)
+        return True
+    except OSError:
+        return False
+
+
+def replace_file(path: str):
+    """
+    Replace a file with its completely written "<path>.tmp" version.
+
+    The old version is kept as "<path>.bak" until the new one is in place, so
+    a power cut at any point leaves a state that recover_file() resolves.
+    """
+    if path_exists(path):
+        uos.rename(path, path + ".bak")
+        uos.rename(path + ".tmp", path)
+        uos.remove(path + ".bak")
+    else:
+        uos.rename(path + ".tmp", path)
+
+
+def recover_file(path: str):
+    """
+    Finish or roll back a replace_file() that was interrupted (call at boot).
+
+    :param path: Full path of the file (e.g., "/sd/weather.json").
+    """
+    if path_exists(path + ".bak"):
+        if not path_exists(path):
+            # Interrupted between the renames: the new version is complete
+            if path_exists(path + ".tmp"):
+                uos.rename(path + ".tmp", path)
+            else:
+                uos.rename(path + ".bak", path)
+                return
+        uos.remove(path + ".bak")
+    elif path_exists(path + ".tmp"):
+        # Interrupted while writing the new version: keep the old one
+        uos.remove(path + ".tmp")
+
+
 class EasySD:
     def __init__(
         self,
@@ -20,6 +64,8 @@ class EasySD:
         self.sd = SDCard(self.spi, self.cs)
         self.auto_mount = auto_mount
         self.is_mounted = self.mount() if auto_mount else False
+        self.write_count = 0  # Files written by write() since boot
+        self.bytes_written = 0
 
     def os_error(self, err: OSError) -> str:
         """Return a human-readable error message based on the OSError code."""
@@ -73,13 +119,24 @@ class EasySD:
         return None
 
     def write(self, file_path: str, data: str) -> bool:
-        """Write data to a file. If the file does not exist, it will be created."""
+        """
+        Write data to a file. If the file does not exist, it will be created.
+
+        The data goes to "<file_path>.tmp" first and only replaces the file
+        once it is complete, so a power cut leaves the old or the new version,
+        never a partial one (call recover() at boot to finish the swap).
+        """
         if not self.is_mounted and self.auto_mount:
             if not self.mount():
                 return False
         try:
-            with open(f"/sd/{file_path}", "w") as f:
+            path = f"/sd/{file_path}"
+            recover_file(path)
+            with open(path + ".tmp", "w") as f:
                 f.write(data)
+            replace_file(path)
+            self.write_count += 1
+            self.bytes_written += len(data)
             if self.auto_mount:
                 self.unmount()
             return True
@@ -91,6 +148,23 @@ class EasySD:
             self.unmount()
         return False
 
+    def recover(self, file_path: str) -> bool:
+        """Finish or roll back an interrupted write() of a file (call at boot)."""
+        if not self.is_mounted and self.auto_mount:
+            if not self.mount():
+                return False
+        try:
+            recover_file(f"/sd/{file_path}")
+            return True
+        except OSError as e:
+            print(f"Error occurred while recovering: {self.os_error(e)}")
+        except Exception as e:
+            print(f"Error occurred while recovering: {e}")
+        finally:
+            if self.auto_mount:
+                self.unmount()
+        return False
+
     def read(self, file_path: str) -> str:
         """Read data from a file."""
         returned_data = ""
@@ -4,6 +4,1231 @@ import socket
 import time
 import json
 import errno
+import io
+import os
+import gc
+import _thread
+import select
+import hashlib
+import binascii
+from array import array
+
+try:
+    import deflate  # MicroPython 1.21+
+except ImportError:
+    deflate = None
+
+try:
+    from time import ticks_ms, ticks_add, ticks_diff
+except ImportError:  # CPython, used for testing and benchmarks
+
+    def ticks_ms():
+        return int(time.time() * 1000)
+
+    def ticks_add(ticks, delta):
+        return ticks + delta
+
+    def ticks_diff(end, start):
+        return end - start
+
+
+# Content types for static files, by extension
+MIME_TYPES = {
+    "html": "text/html",
+    "htm": "text/html",
+    "css": "text/css",
+    "js": "application/javascript",
+    "json": "application/json",
+    "txt": "text/plain",
+    "svg": "image/svg+xml",
+    "png": "image/png",
+    "jpg": "image/jpeg",
+    "jpeg": "image/jpeg",
+    "gif": "image/gif",
+    "ico": "image/x-icon",
+    "wav": "audio/wav",
+}
+
+# Content types worth compressing (prefix match)
+COMPRESSIBLE_TYPES = (
+    "text/",
+    "application/json",
+    "application/javascript",
+    "application/x-ndjson",
+    "image/svg+xml",
+)
+
+if hasattr(bytearray, "find"):
+
+    def find_bytes(buffer, pattern, start, end):
+        """Find pattern in buffer[start:end] without copying the buffer."""
+        return buffer.find(pattern, start, end)
+
+else:
+
+    def find_bytes(buffer, pattern, start, end):
+        """Find pattern in buffer[start:end] without copying the buffer."""
+        first = pattern[0]
+        size = len(pattern)
+        for index in range(start, end - size + 1):
+            if buffer[index] != first:
+                continue
+            for offset in range(1, size):
+                if buffer[index + offset] != pattern[offset]:
+                    break
+            else:
+                return index
+        return -1
+
+
+# Appended to Sec-WebSocket-Key to compute Sec-WebSocket-Accept (RFC 6455)
+WEBSOCKET_GUID = b"258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+
+# Methods whose request body is parsed and passed to the handler
+BODY_METHODS = ("POST", "PUT", "PATCH")
+
+# Response bodies that are complete when the handler returns (everything else is streamed)
+EAGER_TYPES = (str, bytes, bytearray, memoryview, dict, list)
+
+# Latency histogram bucket upper bounds in milliseconds
+LATENCY_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500)
+
+# Status codes counted individually by the metrics; the rest count as "other"
+METRIC_STATUS_CODES = (
+    200,
+    201,
+    204,
+    301,
+    302,
+    304,
+    400,
+    404,
+    405,
+    408,
+    413,
+    429,
+    431,
+    500,
+    503,
+)
+
+
+# Status lines sent by the server; their full lines and error pages are pre-encoded
+COMMON_STATUSES = (
+    "200 OK",
+    "201 Created",
+    "204 No Content",
+    "301 Moved Permanently",
+    "302 Found",
+    "304 Not Modified",
+    "400 Bad Request",
+    "404 Not Found",
+    "405 Method Not Allowed",
+    "408 Request Timeout",
+    "413 Payload Too Large",
+    "426 Upgrade Required",
+    "429 Too Many Requests",
+    "431 Request Header Fields Too Large",
+    "500 Internal Server Error",
+    "503 Service Unavailable",
+)
+
+# Header lines sent by the server, pre-encoded: name -> value -> line
+COMMON_HEADERS = (
+    ("Content-Type", "text/html"),
+    ("Content-Type", "text/plain"),
+    ("Content-Type", "application/json"),
+    ("Content-Type", "text/event-stream"),
+    ("Connection", "close"),
+    ("Connection", "keep-alive"),
+    ("Connection", "Upgrade"),
+    ("Transfer-Encoding", "chunked"),
+    ("Content-Encoding", "gzip"),
+    ("Vary", "Accept-Encoding"),
+    ("Cache-Control", "no-cache"),
+    ("Upgrade", "websocket"),
+)
+
+STATUS_LINES = {}  # "404 Not Found\r\n" -> b"HTTP/1.1 404 Not Found\r\n"
+ERROR_PAGES = {}  # "404 Not Found\r\n" -> b"<h1>404 Not Found</h1>"
+for _status in COMMON_STATUSES:
+    STATUS_LINES[_status + "\r\n"] = f"HTTP/1.1 {_status}\r\n".encode("utf-8")
+    if _status[0] in "45":
+        ERROR_PAGES[_status + "\r\n"] = f"<h1>{_status}</h1>".encode("utf-8")
+
+HEADER_LINES = {}
+for _name, _value in COMMON_HEADERS:
+    if _name not in HEADER_LINES:
+        HEADER_LINES[_name] = {}
+    HEADER_LINES[_name][_value] = f"{_name}: {_value}\r\n".encode("utf-8")
+
+# Request header lookup patterns, built on first use: "Content-Length" -> b"\r\ncontent-length:"
+HEADER_PATTERNS = {}
+
+# Reasons counted by EasyServer.rejected
+REJECT_REASONS = ("rate_limited", "timeout", "too_large", "malformed", "capacity")
+
+
+def recv_exactly(sock, view):
+    """
+    Receive len(view) bytes from a blocking socket directly into a memoryview.
+
+    MicroPython sockets have readinto(), which never returns short reads, but
+    no recv_into(); CPython sockets only have recv_into(). recv() plus a copy
+    is the last resort.
+
+    :param sock: Blocking socket (or one with a timeout).
+    :param view: Writable memoryview to fill.
+    :return: Number of bytes received, less than len(view) only if the peer closed.
+    """
+    if hasattr(sock, "readinto"):
+        return sock.readinto(view) or 0
+    size = len(view)
+    position = 0
+    while position < size:
+        if hasattr(sock, "recv_into"):
+            count = sock.recv_into(view[position:])
+        else:
+            data = sock.recv(size - position)
+            count = len(data)
+            view[position : position + count] = data
+        if not count:
+            break
+        position += count
+    return position
+
+
+def is_timeout(error):
+    """Return True if an OSError is a socket timeout (MicroPython or CPython)."""
+    return bool(error.args) and error.args[0] in (errno.ETIMEDOUT, "timed out")
+
+
+def url_decode(text):
+    """Decode a URL-encoded value ("+" and %XX escapes)."""
+    text = text.replace("+", " ")
+    if "%" not in text:
+        return text
+    parts = text.split("%")
+    decoded = bytearray(parts[0].encode("utf-8"))
+    for part in parts[1:]:
+        try:
+            decoded.append(int(part[:2], 16))
+            part = part[2:]
+        except ValueError:
+            decoded.append(37)  # Not an escape; keep the "%"
+        decoded.extend(part.encode("utf-8"))
+    return decoded.decode("utf-8")
+
+
+def parse_pairs(text):
+    """Parse "key=value&..." pairs (a query string or form body) into a dictionary."""
+    pairs = {}
+    for pair in text.split("&"):
+        if "=" in pair:
+            key, value = pair.split("=", 1)
+            pairs[url_decode(key)] = url_decode(value)
+    return pairs
+
+
+def chain_chunks(chunks, iterator):
+    """Yield already collected chunks, then the rest of an iterator."""
+    for chunk in chunks:
+        yield chunk
+    for chunk in iterator:
+        yield chunk
+
+
+class ChunkWriter(io.IOBase):
+    """
+    Stream-like writer that frames everything written to it as HTTP chunks.
+
+    Data is coalesced in the server's fixed write buffer, so it can be handed to
+    functions that write to a stream, such as json.dump(). Call finish() to send
+    the rest of the buffer and the terminating chunk.
+    """
+
+    def __init__(self, server):
+        self.server = server
+        self.view = server.write_view
+        self.position = 0
+
+    def write(self, data):
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+        end = self.position + len(data)
+        if end < len(self.view):
+            # Fits without filling the buffer: the common case for template chunks
+            self.view[self.position : end] = data
+            self.position = end
+            return len(data)
+        data = memoryview(data)
+        view = self.view
+        size = len(view)
+        offset = 0
+        remaining = len(data)
+        while remaining:
+            count = min(size - self.position, remaining)
+            view[self.position : self.position + count] = data[offset : offset + count]
+            self.position += count
+            offset += count
+            remaining -= count
+            if self.position == size:
+                self.server.send_chunk(view, size)
+                self.position = 0
+        return len(data)
+
+    def finish(self):
+        """Send the buffered data and the terminating zero-length chunk."""
+        if self.position:
+            self.server.send_chunk(self.view, self.position)
+            self.position = 0
+        self.server.sendall(b"0\r\n\r\n")
+
+
+class BodyStream:
+    """
+    Streaming reader for the body of a request on a streaming route.
+
+    Bytes that arrived together with the header block are returned first, the
+    rest is received from the client socket on demand, so a body of any size
+    can be consumed through a small fixed buffer with readinto().
+    """
+
+    def __init__(self, server, request, content_length):
+        self.server = server
+        self.request = request
+        self.content_length = content_length
+        self.received = 0
+        self.socket_bytes = 0  # Received from the socket, counted by finish_request()
+        self.progress = None  # Optional callback(received, content_length)
+
+    def readinto(self, buffer):
+        """
+        Read the next part of the body into a buffer.
+
+        :param buffer: Writable buffer (bytearray or memoryview).
+        :return: Number of bytes read, 0 at the end of the body.
+        """
+        remaining = self.content_length - self.received
+        if remaining <= 0:
+            return 0
+        view = memoryview(buffer)
+        if len(view) > remaining:
+            view = view[:remaining]
+
+        # Bytes received together with the headers come first
+        buffered = self.request.body
+        if self.received < len(buffered):
+            count = min(len(buffered) - self.received, len(view))
+            view[:count] = buffered[self.received : self.received + count]
+        else:
+            # The body holds at least len(view) more bytes, so fill the view
+            count = recv_exactly(self.request.client, view)
+            if not count:
+                raise OSError("Client disconnected during the request body")
+            self.socket_bytes += count
+
+        self.received += count
+        if self.progress:
+            self.progress(self.received, self.content_length)
+        return count
+
+
+class MultipartReader:
+    """
+    Incremental multipart/form-data parser over a BodyStream.
+
+    Call next_part() to move to the next part and readinto() to read its data.
+    The body is scanned for the boundary in a fixed buffer, so a part of any
+    size is parsed with the same memory.
+    """
+
+    def __init__(self, stream, boundary, buffer_size=1024):
+        """
+        :param stream: Object with readinto(), e.g., request.stream.
+        :param boundary: Boundary from the Content-Type header (str).
+        :param buffer_size: Size of the scan buffer; also the limit for part headers.
+        """
+        self.stream = stream
+        self.delimiter = b"\r\n--" + boundary.encode("utf-8")
+        if buffer_size < 2 * len(self.delimiter) + 4:
+            buffer_size = 2 * len(self.delimiter) + 4
+        self.buffer = bytearray(buffer_size)
+        self.view = memoryview(self.buffer)
+        # Start with a virtual CRLF so the first boundary matches the delimiter
+        self.buffer[0:2] = b"\r\n"
+        self.start = 0
+        self.end = 2
+        self.in_part = False
+        self.finished = False
+
+    def fill(self):
+        """Move unread bytes to the front of the buffer and receive more."""
+        pending = self.end - self.start
+        if self.start:
+            self.view[:pending] = self.view[self.start : self.end]
+            self.start = 0
+            self.end = pending
+        if self.end == len(self.buffer):
+            return 0
+        count = self.stream.readinto(self.view[self.end :])
+        self.end += count
+        return count
+
+    def next_part(self):
+        """
+        Skip the rest of the current part and parse the headers of the next one.
+
+        :return: Dictionary with "name", "filename" (None for form fields) and
+                 "content_type", or None after the last part.
+        """
+        if self.finished:
+            return None
+        while self.in_part:
+            self.read(None)
+
+        # After the delimiter: "--" ends the body, CRLF starts the part headers
+        while self.end - self.start < 4:
+            if not self.fill():
+                raise ValueError("Truncated multipart body")
+        if self.buffer[self.start] == 45 and self.buffer[self.start + 1] == 45:
+            self.finished = True
+            return None
+
+        header_end = find_bytes(self.buffer, b"\r\n\r\n", self.start, self.end)
+        while header_end == -1:
+            if not self.fill():
+                raise ValueError("Multipart part headers too large or truncated")
+            header_end = find_bytes(self.buffer, b"\r\n\r\n", self.start, self.end)
+
+        part = {"name": None, "filename": None, "content_type": "text/plain"}
+        headers = bytes(self.view[self.start + 2 : header_end]).decode("utf-8")
+        for line in headers.split("\r\n"):
+            if ":" not in line:
+                continue
+            name, value = line.split(":", 1)
+            name = name.strip().lower()
+            if name == "content-type":
+                part["content_type"] = value.strip()
+            elif name == "content-disposition":
+                for parameter in value.split(";")[1:]:
+                    if "=" in parameter:
+                        key, parameter_value = parameter.split("=", 1)
+                        key = key.strip()
+                        if key in ("name", "filename"):
+                            part[key] = parameter_value.strip().strip('"')
+
+        self.start = header_end + 4
+        self.in_part = True
+        return part
+
+    def readinto(self, buffer):
+        """
+        Read data of the current part into a buffer.
+
+        :param buffer: Writable buffer (bytearray or memoryview).
+        :return: Number of bytes read, 0 at the end of the part.
+        """
+        return self.read(memoryview(buffer))
+
+    def read(self, view):
+        """Copy part data into `view`, or discard it when `view` is None."""
+        if not self.in_part:
+            return 0
+        delimiter = self.delimiter
+        while True:
+            index = find_bytes(self.buffer, delimiter, self.start, self.end)
+            if index == self.start:
+                # End of the part; leave the bytes after the delimiter unread
+                self.start += len(delimiter)
+                self.in_part = False
+                return 0
+            if index != -1:
+                available = index - self.start
+            else:
+                # Keep enough bytes to recognize a delimiter split across reads
+                available = self.end - self.start - len(delimiter) + 1
+            if available > 0:
+                if view is not None:
+                    available = min(available, len(view))
+                    view[:available] = self.view[self.start : self.start + available]
+                self.start += available
+                return available
+            if not self.fill():
+                raise ValueError("Truncated multipart body")
+
+
+class EventStream:
+    """
+    The subscribers of a Server-Sent Events endpoint.
+
+    Subscriber sockets are non-blocking. A message that a subscriber cannot
+    take right away is kept as its backlog and sent with the next message;
+    subscribers whose backlog grows past max_backlog are evicted, so one slow
+    client cannot stall the server.
+    """
+
+    def __init__(self, server, max_subscribers=4, max_backlog=1024):
+        self.server = server
+        self.max_subscribers = max_subscribers
+        self.max_backlog = max_backlog
+        self.subscribers = []  # [client socket, unsent bytes]
+        self.evicted = 0
+        self.lock = _thread.allocate_lock()
+
+    def subscribe(self, client) -> bool:
+        """
+        Add a client whose event-stream headers have been sent.
+
+        :return: False if the subscriber cap is reached.
+        """
+        with self.lock:
+            if len(self.subscribers) >= self.max_subscribers:
+                return False
+            client.setblocking(False)
+            self.subscribers.append([client, b""])
+            return True
+
+    def broadcast(self, message):
+        """
+        Send an encoded message to every subscriber.
+
+        :param message: Encoded event (bytes).
+        :return: Number of subscribers still connected.
+        """
+        with self.lock:
+            for subscriber in self.subscribers[:]:
+                data = subscriber[1] + message if subscriber[1] else message
+                try:
+                    sent = subscriber[0].send(data) or 0
+                except OSError as e:
+                    if not e.args or e.args[0] != errno.EAGAIN:
+                        self.remove(subscriber)  # Disconnected
+                        continue
+                    sent = 0
+                if self.server.metrics is not None:
+                    self.server.metrics.bytes_out += sent
+                if len(data) - sent > self.max_backlog:
+                    self.evicted += 1
+                    self.remove(subscriber)  # Slow consumer
+                else:
+                    subscriber[1] = data[sent:]
+            return len(self.subscribers)
+
+    def remove(self, subscriber):
+        """Close a subscriber and drop it from the list (call with the lock held)."""
+        self.subscribers.remove(subscriber)
+        try:
+            subscriber[0].close()
+        except OSError:
+            pass
+        if self.server.metrics is not None:
+            self.server.metrics.open_connections -= 1
+
+    def close(self):
+        """Disconnect every subscriber."""
+        with self.lock:
+            while self.subscribers:
+                self.remove(self.subscribers[0])
+
+
+class WebSocket:
+    """
+    An open RFC 6455 WebSocket connection.
+
+    Frames are received into buffers preallocated for the connection and
+    client payloads are unmasked in place. Outgoing frames are assembled in a
+    preallocated send buffer and sent with a single sendall(), so a message
+    costs no allocations beyond decoding text.
+    """
+
+    def __init__(self, server, client, path, handler, max_message_size):
+        self.server = server
+        self.client = client
+        self.path = path
+        self.handler = handler
+        self.buffer = bytearray(max_message_size)  # Data message payload
+        self.view = memoryview(self.buffer)
+        self.control = bytearray(125)  # Control frame payload (ping/pong/close)
+        self.control_view = memoryview(self.control)
+        self.header = bytearray(8)  # Extended payload length
+        self.header_view = memoryview(self.header)
+        self.mask = bytearray(4)
+        self.mask_view = memoryview(self.mask)
+        self.send_buffer = bytearray(max_message_size + 10)
+        self.send_view = memoryview(self.send_buffer)
+        self.fragment_opcode = 0  # Opcode of a fragmented message being received
+        self.fragment_length = 0
+        self.open = True
+
+    def recv_exact(self, view):
+        """Receive exactly len(view) bytes into a memoryview."""
+        size = len(view)
+        if recv_exactly(self.client, view) < size:
+            raise OSError("WebSocket closed by the client")
+        if self.server.metrics is not None:
+            self.server.metrics.bytes_in += size
+
+    def receive(self):
+        """
+        Receive one frame and handle it. Called when the socket is readable.
+        """
+        header = self.header_view
+        self.recv_exact(header[:2])
+        final = self.header[0] & 0x80
+        opcode = self.header[0] & 0x0F
+        masked = self.header[1] & 0x80
+        length = self.header[1] & 0x7F
+        if length == 126:
+            self.recv_exact(header[:2])
+            length = self.header[0] << 8 | self.header[1]
+        elif length == 127:
+            self.recv_exact(header[:8])
+            length = int.from_bytes(bytes(header[:8]), "big")
+        if not masked:
+            self.close(1002)  # Client frames must be masked
+            return
+
+        if opcode & 0x08:
+            # Control frame: ping, pong or close
+            if length > 125:
+                self.close(1002)
+                return
+            payload = self.control_view
+            start = 0
+        else:
+            start = self.fragment_length if opcode == 0 else 0
+            if start + length > len(self.buffer):
+                self.close(1009)  # Message too big
+                return
+            payload = self.view
+
+        self.recv_exact(self.mask_view)
+        data = payload[start : start + length]
+        self.recv_exact(data)
+        # Unmask in place
+        mask = self.mask
+        for i in range(length):
+            data[i] ^= mask[i & 3]
+
+        if opcode == 0x9:  # Ping
+            self.send_frame(0xA, data)
+        elif opcode == 0x8:  # Close
+            self.close(self.control[0] << 8 | self.control[1] if length >= 2 else 1000)
+        elif opcode == 0xA:  # Pong
+            pass
+        elif not final:
+            # First or middle fragment; wait for the rest of the message
+            if opcode:
+                self.fragment_opcode = opcode
+            self.fragment_length = start + length
+        else:
+            if opcode == 0:
+                opcode = self.fragment_opcode
+            self.fragment_length = 0
+            self.dispatch(opcode, start + length)
+
+    def dispatch(self, opcode, length):
+        """Pass a complete message to the handler and send back what it returns."""
+        if opcode == 0x1:
+            message = str(self.view[:length], "utf-8")
+        else:
+            # Binary messages are a view of the receive buffer, valid during the call
+            message = self.view[:length]
+        reply = self.handler(self, message)
+        if reply is not None:
+            self.send(reply)
+
+    def send(self, data):
+        """
+        Send a message.
+
+        :param data: str (text frame), bytes-like (binary frame) or dict/list (JSON text frame).
+        """
+        if isinstance(data, (dict, list)):
+            data = json.dumps(data)
+        if isinstance(data, str):
+            self.send_frame(0x1, data.encode("utf-8"))
+        else:
+            self.send_frame(0x2, data)
+
+    def ping(self, data=b""):
+        """Send a ping; the client answers with a pong."""
+        self.send_frame(0x9, data)
+
+    def send_frame(self, opcode, payload):
+        """Send a single unmasked frame (server frames are never masked)."""
+        length = len(payload)
+        view = self.send_view
+        view[0] = 0x80 | opcode
+        if length < 126:
+            view[1] = length
+            start = 2
+        elif length < 65536:
+            view[1] = 126
+            view[2] = length >> 8
+            view[3] = length & 0xFF
+            start = 4
+        else:
+            view[1] = 127
+            view[2:10] = length.to_bytes(8, "big")
+            start = 10
+        if start + length <= len(view):
+            view[start : start + length] = payload
+            self.sendall(view[: start + length])
+        else:
+            self.sendall(view[:start])
+            self.sendall(payload)
+
+    def sendall(self, data):
+        self.client.sendall(data)
+        if self.server.metrics is not None:
+            self.server.metrics.bytes_out += len(data)
+
+    def close(self, code=1000):
+        """Send a close frame with a status code and close the connection."""
+        if not self.open:
+            return
+        try:
+            self.control[0] = code >> 8
+            self.control[1] = code & 0xFF
+            self.send_frame(0x8, self.control_view[:2])
+        except OSError:
+            pass
+        self.server.remove_websocket(self)
+
+
+class RateLimiter:
+    """
+    Per-client token buckets for request rate limiting.
+
+    Each client IP gets a bucket of `burst` tokens, refilled at `rate` tokens
+    per second; a request takes one token. Only max_clients addresses are
+    tracked, and the least recently seen one is dropped to make room.
+    """
+
+    def __init__(self, rate, burst, max_clients=16):
+        self.rate = rate / 1000  # Tokens per millisecond
+        self.burst = burst
+        self.max_clients = max_clients
+        self.buckets = {}  # ip -> [tokens, ticks_ms() of the last request]
+        # Seconds until a client that ran out gets a token back
+        self.retry_after = max(1, int(1 / rate + 0.999))
+
+    def allow(self, ip) -> bool:
+        """Take a token for a request from `ip`; return False if none is left."""
+        now = ticks_ms()
+        bucket = self.buckets.get(ip)
+        if bucket is None:
+            if len(self.buckets) >= self.max_clients:
+                oldest_key = oldest = None
+                for key, value in self.buckets.items():
+                    if oldest is None or ticks_diff(value[1], oldest[1]) < 0:
+                        oldest_key, oldest = key, value
+                del self.buckets[oldest_key]
+            bucket = [self.burst, now]
+            self.buckets[ip] = bucket
+        else:
+            bucket[0] = min(
+                self.burst, bucket[0] + ticks_diff(now, bucket[1]) * self.rate
+            )
+            bucket[1] = now
+        if bucket[0] < 1:
+            return False
+        bucket[0] -= 1
+        return True
+
+
+class Queue:
+    """
+    A bounded FIFO queue protected by a lock, used to pass work between cores.
+    """
+
+    def __init__(self, size):
+        self.items = [None] * size
+        self.size = size
+        self.head = 0
+        self.count = 0
+        self.lock = _thread.allocate_lock()
+
+    def put(self, item) -> bool:
+        """Add an item. Returns False if the queue is full."""
+        with self.lock:
+            if self.count == self.size:
+                return False
+            self.items[(self.head + self.count) % self.size] = item
+            self.count += 1
+            return True
+
+    def get(self):
+        """Remove and return the oldest item, or None if the queue is empty."""
+        with self.lock:
+            if not self.count:
+                return None
+            item = self.items[self.head]
+            self.items[self.head] = None
+            self.head = (self.head + 1) % self.size
+            self.count -= 1
+            return item
+
+
+class BodyPipe:
+    """
+    Carries a streamed response body from the handler core to the network core.
+
+    run_dual_core() drains a handler's generator on the handler core with fill(),
+    copying its chunks into buffers taken from a shared pool, while the network
+    core sends the filled buffers by iterating over the pipe. Storage reads stay
+    on the handler core, and the pool bounds the memory in flight: fill() waits
+    for a free buffer until the network core has sent one.
+    """
+
+    def __init__(self, pool, lock):
+        self.pool = pool  # Free (buffer, view) pairs shared by all pipes
+        self.lock = lock  # Guards the pool and the state of every pipe
+        self.ready = []  # Filled (pair, length) items, oldest first
+        self.current = None  # Pair whose view was last handed to the network core
+        self.done = False  # fill() has finished
+        self.closed = False  # The network core stopped reading
+        self.error = None  # Exception raised while draining the source
+
+    def take(self):
+        """Return a free buffer pair, waiting for one, or None once the pipe is closed."""
+        while True:
+            with self.lock:
+                if self.closed:
+                    return None
+                if self.pool:
+                    return self.pool.pop()
+            time.sleep(0)  # Only yield: the network core is sending a buffer
+
+    def push(self, pair, length):
+        """Queue a filled buffer for the network core."""
+        with self.lock:
+            if self.closed:
+                self.pool.append(pair)
+            else:
+                self.ready.append((pair, length))
+
+    def fill(self, source):
+        """
+        Drain a response body into the pipe (handler core).
+
+        :param source: Iterator of str/bytes chunks, or an object with readinto().
+        """
+        pair = None
+        try:
+            if hasattr(source, "readinto"):
+                while True:
+                    pair = self.take()
+                    if pair is None:
+                        break
+                    count = source.readinto(pair[1])
+                    if not count:
+                        break
+                    self.push(pair, count)
+                    pair = None
+                return
+            length = 0
+            for chunk in source:
+                if isinstance(chunk, str):
+                    chunk = chunk.encode("utf-8")
+                data = memoryview(chunk)
+                offset = 0
+                while offset < len(data):
+                    if pair is None:
+                        pair = self.take()
+                        if pair is None:
+                            return
+                        length = 0
+                    view = pair[1]
+                    count = min(len(view) - length, len(data) - offset)
+                    view[length : length + count] = data[offset : offset + count]
+                    length += count
+                    offset += count
+                    if length == len(view):
+                        self.push(pair, length)
+                        pair = None
+            if pair is not None:
+                self.push(pair, length)
+                pair = None
+        except Exception as e:
+            self.error = e
+        finally:
+            if hasattr(source, "close"):
+                source.close()
+            with self.lock:
+                if pair is not None:
+                    self.pool.append(pair)
+                self.done = True
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        """Return the next filled buffer as a memoryview valid until the next call (network core)."""
+        while True:
+            with self.lock:
+                if self.current is not None:
+                    self.pool.append(self.current)
+                    self.current = None
+                item = self.ready.pop(0) if self.ready else None
+                done = self.done
+                if item is not None:
+                    self.current = item[0]
+            if item is not None:
+                return item[0][1][: item[1]]
+            if done:
+                if self.error is not None:
+                    raise self.error
+                raise StopIteration
+            time.sleep(0)  # Only yield: the handler core is filling the next buffer
+
+    def close(self):
+        """Stop reading (network core): release the buffers and let fill() stop."""
+        with self.lock:
+            self.closed = True
+            if self.current is not None:
+                self.pool.append(self.current)
+                self.current = None
+            while self.ready:
+                self.pool.append(self.ready.pop()[0])
+
+
+class FilePipe(BodyPipe):
+    """
+    A BodyPipe for open files, read with readinto() so it is sent like the file itself.
+    """
+
+    def __init__(self, pool, lock):
+        super().__init__(pool, lock)
+        self.chunk = b""
+        self.offset = 0
+
+    def readinto(self, buffer):
+        """
+        Copy the next part of the body into a buffer (network core).
+
+        :param buffer: Writable buffer (bytearray or memoryview).
+        :return: Number of bytes copied, 0 at the end of the body.
+        """
+        while self.offset == len(self.chunk):
+            try:
+                self.chunk = next(self)
+            except StopIteration:
+                return 0
+            self.offset = 0
+        count = min(len(buffer), len(self.chunk) - self.offset)
+        buffer[:count] = self.chunk[self.offset : self.offset + count]
+        self.offset += count
+        return count
+
+
+class Metrics:
+    """
+    Request counters and latency histograms for EasyServer.
+
+    Each route gets one preallocated array row holding its per-status counters,
+    its latency histogram buckets and its latency sum, so recording a request
+    does not allocate. Requests that match no route are counted in the "other" row.
+    """
+
+    def __init__(self):
+        self.status_count = len(METRIC_STATUS_CODES) + 1
+        self.bucket_offset = self.status_count
+        self.sum_index = self.bucket_offset + len(LATENCY_BUCKETS_MS) + 1
+        self.row_names = ["other"]
+        self.row_index = {}  # route path -> row
+        self.rows = [self.new_row()]
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.open_connections = 0
+        self.mem_free = self.mem_free_low = self.read_mem_free()
+
+    def new_row(self):
+        """Allocate the counters of one route."""
+        return array("I", [0] * (self.sum_index + 1))
+
+    def read_mem_free(self):
+        """Return gc.mem_free(), or 0 where it is not available (CPython)."""
+        return gc.mem_free() if hasattr(gc, "mem_free") else 0
+
+    def record(self, route, status_line, elapsed_ms):
+        """
+        Record a finished request.
+
+        :param route: Path of the matched route, or None.
+        :param status_line: Status line that was sent (e.g., "200 OK\\r\\n").
+        :param elapsed_ms: Time from accept to the end of the response in milliseconds.
+        """
+        index = 0
+        if route is not None:
+            index = self.row_index.get(route, 0)
+            if not index:
+                index = len(self.rows)
+                self.row_index[route] = index
+                self.row_names.append(route)
+                self.rows.append(self.new_row())
+        row = self.rows[index]
+
+        try:
+            row[METRIC_STATUS_CODES.index(int(status_line[:3]))] += 1
+        except ValueError:
+            row[self.status_count - 1] += 1
+
+        bucket = 0
+        for bound in LATENCY_BUCKETS_MS:
+            if elapsed_ms <= bound:
+                break
+            bucket += 1
+        row[self.bucket_offset + bucket] += 1
+        row[self.sum_index] += elapsed_ms
+
+        self.mem_free = self.read_mem_free()
+        if self.mem_free < self.mem_free_low:
+            self.mem_free_low = self.mem_free
+
+    def render(self, rejected):
+        """
+        Yield the metrics in the Prometheus text exposition format.
+
+        :param rejected: EasyServer.rejected counters.
+        """
+        yield "# TYPE easyserver_requests_total counter\n"
+        for name, row in zip(self.row_names, self.rows):
+            for index in range(self.status_count):
+                if row[index]:
+                    status = (
+                        METRIC_STATUS_CODES[index]
+                        if index < len(METRIC_STATUS_CODES)
+                        else "other"
+                    )
+                    yield f'easyserver_requests_total{{route="{name}",status="{status}"}} {row[index]}\n'
+
+        yield "# TYPE easyserver_request_duration_ms histogram\n"
+        for name, row in zip(self.row_names, self.rows):
+            total = 0
+            for index, bound in enumerate(LATENCY_BUCKETS_MS):
+                total += row[self.bucket_offset + index]
+                yield f'easyserver_request_duration_ms_bucket{{route="{name}",le="{bound}"}} {total}\n'
+            total += row[self.bucket_offset + len(LATENCY_BUCKETS_MS)]
+            yield f'easyserver_request_duration_ms_bucket{{route="{name}",le="+Inf"}} {total}\n'
+            yield f'easyserver_request_duration_ms_sum{{route="{name}"}} {row[self.sum_index]}\n'
+            yield f'easyserver_request_duration_ms_count{{route="{name}"}} {total}\n'
+
+        yield "# TYPE easyserver_rejected_connections_total counter\n"
+        for reason in REJECT_REASONS:
+            yield f'easyserver_rejected_connections_total{{reason="{reason}"}} {rejected[reason]}\n'
+
+        yield "# TYPE easyserver_received_bytes_total counter\n"
+        yield f"easyserver_received_bytes_total {self.bytes_in}\n"
+        yield "# TYPE easyserver_sent_bytes_total counter\n"
+        yield f"easyserver_sent_bytes_total {self.bytes_out}\n"
+        yield "# TYPE easyserver_open_connections gauge\n"
+        yield f"easyserver_open_connections {self.open_connections}\n"
+        yield "# TYPE easyserver_mem_free_bytes gauge\n"
+        yield f"easyserver_mem_free_bytes {self.mem_free}\n"
+        yield "# TYPE easyserver_mem_free_low_watermark_bytes gauge\n"
+        yield f"easyserver_mem_free_low_watermark_bytes {self.mem_free_low}\n"
+
+
+class AccessLog:
+    """
+    Fixed-size in-RAM ring of access log entries with batched flushes.
+
+    Each finished request is stored in preallocated arrays (ticks, status,
+    latency, bytes) plus references to its method and path strings, so logging
+    does not format anything or touch storage. Entries are appended to a file
+    in batches, when `high_water` unflushed entries have piled up or
+    `flush_interval_ms` has passed since the last flush. The server checks
+    after every request and, while idle, at least once per interval.
+    """
+
+    def __init__(
+        self,
+        size=64,
+        file_path=None,
+        flush_interval_ms=60000,
+        high_water=None,
+        max_file_size=16384,
+    ):
+        """
+        :param size: Number of entries kept in RAM.
+        :param file_path: File the entries are appended to (e.g., "/access.log" or
+                          "/sd/access.log"), or None to keep them in RAM only.
+        :param flush_interval_ms: Longest time an entry waits before it is flushed.
+        :param high_water: Unflushed entries that trigger a flush (default: 3/4 of size).
+        :param max_file_size: Size at which the file is moved to file_path + ".1".
+        """
+        self.size = size
+        self.ticks = array("L", [0] * size)
+        self.status = array("H", [0] * size)
+        self.latency = array("I", [0] * size)
+        self.sent = array("I", [0] * size)
+        self.methods = [None] * size
+        self.paths = [None] * size
+        self.head = 0  # Index the next entry is written to
+        self.count = 0
+        self.unflushed = 0
+        self.dropped = 0  # Entries overwritten before they were flushed
+        self.file_path = file_path
+        self.flush_interval_ms = flush_interval_ms
+        self.high_water = high_water or max(1, size * 3 // 4)
+        self.max_file_size = max_file_size
+        self.last_flush = ticks_ms()
+
+    def record(self, method, path, status, latency_ms, sent):
+        """
+        Store one finished request, overwriting the oldest entry when full.
+
+        :param method: Request method.
+        :param path: Request path.
+        :param status: Status code that was sent.
+        :param latency_ms: Time from accept to the end of the response in milliseconds.
+        :param sent: Bytes sent to the client.
+        """
+        index = self.head
+        self.ticks[index] = ticks_ms()
+        self.status[index] = status
+        self.latency[index] = latency_ms
+        self.sent[index] = sent
+        self.methods[index] = method
+        self.paths[index] = path
+        self.head = (index + 1) % self.size
+        if self.count < self.size:
+            self.count += 1
+        if self.file_path is not None:
+            if self.unflushed == self.size:
+                self.dropped += 1
+            else:
+                self.unflushed += 1
+
+    def maybe_flush(self):
+        """Flush if the high-water mark or the flush interval has been reached."""
+        if self.unflushed and (
+            self.unflushed >= self.high_water
+            or ticks_diff(ticks_ms(), self.last_flush) >= self.flush_interval_ms
+        ):
+            self.flush()
+
+    def flush(self):
+        """Append the unflushed entries to the log file, oldest first."""
+        self.last_flush = ticks_ms()
+        if not self.unflushed:
+            return
+        try:
+            try:
+                if os.stat(self.file_path)[6] >= self.max_file_size:
+                    backup = self.file_path + ".1"
+                    try:
+                        os.remove(backup)
+                    except OSError:
+                        pass
+                    os.rename(self.file_path, backup)
+            except OSError:
+                pass  # No log file yet
+            with open(self.file_path, "a") as f:
+                index = (self.head - self.unflushed) % self.size
+                for _ in range(self.unflushed):
+                    f.write(self.format(index))
+                    index = (index + 1) % self.size
+            self.unflushed = 0
+        except OSError as e:
+            print(f"Error flushing access log: {e}")
+
+    def format(self, index):
+        """Return one entry as a log line."""
+        return (
+            f"{self.ticks[index]} {self.methods[index]} {self.paths[index]} "
+            f"{self.status[index]} {self.latency[index]}ms {self.sent[index]}\n"
+        )
+
+    def entries(self):
+        """Yield the entries in RAM as dictionaries, newest first."""
+        index = self.head
+        for _ in range(self.count):
+            index = (index - 1) % self.size
+            yield {
+                "ticks": self.ticks[index],
+                "method": self.methods[index],
+                "path": self.paths[index],
+                "status": self.status[index],
+                "latency_ms": self.latency[index],
+                "bytes": self.sent[index],
+            }
+
+
+class Request:
+    """
+    A parsed HTTP request backed by the server's preallocated receive buffer.
+
+    Only the request line is decoded when the request is read. Header values
+    are decoded on demand by header(), and the body is a memoryview into the
+    receive buffer, so it is only valid until the next request is read.
+    """
+
+    def __init__(self, buffer, headers_start, header_end, request_line, addr):
+        self.buffer = buffer
+        self.headers_start = headers_start
+        self.header_end = header_end
+        self.request_line = request_line
+        self.addr = addr
+        self.client = None  # Client socket, set when the request is queued
+        self.buffers = None  # (buffer, view) pair, set when the request is queued
+        self.started = 0  # ticks_ms() when the client was accepted, set when queued
+        self.method = None
+        self.path = None
+        self.query = ""
+        self.protocol = None
+        self.body = b""
+        self.stream = None  # BodyStream, set for streaming routes
+        self.cache_generation = None  # Of the route's cache key when its handler ran
+        self.lowered = None  # Lowercased copy of the header block, made by header()
+
+    def move_to(self, buffer, view):
+        """
+        Copy the request into another receive buffer of the same size.
+
+        :param buffer: Destination buffer.
+        :param view: Memoryview of the destination buffer.
+        """
+        body_start = self.header_end + 4
+        end = body_start + len(self.body)
+        view[:end] = memoryview(self.buffer)[:end]
+        self.buffer = buffer
+        self.body = view[body_start:end]
+
+    def params(self):
+        """Return the query string parameters as a dictionary."""
+        return parse_pairs(self.query) if self.query else {}
+
+    def header(self, name, default=None):
+        """
+        Return the value of a request header, decoding only that header.
+
+        The first lookup copies the header block once, lowercased, so every
+        lookup is a single find() on the copy rather than a scan in Python.
+
+        :param name: Header name (case-insensitive).
+        :param default: Value returned when the header is missing.
+        """
+        pattern = HEADER_PATTERNS.get(name)
+        if pattern is None:
+            pattern = b"\r\n" + name.lower().encode("utf-8") + b":"
+            HEADER_PATTERNS[name] = pattern
+        # The copy starts at the CRLF ending the request line and ends after the last header
+        offset = self.headers_start - 2
+        lowered = self.lowered
+        if lowered is None:
+            block = memoryview(self.buffer)[offset : self.header_end + 2]
+            lowered = self.lowered = bytes(block).lower()
+        index = lowered.find(pattern)
+        if index == -1:
+            return default
+        value_start = index + len(pattern)
+        value_end = lowered.find(b"\r\n", value_start)
+        value = memoryview(self.buffer)[offset + value_start : offset + value_end]
+        return bytes(value).decode("utf-8").strip()
 
 
 class EasyServer:
@@ -14,6 +1239,23 @@ class EasyServer:
         mode=network.STA_IF,
         append_question_mark=True,
         use_led=False,
+        buffer_size=1024,
+        max_header_size=2048,
+        max_body_size=2048,
+        cache_size=8192,
+        metrics=False,
+        log_requests=True,
+        cors_origin=None,
+        header_timeout=5,
+        body_timeout=10,
+        rate_limit=None,
+        rate_burst=5,
+        compress=False,
+        compress_wbits=10,
+        compress_min_size=256,
+        access_log=0,
+        access_log_file=None,
+        access_log_flush_ms=60000,
     ):
         """
         Initialize the EasyServer.
@@ -22,6 +1264,28 @@ class EasyServer:
         :param password: Password for STA mode or AP mode.
         :param mode: network.STA_IF for Station mode or network.AP_IF for Access Point mode.
         :param append_question_mark: Whether to append '?' to URLs.
+        :param use_led: Whether to blink the onboard LED while working.
+        :param buffer_size: Size of the fixed write buffer used for streamed responses.
+        :param max_header_size: Maximum size of the request line and headers in bytes.
+        :param max_body_size: Maximum size of a request body in bytes.
+        :param cache_size: Byte budget of the rendered-response cache for cached routes.
+        :param metrics: Collect request metrics and expose them at /metrics.
+        :param log_requests: Print a line for every request (slow over USB serial).
+        :param cors_origin: Value of Access-Control-Allow-Origin (e.g., "*") to allow
+                            cross-origin requests, or None to leave CORS disabled.
+        :param header_timeout: Seconds a client has to send the request line and headers (408 after).
+        :param body_timeout: Seconds a client has to send the body (408 after); also the socket
+                             timeout while a response is sent or a streamed body is read.
+        :param rate_limit: Requests per second allowed per client IP (429 above), or None for no limit.
+        :param rate_burst: Requests a client can send at once before rate_limit applies.
+        :param compress: gzip text responses for clients that accept it (needs the deflate module).
+        :param compress_wbits: Compression window size as a power of two (10 = 1 KB of RAM).
+        :param compress_min_size: Smallest str/bytes body worth compressing, in bytes.
+        :param access_log: Number of recent requests kept in an in-RAM access log and served
+                           as JSON at /access-log (0 to disable).
+        :param access_log_file: File the access log is appended to in batches (e.g.,
+                                "/sd/access.log"), or None to keep it in RAM only.
+        :param access_log_flush_ms: Longest time an access log entry waits before it is written.
         """
         self.mode = mode
         self.wlan = network.WLAN(self.mode)
@@ -30,15 +1294,78 @@ class EasyServer:
         self.local_ip = None
         self.server = None
         self.routes = {}  # Routing table as a dictionary
+        self.static_mounts = []  # (url_prefix, directory, max_age) tuples
+        self.static_etags = {}  # file path -> ((size, mtime), etag)
         self.http_type = "HTTP/1.1"
         self.append_question_mark = append_question_mark
         self.client = None
         self.last_response = None
         self.led = Pin("LED", Pin.OUT) if use_led else None  # LED on the Pico W
+        # Fixed write buffer for chunked responses, allocated once
+        self.write_buffer = bytearray(buffer_size)
+        self.write_view = memoryview(self.write_buffer)
+        # Reusable buffer each header block (plus a small body) is assembled in
+        self.header_buffer = bytearray(512)
+        self.header_view = memoryview(self.header_buffer)
+        self.error_responses = {}  # status line -> complete encoded error response
+        # Preallocated receive buffer holding the headers and body of one request
+        self.max_header_size = max_header_size
+        self.max_body_size = max_body_size
+        self.recv_buffer = bytearray(max_header_size + max_body_size)
+        self.recv_view = memoryview(self.recv_buffer)
+        # Rendered-response cache: url -> [cache_key, response_bytes, last_used]
+        self.cache_size = cache_size
+        self.cache_bytes = 0
+        self.cache_clock = 0
+        self.response_cache = {}
+        self.cache_generations = {}  # cache_key -> number of invalidate() calls
+        # Shared by both cores in dual-core mode
+        self.cache_lock = _thread.allocate_lock()
+        self.running = False
+        self.log_requests = log_requests
+        self.cors_origin = cors_origin
+        self.options_responses = {}  # path -> encoded OPTIONS/preflight response
+        self.header_timeout = header_timeout
+        self.body_timeout = body_timeout
+        self.rate_limiter = RateLimiter(rate_limit, rate_burst) if rate_limit else None
+        if compress and deflate is None:
+            print("The deflate module is not available; compression is disabled.")
+        self.compress = compress and deflate is not None
+        self.compress_wbits = compress_wbits
+        self.compress_min_size = compress_min_size
+        # Connections rejected before a handler ran, by reason
+        self.rejected = {}
+        for reason in REJECT_REASONS:
+            self.rejected[reason] = 0
+        self.response_status = None  # Status line of the response being sent
+        self.response_bytes = 0  # Bytes sent to the current client
+        self.event_streams = {}  # path -> EventStream
+        # Events published from the handler core in dual-core mode
+        self.event_queue = None
+        # path -> (handler, max_message_size, max_connections)
+        self.websocket_routes = {}
+        self.websockets = []  # Open WebSocket connections
+        self.poller = None  # Polls the server and WebSocket sockets while any are open
+        self.metrics = None
+        if metrics:
+            self.metrics = Metrics()
+            self.add_route("/metrics", self.handle_metrics)
+        self.access_log = None
+        if access_log:
+            self.access_log = AccessLog(
+                access_log, access_log_file, access_log_flush_ms
+            )
+            self.add_route("/access-log", self.handle_access_log)
 
     def close(self, reason=None):
         if reason:
             print(reason)
+        for event_stream in self.event_streams.values():
+            event_stream.close()
+        while self.websockets:
+            self.websockets[0].close(1001)
+        if self.access_log is not None:
+            self.access_log.flush()
         if self.client is not None:
             self.client.close()
         if self.server:
@@ -150,13 +1477,33 @@ class EasyServer:
             print("Failed to start server:", e)
             return False
 
-    def add_route(self, path, handler, method="GET"):
+    def add_route(
+        self,
+        path,
+        handler,
+        method="GET",
+        cache=False,
+        stream=False,
+        max_size=None,
+        query=False,
+    ):
         """
         Register a new route with its handler.
 
         :param path: URL path (e.g., "/custom")
-        :param handler: Function to handle the route. It should return the HTML response as a string.
-        :param method: HTTP method (e.g., "GET", "POST")
+        :param handler: Function to handle the route. It should return the HTML response as a string,
+                        return/yield an iterator of str/bytes chunks to stream the response, or
+                        return a dict/list to send it as JSON. POST, PUT and PATCH handlers receive
+                        the parsed request body; other handlers take no arguments.
+        :param method: HTTP method (e.g., "GET", "POST", "PUT", "PATCH", "DELETE", "OPTIONS").
+                       GET routes also answer HEAD requests.
+        :param cache: Cache the encoded 200 responses of a GET route. True uses the path as the
+                      invalidation key; a string sets the key passed to invalidate().
+        :param stream: Pass the Request to the handler without reading the body, so the handler can
+                       consume it with request.stream.readinto() or save_upload().
+        :param max_size: Largest body accepted on a streaming route, in bytes (None for no limit).
+        :param query: Pass the query string parameters to the handler as a dictionary, after
+                      the body (e.g., handler(params) for GET or handler(data, params) for POST).
         """
         normalized_path = path.rstrip("/") if path != "/" else path
         method = method.upper()
@@ -164,40 +1511,550 @@ class EasyServer:
         if normalized_path not in self.routes:
             self.routes[normalized_path] = {}
 
+        # The allowed methods changed, so rebuild the OPTIONS response on demand
+        self.options_responses.pop(normalized_path, None)
+        if cache is True:
+            cache = normalized_path
         self.routes[normalized_path][method] = {
             "handler": handler,
+            "cache": cache if cache and method == "GET" else None,
+            "stream": stream,
+            "max_size": max_size,
+            "query": query,
         }
 
-    def accept_points(self):
+    def add_event_stream(self, path, max_subscribers=4, max_backlog=1024):
         """
-        Serve the acceptance page for users.
+        Register a Server-Sent Events endpoint.
+
+        GET requests to `path` are kept open and receive every event passed to
+        publish(), so pages can update live instead of reloading.
+
+        :param path: URL path (e.g., "/events")
+        :param max_subscribers: Maximum number of open subscriptions; more get 503.
+        :param max_backlog: Unsent bytes allowed per subscriber before it is evicted.
+        :return: The EventStream.
         """
-        html = """
-            <!DOCTYPE html>
-            <html lang="en">
-            <head>
-                <meta charset="UTF-8">
-                <title>Accept Terms</title>
-                <script type="text/javascript">
-                    function acceptTerms() {
-                        // Redirect to a success page or perform other actions
-                        alert("Terms Accepted!");
-                        window.location.href = "/";
-                    }
-                </script>
-            </head>
-            <body>
-                <h1>Welcome!</h1>
-                <p>Please accept the terms and conditions to continue.</p>
-                <button onclick="acceptTerms()">Accept</button>
-            </body>
-            </html>
+        normalized_path = path.rstrip("/") if path != "/" else path
+        event_stream = EventStream(self, max_subscribers, max_backlog)
+        self.event_streams[normalized_path] = event_stream
+        return event_stream
+
+    def publish(self, path, data, event=None) -> bool:
         """
-        return html
+        Send an event to every subscriber of an event stream.
 
-    def webpage(self):
+        The event is encoded once and fanned out without rendering any page. In
+        dual-core mode it is queued and sent by the network core.
+
+        :param path: Path of the event stream (e.g., "/events").
+        :param data: Event data; a dict or list is sent as JSON.
+        :param event: Optional event name (the "event:" field).
+        :return: False if the stream does not exist or the event queue is full.
         """
-        Generate a basic HTML page.
+        event_stream = self.event_streams.get(path)
+        if event_stream is None:
+            return False
+        if not isinstance(data, str):
+            data = json.dumps(data)
+        message = f"event: {event}\n" if event else ""
+        for line in data.split("\n"):
+            message += f"data: {line}\n"
+        message = (message + "\n").encode("utf-8")
+
+        if self.event_queue is not None:
+            return self.event_queue.put((event_stream, message))
+        event_stream.broadcast(message)
+        return True
+
+    def add_websocket(self, path, handler, max_message_size=1024, max_connections=4):
+        """
+        Register a WebSocket endpoint.
+
+        The handler is called as handler(websocket, message) for every complete
+        message: a str for text frames or a memoryview for binary frames (only
+        valid during the call). Whatever it returns (str, bytes or dict/list) is
+        sent back; it can also call websocket.send() at any time. Handlers run in
+        the accept loop (the network core in dual-core mode), so keep them short.
+
+        :param path: URL path (e.g., "/ws")
+        :param handler: Function called with (websocket, message).
+        :param max_message_size: Largest message accepted; bigger ones close the connection (1009).
+        :param max_connections: Maximum number of open connections on this path; more get 503.
+        """
+        normalized_path = path.rstrip("/") if path != "/" else path
+        self.websocket_routes[normalized_path] = (
+            handler,
+            max_message_size,
+            max_connections,
+        )
+
+    def accept_websocket(self, request) -> bool:
+        """
+        Complete the WebSocket handshake if the request is for a WebSocket route.
+
+        The client socket is handed over to a WebSocket, so self.client is set to
+        None and the connection is left open.
+
+        :param request: The parsed Request.
+        :return: True if the request was for a WebSocket route.
+        """
+        route = self.websocket_routes.get(request.path)
+        if route is None:
+            return False
+        handler, max_message_size, max_connections = route
+        key = request.header("sec-websocket-key")
+        if (
+            request.method != "GET"
+            or key is None
+            or "websocket" not in request.header("upgrade", "").lower()
+        ):
+            self.send_response(
+                "426 Upgrade Required\r\n",
+                {
+                    "Content-Type": "text/html",
+                    "Connection": "close",
+                    "Upgrade": "websocket",
+                },
+                ERROR_PAGES["426 Upgrade Required\r\n"],
+            )
+            return True
+        open_connections = 0
+        for websocket in self.websockets:
+            if websocket.path == request.path:
+                open_connections += 1
+        if open_connections >= max_connections:
+            self.rejected["capacity"] += 1
+            self.send_error("503 Service Unavailable\r\n", "Too many connections.")
+            return True
+
+        digest = hashlib.sha1(key.strip().encode("utf-8") + WEBSOCKET_GUID).digest()
+        self.send_headers(
+            "101 Switching Protocols\r\n",
+            {
+                "Upgrade": "websocket",
+                "Connection": "Upgrade",
+                "Sec-WebSocket-Accept": binascii.b2a_base64(digest)[:-1].decode(),
+            },
+        )
+
+        client = self.client
+        # Partial frames are read with a blocking socket, bounded by a timeout
+        client.settimeout(2)
+        if hasattr(socket, "TCP_NODELAY"):
+            client.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        if self.poller is None:
+            self.poller = select.poll()
+            self.poller.register(self.server, select.POLLIN)
+        self.poller.register(client, select.POLLIN)
+        self.websockets.append(
+            WebSocket(self, client, request.path, handler, max_message_size)
+        )
+        self.client = None
+        return True
+
+    def remove_websocket(self, websocket):
+        """Close a WebSocket connection and stop polling it."""
+        websocket.open = False
+        if websocket in self.websockets:
+            self.websockets.remove(websocket)
+            self.poller.unregister(websocket.client)
+            if self.metrics is not None:
+                self.metrics.open_connections -= 1
+        try:
+            websocket.client.close()
+        except OSError:
+            pass
+
+    def poll_websockets(self, timeout_ms) -> bool:
+        """
+        Wait for WebSocket frames or a new client and handle the frames.
+
+        :param timeout_ms: Time to wait in milliseconds (-1 waits until something arrives).
+        :return: True if a client is waiting to be accepted.
+        """
+        accept_ready = False
+        for event in self.poller.poll(timeout_ms):
+            # MicroPython returns the socket, CPython its file descriptor
+            key = event[0]
+            if key is self.server or (
+                isinstance(key, int) and key == self.server.fileno()
+            ):
+                accept_ready = True
+                continue
+            for websocket in self.websockets:
+                if websocket.client is key or (
+                    isinstance(key, int) and websocket.client.fileno() == key
+                ):
+                    break
+            else:
+                continue
+            try:
+                if event[1] & select.POLLIN:
+                    websocket.receive()
+                else:
+                    self.remove_websocket(websocket)  # Hung up or error
+            except OSError:
+                self.remove_websocket(websocket)
+            except Exception as e:
+                print(f"WebSocket handler error for path '{websocket.path}': {e}")
+        return accept_ready
+
+    def subscribe_events(self, request) -> bool:
+        """
+        Subscribe the current client if the request is for an event stream.
+
+        The client socket is handed over to the EventStream, so self.client is
+        set to None and the connection is left open.
+
+        :param request: The parsed Request.
+        :return: True if the request was for an event stream.
+        """
+        event_stream = self.event_streams.get(request.path)
+        if event_stream is None or request.method != "GET":
+            return False
+        if len(event_stream.subscribers) >= event_stream.max_subscribers:
+            self.rejected["capacity"] += 1
+            self.send_response(
+                "503 Service Unavailable\r\n",
+                {"Content-Type": "text/html", "Connection": "close", "Retry-After": 10},
+                b"<h1>503 Service Unavailable</h1><p>Too many subscribers.</p>",
+            )
+            return True
+        self.send_headers(
+            "200 OK\r\n",
+            {
+                "Content-Type": "text/event-stream",
+                "Cache-Control": "no-cache",
+                "Connection": "keep-alive",
+            },
+        )
+        # Ask the browser to reconnect after 3 seconds if the stream drops
+        self.sendall(b"retry: 3000\n\n")
+        if event_stream.subscribe(self.client):
+            self.client = None
+        return True
+
+    def send_events(self):
+        """Fan out the events queued by publish() (network core, dual-core mode)."""
+        item = self.event_queue.get()
+        while item is not None:
+            event_stream, message = item
+            event_stream.broadcast(message)
+            item = self.event_queue.get()
+
+    def handle_metrics(self):
+        """
+        Handler for GET /metrics when metrics are enabled.
+        """
+        return (
+            self.metrics.render(self.rejected),
+            "200 OK\r\n",
+            {"Content-Type": "text/plain; version=0.0.4"},
+        )
+
+    def handle_access_log(self):
+        """
+        Handler for GET /access-log when the access log is enabled.
+
+        Serves the entries held in RAM, newest first, without touching storage.
+        """
+        return list(self.access_log.entries())
+
+    def invalidate(self, cache_key):
+        """
+        Drop every cached response stored under an invalidation key.
+
+        Call this from handlers that change the data behind a cached route
+        (e.g., a POST handler updating what a cached GET route renders).
+
+        :param cache_key: Invalidation key given to add_route().
+        """
+        with self.cache_lock:
+            # Responses rendered before this call are no longer stored
+            self.cache_generations[cache_key] = (
+                self.cache_generations.get(cache_key, 0) + 1
+            )
+            for url in [
+                url
+                for url, entry in self.response_cache.items()
+                if entry[0] == cache_key
+            ]:
+                self.cache_bytes -= len(self.response_cache.pop(url)[1])
+
+    def cache_lookup(self, url, cache_key=None):
+        """
+        Return the encoded response cached for a URL, or None.
+
+        :param url: Request path including the query string.
+        :param cache_key: Only return the entry if it was stored under this key.
+        """
+        with self.cache_lock:
+            entry = self.response_cache.get(url)
+            if entry is None or (cache_key is not None and entry[0] != cache_key):
+                return None
+            self.cache_clock += 1
+            entry[2] = self.cache_clock
+            return entry[1]
+
+    def cache_generation(self, cache_key):
+        """Return the number of times an invalidation key was invalidated."""
+        with self.cache_lock:
+            return self.cache_generations.get(cache_key, 0)
+
+    def cache_store(self, url, cache_key, response, generation=None):
+        """
+        Store an encoded response, evicting least recently used entries to stay in budget.
+
+        :param url: Request path including the query string.
+        :param cache_key: Invalidation key of the route.
+        :param response: Encoded response (status line, headers and body).
+        :param generation: cache_generation() of the key before the response was
+                           rendered; the response is not stored if the key was
+                           invalidated since.
+        """
+        size = len(response)
+        if size > self.cache_size:
+            return
+        with self.cache_lock:
+            if (
+                generation is not None
+                and self.cache_generations.get(cache_key, 0) != generation
+            ):
+                return
+            old_entry = self.response_cache.pop(url, None)
+            if old_entry is not None:
+                self.cache_bytes -= len(old_entry[1])
+            while self.cache_bytes + size > self.cache_size and self.response_cache:
+                oldest = min(
+                    self.response_cache, key=lambda u: self.response_cache[u][2]
+                )
+                self.cache_bytes -= len(self.response_cache.pop(oldest)[1])
+            self.cache_clock += 1
+            self.response_cache[url] = [cache_key, response, self.cache_clock]
+            self.cache_bytes += size
+
+    def collect_body(self, response_content, limit):
+        """
+        Collect a response body into bytes if it is at most `limit` bytes long.
+
+        :param response_content: Response body as str/bytes, an open file or an iterator of chunks.
+        :param limit: Maximum body size in bytes.
+        :return: Tuple of (body, response_content). body is None when the content does not
+                 fit, in which case response_content still yields the complete body.
+        """
+        if response_content is None:
+            return b"", response_content
+        if isinstance(response_content, (dict, list)):
+            response_content = json.dumps(response_content)
+        if isinstance(response_content, str):
+            response_content = response_content.encode("utf-8")
+        if isinstance(response_content, (bytes, bytearray)):
+            if len(response_content) > limit:
+                return None, response_content
+            return bytes(response_content), response_content
+        if hasattr(response_content, "readinto"):
+            return None, response_content
+
+        chunks = []
+        size = 0
+        iterator = iter(response_content)
+        for chunk in iterator:
+            if isinstance(chunk, str):
+                chunk = chunk.encode("utf-8")
+            elif isinstance(chunk, memoryview):
+                chunk = bytes(chunk)  # BodyPipe reuses its buffers
+            chunks.append(chunk)
+            size += len(chunk)
+            if size > limit:
+                # Too large to cache: stream what was collected, then the rest
+                return None, chain_chunks(chunks, iterator)
+        return b"".join(chunks), response_content
+
+    def accepts_gzip(self, request) -> bool:
+        """Return True if compression is enabled and the client accepts gzip."""
+        return self.compress and "gzip" in request.header("accept-encoding", "")
+
+    def is_compressible(self, response_headers) -> bool:
+        """Return True if a response is not encoded yet and has a text-like type."""
+        if "Content-Encoding" in response_headers:
+            return False
+        content_type = response_headers.get("Content-Type", "")
+        for prefix in COMPRESSIBLE_TYPES:
+            if content_type.startswith(prefix):
+                return True
+        return False
+
+    def compress_bytes(self, body) -> bytes:
+        """
+        gzip a body held in RAM.
+
+        :param body: Bytes-like body.
+        :return: The compressed body.
+        """
+        output = io.BytesIO()
+        compressor = deflate.DeflateIO(output, deflate.GZIP, self.compress_wbits)
+        compressor.write(body)
+        compressor.close()
+        return output.getvalue()
+
+    def add_static(self, url_prefix, directory, max_age=86400):
+        """
+        Serve files from a directory on flash or SD under a URL prefix.
+
+        Files are streamed through the write buffer with an ETag built from their
+        size and mtime, so unchanged files are answered with 304 Not Modified.
+        If the client accepts gzip and a precompressed "<file>.gz" sibling
+        exists, it is sent instead with Content-Encoding: gzip.
+
+        :param url_prefix: URL prefix (e.g., "/static")
+        :param directory: Directory to serve (e.g., "/sd/www")
+        :param max_age: Cache-Control max-age in seconds.
+        """
+        url_prefix = url_prefix.rstrip("/")
+        self.static_mounts.append((url_prefix, directory.rstrip("/"), max_age))
+
+    def static_etag(self, file_path):
+        """
+        Return (etag, size) for a file, or None if it does not exist or is a directory.
+
+        ETags are cached per file and only rebuilt when the size or mtime changes.
+
+        :param file_path: Path of the file on flash or SD.
+        """
+        try:
+            stats = os.stat(file_path)
+        except OSError:
+            return None
+        if stats[0] & 0x4000:  # Directory flag in mode
+            return None
+        size = stats[6]
+        key = (size, stats[8])
+        cached = self.static_etags.get(file_path)
+        if cached is None or cached[0] != key:
+            cached = (key, f'"{size:x}-{stats[8]:x}"')
+            self.static_etags[file_path] = cached
+        return cached[1], size
+
+    def serve_static(self, request):
+        """
+        Serve a request from the static mounts.
+
+        :param request: The parsed Request.
+        :return: Tuple of (status_line, response_headers, response_content), or None
+                 if no mount has a matching file.
+        """
+        path = request.path
+        for url_prefix, directory, max_age in self.static_mounts:
+            if path != url_prefix and not path.startswith(url_prefix + "/"):
+                continue
+            relative_path = path[len(url_prefix) :]
+            if ".." in relative_path.split("/"):
+                return None
+            file_path = directory + relative_path
+            if relative_path in ("", "/"):
+                file_path = directory + "/index.html"
+
+            found = self.static_etag(file_path)
+            if found is None:
+                continue
+            if request.method not in ("GET", "HEAD"):
+                return (
+                    "405 Method Not Allowed\r\n",
+                    {
+                        "Content-Type": "text/html",
+                        "Connection": "close",
+                    },
+                    ERROR_PAGES["405 Method Not Allowed\r\n"],
+                )
+
+            response_headers = {
+                "Content-Type": MIME_TYPES.get(
+                    file_path.rsplit(".", 1)[-1].lower(), "application/octet-stream"
+                ),
+                "Connection": "close",
+                "Cache-Control": f"public, max-age={max_age}",
+                "Vary": "Accept-Encoding",
+            }
+
+            # Prefer a precompressed sibling when the client accepts gzip
+            if "gzip" in request.header("accept-encoding", ""):
+                compressed = self.static_etag(file_path + ".gz")
+                if compressed is not None:
+                    file_path += ".gz"
+                    found = compressed
+                    response_headers["Content-Encoding"] = "gzip"
+
+            etag, size = found
+            if (
+                size <= self.cache_size
+                and self.accepts_gzip(request)
+                and self.is_compressible(response_headers)
+            ):
+                return self.serve_compressed_static(
+                    request, file_path, etag, response_headers
+                )
+
+            response_headers["ETag"] = etag
+            if request.header("if-none-match") == etag:
+                return "304 Not Modified\r\n", response_headers, b""
+
+            response_headers["Content-Length"] = size
+            return "200 OK\r\n", response_headers, open(file_path, "rb")
+        return None
+
+    def serve_compressed_static(self, request, file_path, etag, response_headers):
+        """
+        Serve a static file gzipped, compressing it only once per version.
+
+        The compressed bytes are kept in the response cache under the file's
+        ETag, so they are rebuilt only when the file changes (or is evicted).
+
+        :return: Tuple of (status_line, response_headers, response_content).
+        """
+        response_headers["Content-Encoding"] = "gzip"
+        response_headers["ETag"] = etag[:-1] + '-gzip"'
+        if request.header("if-none-match") == response_headers["ETag"]:
+            return "304 Not Modified\r\n", response_headers, b""
+
+        cache_url = "static:" + file_path
+        body = self.cache_lookup(cache_url, etag)
+        if body is None:
+            with open(file_path, "rb") as f:
+                body = self.compress_bytes(f.read())
+            self.cache_store(cache_url, etag, body)
+        return "200 OK\r\n", response_headers, body
+
+    def accept_points(self):
+        """
+        Serve the acceptance page for users.
+        """
+        html = """
+            <!DOCTYPE html>
+            <html lang="en">
+            <head>
+                <meta charset="UTF-8">
+                <title>Accept Terms</title>
+                <script type="text/javascript">
+                    function acceptTerms() {
+                        // Redirect to a success page or perform other actions
+                        alert("Terms Accepted!");
+                        window.location.href = "/";
+                    }
+                </script>
+            </head>
+            <body>
+                <h1>Welcome!</h1>
+                <p>Please accept the terms and conditions to continue.</p>
+                <button onclick="acceptTerms()">Accept</button>
+            </body>
+            </html>
+        """
+        return html
+
+    def webpage(self):
+        """
+        Generate a basic HTML page.
         """
         html = """ 
             <!DOCTYPE html>
@@ -214,210 +2071,919 @@ class EasyServer:
         """
         return html
 
+    def send_response(
+        self,
+        status_line,
+        response_headers,
+        response_content,
+        send_body=True,
+        compress=False,
+    ):
+        """
+        Send an HTTP response to the current client.
+
+        A str/bytes body is sent with a Content-Length header. Any other iterable
+        (e.g., a generator returned by a handler) is streamed with
+        Transfer-Encoding: chunked, so the full page never has to exist in RAM.
+        Open files are read straight into the write buffer and are sent raw when
+        a Content-Length header is already set. A dict or list is serialized with
+        json.dump() straight into the chunked stream.
+
+        :param status_line: Status line without the protocol (e.g., "200 OK\\r\\n").
+        :param response_headers: Dictionary of response headers.
+        :param response_content: Response body as str/bytes, an open file, a dict/list, or an
+                                 iterator of str/bytes chunks.
+        :param send_body: False to send only the headers (HEAD requests).
+        :param compress: gzip the body (str/bytes of at least compress_min_size,
+                         dicts/lists and iterators; open files are sent as they are).
+        """
+        if response_content is None:
+            response_content = b""
+        elif isinstance(response_content, str):
+            response_content = response_content.encode("utf-8")
+
+        if isinstance(response_content, (bytes, bytearray, memoryview)):
+            if compress and len(response_content) >= self.compress_min_size:
+                response_content = self.compress_bytes(response_content)
+                response_headers["Content-Encoding"] = "gzip"
+            # 204 and 304 responses never carry a body
+            if status_line[:3] not in ("204", "304"):
+                response_headers["Content-Length"] = len(response_content)
+            headers = self.build_headers(status_line, response_headers)
+            if not send_body:
+                self.sendall(headers)
+                return
+            position = len(headers)
+            end = position + len(response_content)
+            if end <= len(self.header_view):
+                # Small body: append it to the header block and send both at once
+                self.header_view[position:end] = response_content
+                self.sendall(self.header_view[:end])
+            else:
+                self.sendall(headers)
+                self.sendall(response_content)
+            return
+
+        if hasattr(response_content, "readinto"):
+            # File-like object, streamed through the write buffer
+            try:
+                if "Content-Length" not in response_headers:
+                    response_headers["Transfer-Encoding"] = "chunked"
+                self.send_headers(status_line, response_headers)
+                if send_body:
+                    self.send_file(
+                        response_content, "Content-Length" not in response_headers
+                    )
+            finally:
+                response_content.close()
+            return
+
+        response_headers["Transfer-Encoding"] = "chunked"
+        if compress:
+            response_headers["Content-Encoding"] = "gzip"
+        self.send_headers(status_line, response_headers)
+        if not send_body:
+            return
+        if compress:
+            self.send_compressed(response_content)
+        elif isinstance(response_content, (dict, list)):
+            writer = ChunkWriter(self)
+            json.dump(response_content, writer)
+            writer.finish()
+        else:
+            self.send_chunks(response_content)
+
+    def build_headers(self, status_line, response_headers):
+        """
+        Encode the status line and headers of a response.
+
+        Pre-encoded status and header lines are copied into the reusable header
+        buffer, so common responses are assembled without formatting or encoding
+        strings (only Content-Length is formatted). Only call this from the
+        thread that sends responses.
+
+        :param status_line: Status line without the protocol (e.g., "200 OK\\r\\n").
+        :param response_headers: Dictionary of response headers.
+        :return: Memoryview of the encoded header block, including the blank line.
+                 It is only valid until the next call.
+        """
+        self.response_status = status_line
+        if self.cors_origin and "Access-Control-Allow-Origin" not in response_headers:
+            response_headers["Access-Control-Allow-Origin"] = self.cors_origin
+        view = self.header_view
+        size = len(view) - 2  # Room for the blank line
+        line = STATUS_LINES.get(status_line)
+        if line is None:
+            line = f"{self.http_type} {status_line}".encode("utf-8")
+        position = len(line)
+        if position <= size:
+            view[:position] = line
+            for header, value in response_headers.items():
+                values = HEADER_LINES.get(header)
+                line = values.get(value) if values is not None else None
+                if line is None:
+                    if header == "Content-Length" and isinstance(value, int):
+                        line = b"Content-Length: %d\r\n" % value
+                    else:
+                        line = f"{header}: {value}\r\n".encode("utf-8")
+                end = position + len(line)
+                if end > size:
+                    break
+                view[position:end] = line
+                position = end
+            else:
+                view[position : position + 2] = b"\r\n"
+                return view[: position + 2]
+
+        # Header block too large for the buffer; grow it and retry
+        self.header_buffer = bytearray(len(self.header_buffer) * 2)
+        self.header_view = memoryview(self.header_buffer)
+        return self.build_headers(status_line, response_headers)
+
+    def send_headers(self, status_line, response_headers):
+        """
+        Send the status line and headers of a response.
+
+        :param status_line: Status line without the protocol (e.g., "200 OK\\r\\n").
+        :param response_headers: Dictionary of response headers.
+        """
+        self.sendall(self.build_headers(status_line, response_headers))
+
+    def send_chunks(self, chunks):
+        """
+        Stream an iterator of str/bytes chunks using chunked transfer encoding.
+
+        Chunks are copied into the fixed write buffer and flushed each time it
+        fills up, so small chunks are coalesced and peak memory stays bounded.
+
+        :param chunks: Iterator of str/bytes chunks.
+        """
+        writer = ChunkWriter(self)
+        for chunk in chunks:
+            if chunk:
+                writer.write(chunk)
+        writer.finish()
+
+    def send_compressed(self, response_content):
+        """
+        gzip a dict/list or an iterator of str/bytes chunks into the chunked stream.
+
+        The compressor writes into a ChunkWriter, so compressed bytes are framed
+        through the fixed write buffer and only the compression window is allocated.
+
+        :param response_content: dict/list (sent as JSON) or iterator of str/bytes chunks.
+        """
+        writer = ChunkWriter(self)
+        compressor = deflate.DeflateIO(writer, deflate.GZIP, self.compress_wbits)
+        if isinstance(response_content, (dict, list)):
+            json.dump(response_content, compressor)
+        else:
+            for chunk in response_content:
+                if chunk:
+                    if isinstance(chunk, str):
+                        chunk = chunk.encode("utf-8")
+                    compressor.write(chunk)
+        compressor.close()
+        writer.finish()
+
+    def send_file(self, file, chunked=False):
+        """
+        Stream an open file by reading it directly into the write buffer.
+
+        :param file: File opened in binary mode.
+        :param chunked: Whether to frame the data with chunked transfer encoding.
+        """
+        view = self.write_view
+        while True:
+            count = file.readinto(view)
+            if not count:
+                break
+            if chunked:
+                self.send_chunk(view, count)
+            else:
+                self.sendall(view[:count])
+        if chunked:
+            self.sendall(b"0\r\n\r\n")
+
+    def send_chunk(self, view, length):
+        """
+        Send a single chunk from the write buffer.
+
+        :param view: Memoryview of the write buffer.
+        :param length: Number of bytes of the buffer to send.
+        """
+        self.sendall(f"{length:x}\r\n".encode("utf-8"))
+        self.sendall(view[:length])
+        self.sendall(b"\r\n")
+
+    def sendall(self, data):
+        """
+        Send data to the current client, counting it in the metrics.
+
+        :param data: Bytes-like object to send.
+        """
+        self.client.sendall(data)
+        self.response_bytes += len(data)
+        if self.metrics is not None:
+            self.metrics.bytes_out += len(data)
+
+    def recv_into(self, view):
+        """
+        Receive the data available from the current client directly into a memoryview.
+
+        The header block has no known length, so this cannot use readinto(),
+        which waits until the view is full. It uses recv_into(), or recv()
+        plus a copy on ports whose sockets lack it (MicroPython). Reads of a
+        known length use recv_exactly().
+
+        :param view: Writable memoryview slice of the receive buffer.
+        :return: Number of bytes received (0 when the client disconnected).
+        """
+        if hasattr(self.client, "recv_into"):
+            count = self.client.recv_into(view)
+        else:
+            data = self.client.recv(len(view))
+            count = len(data)
+            view[:count] = data
+        if self.metrics is not None:
+            self.metrics.bytes_in += count
+        return count
+
+    def send_error(self, status_line, message=None):
+        """
+        Send a small HTML error page.
+
+        Without a message the complete response is encoded once per status and
+        reused.
+
+        :param status_line: Status line without the protocol (e.g., "404 Not Found\\r\\n").
+        :param message: Optional paragraph to show below the heading.
+        """
+        if message:
+            self.send_response(
+                status_line,
+                {"Content-Type": "text/html", "Connection": "close"},
+                f"<h1>{status_line.strip()}</h1><p>{message}</p>",
+            )
+            return
+        response = self.error_responses.get(status_line)
+        if response is None:
+            body = ERROR_PAGES.get(status_line)
+            if body is None:
+                body = f"<h1>{status_line.strip()}</h1>".encode("utf-8")
+            response = (
+                bytes(
+                    self.build_headers(
+                        status_line,
+                        {
+                            "Content-Type": "text/html",
+                            "Connection": "close",
+                            "Content-Length": len(body),
+                        },
+                    )
+                )
+                + body
+            )
+            self.error_responses[status_line] = response
+        self.response_status = status_line
+        self.sendall(response)
+
+    def read_request(self, addr, buffer=None, view=None):
+        """
+        Read one request from the current client into the receive buffer.
+
+        The header block and body are received in place with recv_into; only the
+        request line is decoded here. Requests that exceed max_header_size or
+        max_body_size are answered with 431/413, clients that miss the header or
+        body deadline get 408, and rate-limited clients get 429 as soon as their
+        headers are in, before the body is read.
+
+        :param addr: Address of the client.
+        :param buffer: Receive buffer to use instead of the server's own.
+        :param view: Memoryview of `buffer`.
+        :return: A Request, or None if the client disconnected or was rejected.
+        """
+        if buffer is None:
+            buffer = self.recv_buffer
+            view = self.recv_view
+        header_limit = self.max_header_size
+        received = 0
+        header_end = -1
+        # One deadline for the whole header block, so trickling bytes does not extend it
+        deadline = ticks_add(ticks_ms(), int(self.header_timeout * 1000))
+        while header_end == -1:
+            if received >= header_limit:
+                print(f"Request headers from {addr} too large. Connection closed.")
+                return self.reject(
+                    "too_large", "431 Request Header Fields Too Large\r\n"
+                )
+            count = self.recv_before(view[received:header_limit], deadline)
+            if count is None:
+                print(f"Request headers from {addr} timed out. Connection closed.")
+                return self.reject("timeout", "408 Request Timeout\r\n")
+            if not count:
+                print(f"Client {addr} disconnected.")
+                return None
+            if self.led:
+                self.led.on()
+            # Only rescan the new bytes (plus 3 in case the CRLFCRLF straddles reads)
+            scan_from = received - 3 if received > 3 else 0
+            received += count
+            header_end = find_bytes(buffer, b"\r\n\r\n", scan_from, received)
+
+        if self.rate_limiter is not None and not self.rate_limiter.allow(addr[0]):
+            return self.reject(
+                "rate_limited",
+                "429 Too Many Requests\r\n",
+                {"Retry-After": self.rate_limiter.retry_after},
+            )
+
+        # Parse the request line; header values are decoded on demand
+        line_end = find_bytes(buffer, b"\r\n", 0, header_end)
+        if line_end == -1:
+            line_end = header_end
+        request_line = bytes(view[:line_end]).decode("utf-8")
+        try:
+            method, path, protocol = request_line.split()
+        except ValueError:
+            print(f"Malformed request line from {addr}. Connection closed.")
+            return self.reject("malformed", "400 Bad Request\r\n")
+
+        request = Request(buffer, line_end + 2, header_end, request_line, addr)
+        request.method = method
+        request.protocol = protocol
+
+        # Normalize path (split off query parameters and remove trailing slash)
+        if "?" in path:
+            path, request.query = path.split("?", 1)
+        request.path = path.rstrip("/") if path != "/" else path
+
+        # Receive the body into the buffer, right after the header block
+        try:
+            content_length = int(request.header("content-length", "0"))
+        except ValueError:
+            content_length = 0
+        body_start = header_end + 4
+        body_end = body_start + content_length
+
+        # Streaming routes read the body themselves through request.stream
+        route_info = self.routes.get(request.path, {}).get(method)
+        if route_info is not None and route_info.get("stream"):
+            max_size = route_info["max_size"]
+            if max_size is not None and content_length > max_size:
+                print(f"Request body from {addr} too large. Connection closed.")
+                return self.reject("too_large", "413 Payload Too Large\r\n")
+            self.client.settimeout(self.body_timeout)
+            request.client = self.client
+            request.body = view[body_start : min(received, body_end)]
+            request.stream = BodyStream(self, request, content_length)
+            return request
+
+        if content_length > self.max_body_size or body_end > len(buffer):
+            print(f"Request body from {addr} too large. Connection closed.")
+            return self.reject("too_large", "413 Payload Too Large\r\n")
+        deadline = ticks_add(ticks_ms(), int(self.body_timeout * 1000))
+        while received < body_end:
+            count = self.recv_before(view[received:body_end], deadline)
+            if count is None:
+                print(f"Request body from {addr} timed out. Connection closed.")
+                return self.reject("timeout", "408 Request Timeout\r\n")
+            if not count:
+                break
+            received += count
+        request.body = view[body_start : min(received, body_end)]
+        # Bound the time a client that stops reading can hold up the response
+        self.client.settimeout(self.body_timeout)
+        return request
+
+    def recv_before(self, view, deadline):
+        """
+        Receive into a memoryview, waiting no later than a deadline.
+
+        :param view: Writable memoryview slice of the receive buffer.
+        :param deadline: ticks_ms() value to give up at, built with ticks_add().
+        :return: Number of bytes received, or None if the deadline passed.
+        """
+        remaining = ticks_diff(deadline, ticks_ms())
+        if remaining <= 0:
+            return None
+        self.client.settimeout(remaining / 1000)
+        try:
+            return self.recv_into(view)
+        except OSError as e:
+            if is_timeout(e):
+                return None
+            raise
+
+    def reject(self, reason, status_line, response_headers=None):
+        """
+        Count a rejected request and send a small error response.
+
+        :param reason: One of REJECT_REASONS.
+        :param status_line: Status line of the error response.
+        :param response_headers: Extra response headers (e.g., Retry-After).
+        :return: None, so read_request() can return the result directly.
+        """
+        self.rejected[reason] += 1
+        try:
+            if response_headers:
+                headers = {"Content-Type": "text/html", "Connection": "close"}
+                headers.update(response_headers)
+                self.send_response(status_line, headers, ERROR_PAGES[status_line])
+            else:
+                self.send_error(status_line)
+        except OSError:
+            pass  # The client is already gone
+        return None
+
+    def handle_request(self, request):
+        """
+        Run the handler registered for a request.
+
+        Routes are looked up in the routing table by path and method. HEAD is
+        answered by GET handlers, OPTIONS is answered automatically unless a
+        handler is registered for it, and other unregistered methods get 405.
+
+        :param request: The parsed Request.
+        :return: Tuple of (status_line, response_headers, response_content).
+        """
+        path = request.path
+        method = request.method
+        cache_key = self.route_cache_key(request)
+        if cache_key is not None:
+            # Taken before the handler reads its data, so a render that races
+            # with invalidate() is sent but not cached
+            request.cache_generation = self.cache_generation(cache_key)
+
+        # Initialize response variables
+        status_line = "200 OK\r\n"  # Default status
+        response_headers = {
+            "Content-Type": "text/html",
+            "Connection": "close",
+        }
+
+        route_methods = self.routes.get(path)
+        if route_methods is None:
+            # Serve files from the static mounts for paths without a route
+            if self.static_mounts:
+                static_response = self.serve_static(request)
+                if static_response is not None:
+                    return static_response
+            if path == "/" and method in ("GET", "HEAD"):
+                # Handle Home page
+                return status_line, response_headers, self.webpage()
+            if path == "/":
+                return (
+                    "405 Method Not Allowed\r\n",
+                    response_headers,
+                    ERROR_PAGES["405 Method Not Allowed\r\n"],
+                )
+            # Path not found
+            return (
+                "404 Not Found\r\n",
+                response_headers,
+                ERROR_PAGES["404 Not Found\r\n"],
+            )
+
+        route_info = route_methods.get(method)
+        if route_info is None and method == "HEAD":
+            route_info = route_methods.get("GET")
+        if route_info is None:
+            if method == "OPTIONS":
+                return "204 No Content\r\n", self.options_headers(path), b""
+            response_headers["Allow"] = self.allowed_methods(path)
+            return (
+                "405 Method Not Allowed\r\n",
+                response_headers,
+                ERROR_PAGES["405 Method Not Allowed\r\n"],
+            )
+
+        # Methods with a body get it parsed and passed to the handler
+        args = ()
+        if request.stream is not None:
+            args = (request,)
+        elif method in BODY_METHODS:
+            parsed_body = self.parse_body(request)
+            if parsed_body is None:
+                return (
+                    "400 Bad Request\r\n",
+                    response_headers,
+                    b"<h1>400 Bad Request</h1><p>Invalid JSON.</p>",
+                )
+            args = (parsed_body,)
+        if route_info["query"]:
+            args += (request.params(),)
+
+        try:
+            response_content, status_line = self.unpack_response(
+                route_info["handler"](*args), status_line, response_headers
+            )
+        except Exception as handler_e:
+            print(f"Handler error for path '{path}': {handler_e}")
+            response_content = (
+                b"<h1>500 Internal Server Error</h1><p>Handler execution failed.</p>"
+            )
+            status_line = "500 Internal Server Error\r\n"
+
+        if (
+            isinstance(response_content, (dict, list))
+            and response_headers["Content-Type"] == "text/html"
+        ):
+            response_headers["Content-Type"] = "application/json"
+        return status_line, response_headers, response_content
+
+    def parse_body(self, request):
+        """
+        Parse a JSON or URL-encoded request body.
+
+        :param request: The parsed Request.
+        :return: The parsed body, or None if a JSON body is invalid.
+        """
+        body = bytes(request.body)
+        if "application/json" in request.header("content-type", ""):
+            try:
+                return json.loads(body.decode("utf-8"))
+            except ValueError as ve:
+                print(f"JSON decoding error: {ve}")
+                return None
+
+        # Assume URL-encoded
+        try:
+            return parse_pairs(body.decode("utf-8"))
+        except Exception as e:
+            print(f"Error parsing request data: {e}")
+        return {}
+
+    def save_upload(
+        self,
+        request,
+        directory,
+        sd=None,
+        max_file_size=None,
+        progress=None,
+        buffer_size=1024,
+    ):
+        """
+        Save the files of a multipart/form-data upload on a streaming route.
+
+        File parts are piped to `directory` through a fixed buffer, so files of
+        any size can be uploaded. Use it from a handler registered with stream=True:
+
+            def handle_upload(request):
+                try:
+                    return server.save_upload(request, "uploads", sd=sd)
+                except ValueError as e:
+                    return f"<p>{e}</p>", "413 Payload Too Large\r\n"
+
+        :param request: Request of a streaming route.
+        :param directory: Directory to save files to (relative to the SD card when `sd` is set).
+        :param sd: EasySD instance to write to, or None to write to the Pico's flash.
+        :param max_file_size: Largest file accepted, in bytes (None for no limit).
+        :param progress: Optional callback(received, total) called as the body is received.
+        :param buffer_size: Size of the scan and copy buffers.
+        :return: Dictionary with "fields" (form field values) and "files"
+                 (field name -> {"filename": ..., "size": ...}).
+        :raises ValueError: If the body is not multipart, is truncated or a file is too large.
+        """
+        content_type = request.header("content-type", "")
+        if "multipart/form-data" not in content_type or "boundary=" not in content_type:
+            raise ValueError("Expected a multipart/form-data body")
+        boundary = content_type.split("boundary=", 1)[1].split(";")[0].strip('"')
+
+        request.stream.progress = progress
+        reader = MultipartReader(request.stream, boundary, buffer_size)
+        copy_buffer = bytearray(buffer_size)
+        copy_view = memoryview(copy_buffer)
+        result = {"fields": {}, "files": {}}
+
+        part = reader.next_part()
+        while part is not None:
+            filename = part["filename"]
+            if filename is None:
+                # Form field: small values are kept in RAM
+                count = reader.readinto(copy_buffer)
+                value = b""
+                while count:
+                    value += bytes(copy_view[:count])
+                    if len(value) > buffer_size:
+                        raise ValueError(f"Form field '{part['name']}' is too large")
+                    count = reader.readinto(copy_buffer)
+                result["fields"][part["name"]] = value.decode("utf-8")
+            else:
+                # Keep only the base name so uploads stay inside `directory`
+                filename = filename.replace("\\", "/").split("/")[-1]
+                if filename in ("", ".", ".."):
+                    part = reader.next_part()
+                    continue
+                size = self.save_part(
+                    reader, f"{directory}/{filename}", sd, max_file_size, copy_view
+                )
+                result["files"][part["name"]] = {"filename": filename, "size": size}
+            part = reader.next_part()
+        return result
+
+    def save_part(self, reader, file_path, sd, max_file_size, view):
+        """
+        Copy the current multipart part to a file, removing it if it is too large.
+
+        :return: Number of bytes written.
+        """
+        if sd is not None:
+            file = sd.with_open(file_path, "wb")
+            full_path = f"/sd/{file_path}"
+        else:
+            file = open(file_path, "wb")
+            full_path = file_path
+        if file is None:
+            raise ValueError(f"Could not open '{file_path}' for writing")
+
+        size = 0
+        complete = False
+        try:
+            count = reader.readinto(view)
+            while count:
+                size += count
+                if max_file_size is not None and size > max_file_size:
+                    raise ValueError(f"File '{file_path}' is too large")
+                file.write(view[:count])
+                count = reader.readinto(view)
+            complete = True
+        finally:
+            file.close()
+            if not complete:
+                # Do not leave a partial file behind
+                os.remove(full_path)
+            if sd is not None and sd.auto_mount:
+                sd.unmount()
+        return size
+
+    def allowed_methods(self, path):
+        """
+        Return the Allow header value of a route.
+
+        :param path: Normalized route path.
+        """
+        methods = list(self.routes[path])
+        if "GET" in methods and "HEAD" not in methods:
+            methods.append("HEAD")
+        if "OPTIONS" not in methods:
+            methods.append("OPTIONS")
+        return ", ".join(methods)
+
+    def options_headers(self, path):
+        """
+        Return the headers of the automatic OPTIONS (and CORS preflight) response.
+
+        :param path: Normalized route path.
+        """
+        allowed = self.allowed_methods(path)
+        response_headers = {"Allow": allowed, "Connection": "close"}
+        if self.cors_origin:
+            response_headers["Access-Control-Allow-Methods"] = allowed
+            response_headers["Access-Control-Allow-Headers"] = "Content-Type"
+            response_headers["Access-Control-Max-Age"] = "86400"
+        return response_headers
+
+    def unpack_response(self, handler_response, status_line, response_headers):
+        """
+        Split a handler's return value into its content and status line.
+
+        Handlers return either the content alone, (content, status_line), or
+        (content, status_line, headers) where headers are added to the response.
+
+        :param handler_response: Value returned by the handler.
+        :param status_line: Default status line.
+        :param response_headers: Response headers to update.
+        :return: Tuple of (response_content, status_line).
+        """
+        if not isinstance(handler_response, tuple):
+            return handler_response, status_line
+        if len(handler_response) > 2:
+            response_headers.update(handler_response[2])
+        return handler_response[0], handler_response[1]
+
+    def handle_client(self, addr):
+        """
+        Read, handle and answer a single request from the current client.
+
+        :param addr: Address of the client.
+        """
+        started = ticks_ms()
+        self.response_status = None
+        self.response_bytes = 0
+        request = None
+        try:
+            request = self.read_request(addr)
+            if (
+                request is None
+                or self.accept_websocket(request)
+                or self.subscribe_events(request)
+                or self.serve_cached(request)
+            ):
+                return
+            status_line, response_headers, response_content = self.handle_request(
+                request
+            )
+            self.respond(request, status_line, response_headers, response_content)
+        finally:
+            self.finish_request(request, started)
+
+    def finish_request(self, request, started):
+        """
+        Log a finished request and record it in the metrics and access log.
+
+        :param request: The parsed Request, or None if it was rejected while reading.
+        :param started: ticks_ms() when the client was accepted.
+        """
+        stream = request.stream if request is not None else None
+        if stream is not None and self.metrics is not None:
+            # Counted here, not in BodyStream, so the handler core never updates metrics
+            self.metrics.bytes_in += stream.socket_bytes
+        status_line = self.response_status
+        if status_line is None:
+            return  # Nothing was sent (e.g., the client disconnected)
+        if self.log_requests and request is not None:
+            print(f'"{request.request_line}" {status_line.strip()}')
+        elapsed_ms = ticks_diff(ticks_ms(), started)
+        if self.metrics is not None:
+            route = None
+            if request is not None and request.path in self.routes:
+                route = request.path
+            self.metrics.record(route, status_line, elapsed_ms)
+        if self.access_log is not None:
+            if request is not None:
+                method, path = request.method, request.path
+            else:
+                method, path = "-", "-"
+            self.access_log.record(
+                method, path, int(status_line[:3]), elapsed_ms, self.response_bytes
+            )
+            self.access_log.maybe_flush()
+
+    def request_url(self, request):
+        """Return the path and query string of a request, used as the cache key."""
+        return f"{request.path}?{request.query}" if request.query else request.path
+
+    def serve_cached(self, request) -> bool:
+        """
+        Answer a request from the response cache if its route is cached.
+
+        Automatic OPTIONS/CORS preflight responses are encoded once per route
+        and answered from here as well.
+
+        :param request: The parsed Request.
+        :return: True if the response was sent from the cache.
+        """
+        if request.method == "OPTIONS":
+            route_methods = self.routes.get(request.path)
+            if not route_methods or "OPTIONS" in route_methods:
+                return False
+            response = self.options_responses.get(request.path)
+            if response is None:
+                response = bytes(
+                    self.build_headers(
+                        "204 No Content\r\n", self.options_headers(request.path)
+                    )
+                )
+                self.options_responses[request.path] = response
+            self.sendall(response)
+            self.response_status = "204 No Content\r\n"
+            return True
+
+        if self.route_cache_key(request) is None:
+            return False
+        response = self.cache_lookup(
+            self.cache_url(request, self.accepts_gzip(request))
+        )
+        if response is None:
+            return False
+        if request.method == "HEAD":
+            # Send only the header block of the cached response
+            header_end = find_bytes(response, b"\r\n\r\n", 0, len(response)) + 4
+            response = memoryview(response)[:header_end]
+        self.sendall(response)
+        self.response_status = "200 OK\r\n"
+        return True
+
+    def respond(self, request, status_line, response_headers, response_content):
+        """
+        Send a handler's response to the current client, storing it in the cache
+        when the route is cached.
+
+        :param request: The parsed Request.
+        :param status_line: Status line without the protocol (e.g., "200 OK\\r\\n").
+        :param response_headers: Dictionary of response headers.
+        :param response_content: Response body as returned by handle_request().
+        """
+        accepts_gzip = self.accepts_gzip(request)
+        compressible = self.compress and self.is_compressible(response_headers)
+        if compressible:
+            # Set on the identity variant too, so shared caches keep them apart
+            response_headers["Vary"] = "Accept-Encoding"
+        compress = accepts_gzip and compressible
+
+        cache_key = self.route_cache_key(request)
+        if cache_key is not None and status_line[:3] == "200":
+            body, response_content = self.collect_body(
+                response_content, self.cache_size
+            )
+            if body is not None:
+                # Compressed once here; later requests are answered from the cache
+                if compress and len(body) >= self.compress_min_size:
+                    body = self.compress_bytes(body)
+                    response_headers["Content-Encoding"] = "gzip"
+                response_headers["Content-Length"] = len(body)
+                header_block = self.build_headers(status_line, response_headers)
+                response = bytes(header_block) + body
+                self.cache_store(
+                    self.cache_url(request, accepts_gzip),
+                    cache_key,
+                    response,
+                    request.cache_generation,
+                )
+                self.sendall(header_block if request.method == "HEAD" else response)
+                return
+
+        # Send the response
+        self.send_response(
+            status_line,
+            response_headers,
+            response_content,
+            send_body=request.method != "HEAD",
+            compress=compress,
+        )
+
+    def cache_url(self, request, accepts_gzip):
+        """
+        Return the response cache URL of a request.
+
+        Clients that accept gzip get their own cache entry, so both variants are
+        encoded (and compressed) only once per content version.
+        """
+        url = self.request_url(request)
+        return url + "#gzip" if accepts_gzip else url
+
+    def route_cache_key(self, request):
+        """
+        Return the invalidation key of the cached route matching a request, or None.
+
+        :param request: The parsed Request.
+        """
+        if request.method not in ("GET", "HEAD"):
+            return None
+        route_methods = self.routes.get(request.path)
+        if not route_methods or "GET" not in route_methods:
+            return None
+        return route_methods["GET"].get("cache")
+
     def run(self):
         if not self.server:
             print("Server is not started. Call start() before run().")
             return
 
+        # Wake up at the access log's flush interval, so its buffered entries
+        # reach the file on an idle server too
+        idle_ms = -1
+        if self.access_log is not None and self.access_log.file_path is not None:
+            idle_ms = self.access_log.flush_interval_ms
+            self.server.settimeout(idle_ms / 1000)
+
         print("Server is running. Press Ctrl+C to stop.")
         while True:
             try:
-                self.client, addr = self.server.accept()
-                buffer = b""  # Initialize an empty buffer for the incoming data
-                keep_alive = False  # Disable keep-alive
+                if self.access_log is not None:
+                    self.access_log.maybe_flush()
+                # With WebSockets open, wait for frames and new clients together
+                if self.websockets and not self.poll_websockets(idle_ms):
+                    continue
+                try:
+                    self.client, addr = self.server.accept()
+                except OSError as e:
+                    if is_timeout(e):
+                        continue  # Idle
+                    raise
+                if self.metrics is not None:
+                    self.metrics.open_connections += 1
                 if self.led:
                     self.led.off()
-                while True:
-                    try:
-                        data = self.client.recv(1024)
-                        if not data:
-                            print(f"Client {addr} disconnected.")
-                            break
-                        buffer += data
-                        if self.led:
-                            self.led.on()
-                        # Check if we've received all headers
-                        header_end = buffer.find(b"\r\n\r\n")
-                        if header_end == -1:
-                            # Headers not fully received yet
-                            continue
-
-                        # Split headers and body
-                        headers_part = buffer[:header_end].decode("utf-8", "ignore")
-                        body_part = buffer[header_end + 4 :]
-
-                        # Parse request line and headers
-                        lines = headers_part.split("\r\n")
-                        request_line = lines[0]
-                        try:
-                            method, path, protocol = request_line.split()
-                        except ValueError:
-                            self.client.close()
-                            print(
-                                f"Malformed request line from {addr}. Connection closed."
-                            )
-                            if self.led:
-                                self.led.off()
-                            break
-
-                        headers = {}
-                        for header_line in lines[1:]:
-                            if not header_line:
-                                continue
-                            parts = header_line.split(": ", 1)
-                            if len(parts) == 2:
-                                headers[parts[0].lower()] = parts[1]
-
-                        # Regardless of client headers, set keep_alive = False
-                        keep_alive = False
-
-                        # Determine content length
-                        content_length = int(headers.get("content-length", "0"))
-
-                        # Check if the entire body has been received
-                        if len(body_part) < content_length:
-                            # Need to read more data
-                            while len(body_part) < content_length:
-                                more_data = self.client.recv(1024)
-                                if not more_data:
-                                    break
-                                body_part += more_data
-
-                        body = body_part[:content_length]
-
-                        # Normalize path (remove query parameters and trailing slash)
-                        if "?" in path:
-                            path = path.split("?")[0]
-                        path = path.rstrip("/") if path != "/" else path
-
-                        # Initialize response variables
-                        response_content = ""
-                        status_line = "200 OK\r\n"  # Default status
-                        response_headers = {
-                            "Content-Type": "text/html",
-                            "Connection": "close",
-                        }
-
-                        # Handle the request based on the method and path
-                        if path in self.routes:
-                            route_methods = self.routes[path]
-                            if method in route_methods:
-                                route_info = self.routes[path][method]
-                                handler = route_info["handler"]
-
-                                if method == "GET":
-                                    # Execute the handler for GET (no data)
-                                    if handler:
-                                        try:
-                                            response_content = handler()
-                                        except Exception as handler_e:
-                                            print(
-                                                f"Handler error for path '{path}': {handler_e}"
-                                            )
-                                            response_content = "<h1>500 Internal Server Error</h1><p>Handler execution failed.</p>"
-                                            status_line = (
-                                                "500 Internal Server Error\r\n"
-                                            )
-
-                                elif method == "POST":
-                                    # Determine Content-Type
-                                    content_type_header = headers.get(
-                                        "content-type", ""
-                                    )
-
-                                    if "application/json" in content_type_header:
-                                        # Parse JSON data
-                                        try:
-                                            parsed_body = json.loads(
-                                                body.decode("utf-8")
-                                            )
-                                        except ValueError as ve:
-                                            print(f"JSON decoding error: {ve}")
-                                            response_content = "<h1>400 Bad Request</h1><p>Invalid JSON.</p>"
-                                            status_line = "400 Bad Request\r\n"
-                                            parsed_body = None
-                                    else:
-                                        # Assume URL-encoded
-                                        try:
-                                            parsed_body = {}
-                                            for pair in body.decode("utf-8").split("&"):
-                                                if "=" in pair:
-                                                    key, value = pair.split("=", 1)
-                                                    parsed_body[key] = value.replace(
-                                                        "+", " "
-                                                    )
-                                        except Exception as e:
-                                            print(f"Error parsing POST data: {e}")
-                                            parsed_body = {}
-
-                                    # Execute the handler with the parsed data
-                                    try:
-                                        handler_response = handler(parsed_body)
-                                        # Determine if handler returned a tuple or single value
-                                        if isinstance(handler_response, tuple):
-                                            response_content, handler_status_line = (
-                                                handler_response
-                                            )
-                                            status_line = handler_status_line
-                                        else:
-                                            response_content = handler_response
-                                            # status_line remains "200 OK\r\n"
-                                    except Exception as handler_e:
-                                        print(
-                                            f"Handler error for path '{path}': {handler_e}"
-                                        )
-                                        response_content = "<h1>500 Internal Server Error</h1><p>Handler execution failed.</p>"
-                                        status_line = "500 Internal Server Error\r\n"
-                        elif path == "/":
-                            # Handle Home page (assuming GET)
-                            if method == "GET":
-                                response_content = self.webpage()
-                            else:
-                                status_line = "405 Method Not Allowed\r\n"
-                                response_headers["Content-Type"] = "text/html"
-                                response_content = "<h1>405 Method Not Allowed</h1>"
-                        else:
-                            # Path not found
-                            status_line = "404 Not Found\r\n"
-                            response_headers["Content-Type"] = "text/html"
-                            response_content = "<h1>404 Not Found</h1>"
-
-                        # Build the full HTTP response
-                        response = f"HTTP/1.1 {status_line}"
-                        for header, value in response_headers.items():
-                            response += f"{header}: {value}\r\n"
-                        response += "\r\n"
-                        response += response_content
-
-                        # Send the response
-                        self.client.send(response.encode("utf-8"))
-                        print(f'"{request_line}" {status_line.strip()}')
-
-                        # Remove the processed request from the buffer
-                        buffer = buffer[header_end + 4 + content_length :]
-                        if self.led:
-                            self.led.off()
-                        break  # Close connection after response
-
-                    except OSError as e:
-                        if e.args and e.args[0] == errno.ETIMEDOUT:
-                            print(f"Connection with {addr} timed out.")
-                        else:
-                            print(f"OS error: {e}")
-                        if self.led:
-                            self.led.off()
-                        break
-                    except Exception as e:
-                        print(f"Unexpected error: {e}")
-                        if self.led:
-                            self.led.off()
-                        break
-                    finally:
-                        if self.led:
-                            self.led.off()
+                try:
+                    self.handle_client(addr)  # Close connection after response
+                except OSError as e:
+                    if is_timeout(e):
+                        print(f"Connection with {addr} timed out.")
+                    else:
+                        print(f"OS error: {e}")
+                except Exception as e:
+                    print(f"Unexpected error: {e}")
+                finally:
+                    if self.led:
+                        self.led.off()
 
-                # Close the client connection
-                self.client.close()
+                # Close the client connection, unless it was handed to an event stream or WebSocket
+                if self.client is not None:
+                    self.client.close()
+                    if self.metrics is not None:
+                        self.metrics.open_connections -= 1
             except KeyboardInterrupt:
                 self.close("Server stopped by user")
                 break
@@ -431,3 +2997,182 @@ class EasyServer:
             finally:
                 if self.led:
                     self.led.off()
+
+    def run_dual_core(self, queue_size=2, stream_buffers=4, stream_buffer_size=1024):
+        """
+        Run the server with network I/O and application logic on separate cores.
+
+        A second thread (core 1 on the RP2040) accepts clients, parses requests
+        into one of `queue_size` preallocated receive buffers, answers cached
+        routes and sends responses. Parsed requests are passed to the handlers,
+        which run on the calling thread (core 0), through a bounded lock-protected
+        queue, and responses come back the same way. Handlers that touch the SD
+        card therefore no longer stall accepting and receiving. Streamed
+        responses (generators and open files) are drained on the handler core
+        into `stream_buffers` pooled buffers, which the network core sends, so
+        it never reads storage itself.
+
+        :param queue_size: Number of requests that can be in flight at once.
+        :param stream_buffers: Number of buffers shared by streamed responses.
+        :param stream_buffer_size: Size of each streaming buffer in bytes.
+        """
+        if not self.server:
+            print("Server is not started. Call start() before run_dual_core().")
+            return
+
+        self.request_queue = Queue(queue_size)
+        self.response_queue = Queue(queue_size)
+        self.event_queue = Queue(8)
+        self.stream_lock = _thread.allocate_lock()
+        self.stream_buffers = []
+        for _ in range(stream_buffers):
+            buffer = bytearray(stream_buffer_size)
+            self.stream_buffers.append((buffer, memoryview(buffer)))
+        self.running = True
+        _thread.start_new_thread(self.network_loop, (queue_size,))
+
+        print("Server is running on both cores. Press Ctrl+C to stop.")
+        try:
+            while self.running:
+                request = self.request_queue.get()
+                if request is None:
+                    time.sleep(0.001)
+                    continue
+                try:
+                    response = self.handle_request(request)
+                except Exception as e:
+                    print(f"Unexpected error: {e}")
+                    response = (
+                        "500 Internal Server Error\r\n",
+                        {"Content-Type": "text/html", "Connection": "close"},
+                        ERROR_PAGES["500 Internal Server Error\r\n"],
+                    )
+                content = response[2]
+                pipe = None
+                if content is not None and not isinstance(content, EAGER_TYPES):
+                    # Generators and files are drained here, not on the network core
+                    pipe_type = FilePipe if hasattr(content, "readinto") else BodyPipe
+                    pipe = pipe_type(self.stream_buffers, self.stream_lock)
+                    response = (response[0], response[1], pipe)
+                # The response queue never fills up: at most queue_size requests are in flight
+                self.response_queue.put((request, response))
+                if pipe is not None:
+                    pipe.fill(content)
+        except KeyboardInterrupt:
+            self.running = False
+            self.close("Server stopped by user")
+        finally:
+            self.running = False
+            self.event_queue = None
+
+    def network_loop(self, queue_size):
+        """
+        Accept clients, read requests and send responses for run_dual_core().
+
+        :param queue_size: Number of receive buffers to preallocate.
+        """
+        size = self.max_header_size + self.max_body_size
+        free_buffers = []
+        for _ in range(queue_size):
+            buffer = bytearray(size)
+            free_buffers.append((buffer, memoryview(buffer)))
+        # Poll instead of blocking in accept() so finished responses go out
+        # promptly: every 1 ms while handlers are busy, every 5 ms when idle
+        poll_ms = 0
+
+        while self.running:
+            self.send_finished(free_buffers)
+            self.send_events()
+            if self.access_log is not None:
+                self.access_log.maybe_flush()
+            wait_ms = 1 if len(free_buffers) < queue_size else 5
+            if wait_ms != poll_ms:
+                poll_ms = wait_ms
+                self.server.settimeout(poll_ms / 1000)
+            if self.websockets and not self.poll_websockets(poll_ms):
+                continue
+            try:
+                client, addr = self.server.accept()
+            except OSError:
+                continue  # Nothing to accept yet
+
+            self.client = client
+            client.settimeout(None)
+            started = ticks_ms()
+            self.response_status = None
+            self.response_bytes = 0
+            if self.metrics is not None:
+                self.metrics.open_connections += 1
+            # While every pool buffer is in flight, read into the server's own
+            # buffer so cached routes are still answered immediately
+            buffers = (
+                free_buffers.pop()
+                if free_buffers
+                else (self.recv_buffer, self.recv_view)
+            )
+            queued = False
+            request = None
+            try:
+                request = self.read_request(addr, *buffers)
+                if (
+                    request is not None
+                    and not self.accept_websocket(request)
+                    and not self.subscribe_events(request)
+                    and not self.serve_cached(request)
+                ):
+                    request.started = started
+                    if buffers[0] is self.recv_buffer:
+                        while not free_buffers and self.running:
+                            time.sleep(0.001)
+                            self.send_finished(free_buffers)
+                        buffers = free_buffers.pop()
+                        request.move_to(*buffers)
+                    request.client = client
+                    request.buffers = buffers
+                    queued = self.request_queue.put(request)
+            except OSError as e:
+                print(f"OS error: {e}")
+            except Exception as e:
+                print(f"Unexpected error: {e}")
+            finally:
+                if not queued:
+                    self.finish_request(request, started)
+                    # Event stream and WebSocket connections stay open
+                    if self.client is not None:
+                        client.close()
+                        if self.metrics is not None:
+                            self.metrics.open_connections -= 1
+                    if buffers[0] is not self.recv_buffer:
+                        free_buffers.append(buffers)
+                    if self.led:
+                        self.led.off()
+
+    def send_finished(self, free_buffers):
+        """
+        Send the responses the handlers have finished and release their buffers.
+
+        :param free_buffers: Pool of (buffer, view) pairs to return buffers to.
+        """
+        current_client = self.client
+        item = self.response_queue.get()
+        while item is not None:
+            request, response = item
+            self.client = request.client
+            self.response_status = None
+            self.response_bytes = 0
+            try:
+                self.respond(request, *response)
+            except Exception as e:
+                print(f"Error sending response to {request.addr}: {e}")
+            finally:
+                if isinstance(response[2], BodyPipe):
+                    response[2].close()  # Unblocks fill() if the body was not read
+                self.finish_request(request, request.started)
+                self.client.close()
+                if self.metrics is not None:
+                    self.metrics.open_connections -= 1
+                free_buffers.append(request.buffers)
+                if self.led:
+                    self.led.off()
+            item = self.response_queue.get()
+        self.client = current_client
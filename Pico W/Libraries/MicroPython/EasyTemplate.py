@@ -0,0 +1,193 @@
+# Description: A small precompiled HTML template engine for EasyServer handlers on the Raspberry Pi Pico W with MicroPython.
+#
+# Templates are compiled once into pre-encoded static byte segments plus
+# expression slots, so rendering only converts the values that change and
+# streams the result chunk by chunk (return render() from an EasyServer handler).
+#
+# Syntax:
+#   {{ name }} or {{ entry.temperature }}       insert a value (dict keys or attributes), HTML-escaped
+#   {{ name|raw }}                              insert a value as is (only for trusted HTML)
+#   {% for entry in weather %}...{% endfor %}   loop, with an optional {% else %} for empty loops
+#   {% if name %}...{% else %}...{% endif %}    conditional
+
+_VAR = 0
+_FOR = 1
+_IF = 2
+
+_MISSING = object()
+
+# Characters escaped in inserted values, in replacement order ("&" first)
+_ESCAPES = (
+    ("&", "&amp;"),
+    ("<", "&lt;"),
+    (">", "&gt;"),
+    ('"', "&quot;"),
+    ("'", "&#39;"),
+)
+_BYTE_ESCAPES = tuple((char.encode(), entity.encode()) for char, entity in _ESCAPES)
+
+
+def escape(text):
+    """Escape & < > " and ' in a str or bytes value for HTML text and attributes."""
+    for char, entity in _BYTE_ESCAPES if isinstance(text, bytes) else _ESCAPES:
+        if char in text:
+            text = text.replace(char, entity)
+    return text
+
+
+class EasyTemplate:
+    def __init__(self, source: str, missing: str = ""):
+        """
+        Compile a template.
+
+        :param source: Template source.
+        :param missing: Text inserted for values that are not in the context.
+        """
+        self.missing = missing
+        self.nodes = self.compile(source)
+
+    @classmethod
+    def from_file(cls, file_path: str, missing: str = ""):
+        """Compile a template stored on flash or SD (e.g., "/sd/www/index.html")."""
+        with open(file_path, "r") as f:
+            return cls(f.read(), missing)
+
+    def compile(self, source: str) -> list:
+        """Compile template source into a list of nodes."""
+        root = []
+        stack = []  # [node, tag, open branch] of the enclosing blocks
+        current = root
+        position = 0
+        length = len(source)
+        while position < length:
+            var_start = source.find("{{", position)
+            tag_start = source.find("{%", position)
+            if var_start == -1 and tag_start == -1:
+                self.add_static(current, source[position:])
+                break
+            if tag_start == -1 or (var_start != -1 and var_start < tag_start):
+                end = source.find("}}", var_start)
+                if end == -1:
+                    raise ValueError("Unclosed '{{' in template")
+                self.add_static(current, source[position:var_start])
+                expression = source[var_start + 2 : end].strip()
+                raw = expression.endswith("|raw")
+                if raw:
+                    expression = expression[:-4]
+                current.append((_VAR, self.parse_path(expression), raw))
+                position = end + 2
+                continue
+
+            end = source.find("%}", tag_start)
+            if end == -1:
+                raise ValueError("Unclosed '{%' in template")
+            self.add_static(current, source[position:tag_start])
+            position = end + 2
+            words = source[tag_start + 2 : end].split()
+            if not words:
+                raise ValueError("Empty '{% %}' tag in template")
+            tag = words[0]
+
+            if tag == "for":
+                if len(words) != 4 or words[2] != "in":
+                    raise ValueError("Expected '{% for name in value %}'")
+                node = (_FOR, words[1], self.parse_path(words[3]), [], [])
+                current.append(node)
+                stack.append([node, "for", current])
+                current = node[3]
+            elif tag == "if":
+                if len(words) != 2:
+                    raise ValueError("Expected '{% if value %}'")
+                node = (_IF, self.parse_path(words[1]), [], [])
+                current.append(node)
+                stack.append([node, "if", current])
+                current = node[2]
+            elif tag == "else":
+                if not stack:
+                    raise ValueError("'{% else %}' outside of a block")
+                current = stack[-1][0][-1]
+            elif tag in ("endfor", "endif"):
+                if not stack or "end" + stack[-1][1] != tag:
+                    raise ValueError(f"Unexpected '{{% {tag} %}}'")
+                # Continue in the branch that was open around the block
+                current = stack.pop()[2]
+            else:
+                raise ValueError(f"Unknown template tag '{tag}'")
+
+        if stack:
+            raise ValueError(f"Unclosed '{{% {stack[-1][1]} %}}' block")
+        return root
+
+    def add_static(self, nodes: list, text: str):
+        """Append a static text segment, pre-encoded to bytes."""
+        if text:
+            nodes.append(text.encode("utf-8"))
+
+    def parse_path(self, expression: str) -> tuple:
+        """Parse a dotted lookup such as 'entry.temperature'."""
+        expression = expression.strip()
+        if not expression:
+            raise ValueError("Empty expression in template")
+        return tuple(expression.split("."))
+
+    def lookup(self, path: tuple, context: dict):
+        """Resolve a dotted lookup against the context."""
+        value = context.get(path[0], _MISSING)
+        for part in path[1:]:
+            if value is _MISSING:
+                break
+            if isinstance(value, dict):
+                value = value.get(part, _MISSING)
+            else:
+                value = getattr(value, part, _MISSING)
+        return value
+
+    def render(self, context: dict = None):
+        """
+        Render the template as a generator of str/bytes chunks.
+
+        :param context: Dictionary of values used by the template.
+        """
+        return self.render_nodes(self.nodes, dict(context) if context else {})
+
+    def render_nodes(self, nodes: list, context: dict):
+        """Yield the chunks of a list of compiled nodes."""
+        for node in nodes:
+            if isinstance(node, bytes):
+                yield node
+            elif node[0] == _VAR:
+                value = self.lookup(node[1], context)
+                if value is _MISSING or value is None:
+                    yield self.missing
+                elif isinstance(value, (int, float)):
+                    yield str(value)  # Nothing to escape
+                elif node[2]:
+                    yield value if isinstance(value, (str, bytes)) else str(value)
+                elif isinstance(value, (str, bytes)):
+                    yield escape(value)
+                else:
+                    yield escape(str(value))
+            elif node[0] == _FOR:
+                name = node[1]
+                items = self.lookup(node[2], context)
+                is_empty = True
+                if items is not _MISSING and items is not None:
+                    for item in items:
+                        is_empty = False
+                        context[name] = item
+                        yield from self.render_nodes(node[3], context)
+                if is_empty:
+                    yield from self.render_nodes(node[4], context)
+            else:
+                value = self.lookup(node[1], context)
+                if value is not _MISSING and value:
+                    yield from self.render_nodes(node[2], context)
+                else:
+                    yield from self.render_nodes(node[3], context)
+
+    def render_bytes(self, context: dict = None) -> bytes:
+        """Render the whole template into bytes (for small templates)."""
+        return b"".join(
+            chunk.encode("utf-8") if isinstance(chunk, str) else chunk
+            for chunk in self.render(context)
+        )
@@ -0,0 +1,100 @@
+"""
+Ingest rate of WeatherServer: readings per second stored through one
+POST /weather per reading, against POST /weather/batch with a JSON array and
+with NDJSON (one reading per line). Each request goes through a localhost
+socket to WeatherServer.run().
+"""
+
+import contextlib
+import io
+import json
+import os
+import tempfile
+import threading
+import time
+
+import common
+import weather_server
+
+SINGLE = 200
+BATCH = 2000
+
+
+def post(port, path, body, content_type="application/json"):
+    """POST `body` and return the response body."""
+    response = common.http_request(
+        port,
+        b"POST %s HTTP/1.1\r\nHost: pico\r\nContent-Type: %s\r\n"
+        b"Content-Length: %d\r\n\r\n%s"
+        % (path, content_type.encode(), len(body), body),
+    )
+    return response.split(b"\r\n\r\n", 1)[1]
+
+
+def timed(post_readings, count):
+    """Return the readings per second of post_readings()."""
+    started = time.perf_counter()
+    post_readings()
+    return count / (time.perf_counter() - started)
+
+
+with tempfile.TemporaryDirectory() as directory:
+    os.chdir(directory)
+    # The server prints a line per request (redirect_stdout applies to every thread)
+    with contextlib.redirect_stdout(io.StringIO()):
+        weather = weather_server.WeatherServer("ssid", "password", capacity=20000)
+        start = weather.server.start
+        started = threading.Event()
+
+        def start_on_free_port(port=80):
+            # start() blinks the LED for 3.5 s after binding; wait that out
+            result = start(port=0)
+            started.set()
+            return result
+
+        weather.server.start = start_on_free_port
+        threading.Thread(target=weather.run, daemon=True).start()
+        started.wait()
+        port = weather.server.server.getsockname()[1]
+
+        # Readings one minute apart, ending before the server's clock
+        timestamps = iter(range(int(time.time()) - 10 * BATCH * 60, 2**31, 60))
+        readings = lambda count: [
+            {"temperature": 20 + i % 50 / 10, "time": next(timestamps)}
+            for i in range(count)
+        ]
+
+        single = readings(SINGLE)
+        array = json.dumps(readings(BATCH)).encode()
+        ndjson = "\n".join(json.dumps(entry) for entry in readings(BATCH)).encode()
+        results = (
+            (
+                "single POST /weather",
+                timed(
+                    lambda: [
+                        post(port, b"/weather", json.dumps(entry).encode())
+                        for entry in single
+                    ],
+                    SINGLE,
+                ),
+            ),
+            (
+                "batch, JSON array",
+                timed(lambda: post(port, b"/weather/batch", array), BATCH),
+            ),
+            (
+                "batch, NDJSON",
+                timed(
+                    lambda: post(
+                        port, b"/weather/batch", ndjson, "application/x-ndjson"
+                    ),
+                    BATCH,
+                ),
+            ),
+        )
+        stored = len(weather.stations[0].store)
+    os.chdir(common.HERE)
+
+for name, rate in results:
+    print(f"{name:20s} {rate:8.0f} readings/s")
+print(f"{stored} of {SINGLE + 2 * BATCH} readings stored")
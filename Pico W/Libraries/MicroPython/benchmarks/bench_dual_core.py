@@ -0,0 +1,83 @@
+"""
+Compare EasyServer.run() with run_dual_core().
+
+1. Latency of a cached route while two clients keep a slow route busy. The
+   slow handler sleeps 20 ms, standing in for an SD card read.
+2. Throughput of a streamed (generator) response. In dual-core mode the
+   generator is drained on the handler core and sent from pooled buffers.
+
+On CPython the GIL runs one thread at a time, so the streaming numbers show
+the cost of the hand-off between the cores rather than a speed-up.
+"""
+
+import threading
+import time
+
+import common
+from EasyServer import EasyServer
+
+CHUNK = b"x" * 512
+STREAM_CHUNKS = 512  # 256 KB
+
+
+def slow():
+    time.sleep(0.02)
+    return "slow"
+
+
+def fast():
+    return "fast"
+
+
+def stream():
+    for _ in range(STREAM_CHUNKS):
+        yield CHUNK
+
+
+def fast_latency(port):
+    """Return the median and 90th percentile /fast latency in ms under /slow load."""
+    busy = True
+
+    def load():
+        while busy:
+            common.http_request(port, b"GET /slow HTTP/1.1\r\n\r\n")
+
+    loaders = [threading.Thread(target=load) for _ in range(2)]
+    for loader in loaders:
+        loader.start()
+    latencies = []
+    for _ in range(50):
+        started = time.perf_counter()
+        common.http_request(port, b"GET /fast HTTP/1.1\r\n\r\n")
+        latencies.append((time.perf_counter() - started) * 1000)
+    busy = False
+    for loader in loaders:
+        loader.join()
+    latencies.sort()
+    return latencies[25], latencies[45]
+
+
+def stream_rate(port):
+    """Return the best streaming rate in MB/s over five requests."""
+
+    def once():
+        started = time.perf_counter()
+        response = common.http_request(port, b"GET /stream HTTP/1.1\r\n\r\n")
+        elapsed = time.perf_counter() - started
+        assert len(response) > len(CHUNK) * STREAM_CHUNKS
+        return elapsed
+
+    return len(CHUNK) * STREAM_CHUNKS / common.best_of(5, once) / 1e6
+
+
+for dual_core in (False, True):
+    server = EasyServer("ssid", "password", log_requests=False)
+    server.add_route("/slow", slow)
+    server.add_route("/fast", fast, cache=True)
+    server.add_route("/stream", stream)
+    port = common.start(server, dual_core)
+    common.http_request(port, b"GET /fast HTTP/1.1\r\n\r\n")  # Fill the cache
+    mode = "run_dual_core()" if dual_core else "run()"
+    median, p90 = fast_latency(port)
+    print(f"{mode:16s} /fast under load: median {median:.1f} ms, p90 {p90:.1f} ms")
+    print(f"{mode:16s} streamed body: {stream_rate(port):.1f} MB/s")
@@ -0,0 +1,46 @@
+"""
+Measure EasyServer request parsing: requests per second and the peak heap
+used by one request, for a browser GET and a form POST.
+
+The requests come from in-memory sockets, so the numbers cover reading,
+parsing, routing and building the response, without the network stack.
+"""
+
+import tracemalloc
+
+import common
+from EasyServer import EasyServer
+
+BROWSER_HEADERS = (
+    b"Host: 192.168.1.50\r\n"
+    b"User-Agent: Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36\r\n"
+    b"Accept: text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8\r\n"
+    b"Accept-Language: en-US,en;q=0.9\r\n"
+    b"Accept-Encoding: gzip, deflate\r\n"
+    b"Connection: keep-alive\r\n"
+)
+FORM = b"temperature=72.5&time=2024-04-27+14%3A00"
+REQUESTS = {
+    "GET": b"GET /weather?page=2 HTTP/1.1\r\n" + BROWSER_HEADERS + b"\r\n",
+    "POST form": b"POST /weather HTTP/1.1\r\n"
+    + BROWSER_HEADERS
+    + b"Content-Type: application/x-www-form-urlencoded\r\n"
+    + b"Content-Length: %d\r\n\r\n" % len(FORM)
+    + FORM,
+}
+COUNT = 5000
+
+server = EasyServer("ssid", "password", log_requests=False)
+server.add_route("/weather", lambda: "ok", query=True)
+server.add_route("/weather", lambda data: "ok", method="POST")
+
+for name, request in REQUESTS.items():
+    seconds = common.best_of(5, lambda: common.serve_in_memory(server, request, COUNT))
+    common.serve_in_memory(server, request, 10)  # Warm up before tracing
+    tracemalloc.start()
+    base = tracemalloc.get_traced_memory()[0]
+    tracemalloc.reset_peak()
+    common.serve_in_memory(server, request, 1)
+    peak = tracemalloc.get_traced_memory()[1] - base
+    tracemalloc.stop()
+    print(f"{name:10s} {COUNT / seconds:8.0f} requests/s, peak heap {peak} bytes")
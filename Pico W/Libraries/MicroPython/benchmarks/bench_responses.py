@@ -0,0 +1,67 @@
+"""
+Measure what EasyServer spends on building responses.
+
+1. Time per request for a 200 page, a 404 and a 405, with in-memory sockets.
+2. build_headers(), which copies pre-encoded status and header lines into
+   the reusable header buffer, against formatting and encoding the same
+   header block with f-strings, as responses were built before.
+"""
+
+import time
+import tracemalloc
+
+import common
+from EasyServer import EasyServer
+
+REQUESTS = {
+    "200 page": b"GET /page HTTP/1.1\r\nHost: pico\r\n\r\n",
+    "404": b"GET /missing HTTP/1.1\r\nHost: pico\r\n\r\n",
+    "405": b"PUT /page HTTP/1.1\r\nHost: pico\r\n\r\n",
+}
+COUNT = 5000
+HEADERS = {"Content-Type": "text/html", "Connection": "close", "Content-Length": 1234}
+CALLS = 100000
+
+
+def format_headers(http_type, status_line, response_headers):
+    """The header block built with f-strings and encoded as a whole."""
+    headers = f"{http_type} {status_line}"
+    for header, value in response_headers.items():
+        headers += f"{header}: {value}\r\n"
+    return (headers + "\r\n").encode("utf-8")
+
+
+server = EasyServer("ssid", "password", log_requests=False)
+server.add_route("/page", lambda: "<p>Hello from the Pico W</p>")
+
+for name, request in REQUESTS.items():
+    seconds = common.best_of(5, lambda: common.serve_in_memory(server, request, COUNT))
+    print(f"{name:9s} {seconds / COUNT * 1e6:6.2f} us per request")
+
+
+def time_calls(build):
+    started = time.perf_counter()
+    for _ in range(CALLS):
+        build("200 OK\r\n", dict(HEADERS))
+    return (time.perf_counter() - started) / CALLS * 1e6
+
+
+def peak_heap(build):
+    build("200 OK\r\n", dict(HEADERS))
+    headers = dict(HEADERS)
+    tracemalloc.start()
+    base = tracemalloc.get_traced_memory()[0]
+    tracemalloc.reset_peak()
+    build("200 OK\r\n", headers)
+    peak = tracemalloc.get_traced_memory()[1] - base
+    tracemalloc.stop()
+    return peak
+
+
+builders = (
+    ("f-strings", lambda status, headers: format_headers("HTTP/1.1", status, headers)),
+    ("build_headers()", server.build_headers),
+)
+for name, build in builders:
+    microseconds = common.best_of(5, lambda: time_calls(build))
+    print(f"{name:16s} {microseconds:.2f} us, peak heap {peak_heap(build)} bytes")
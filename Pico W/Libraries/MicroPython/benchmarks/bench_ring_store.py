@@ -0,0 +1,80 @@
+"""
+POST /weather latency with 360 and 100k stored readings.
+
+Times WeatherServer.handle_post_weather(), which appends one record to the
+ring file, against the weather.json read-modify-write that POST did before:
+read and parse the whole file, append, trim and rewrite it.
+"""
+
+import contextlib
+import io
+import json
+import os
+import tempfile
+import time
+
+import common
+import weather_server
+
+SIZES = (360, 100000)
+
+
+def post_json(filename, entry, max_values):
+    """The previous POST: rewrite the whole JSON history."""
+    with open(filename) as f:
+        data = json.load(f)
+    data["weather"].append(entry)
+    data["weather"] = data["weather"][-max_values:]
+    with open(filename, "w") as f:
+        json.dump(data, f)
+
+
+def latencies(post, count):
+    """Return the median and the longest of `count` calls of post(i), in ms."""
+    times = []
+    for i in range(count):
+        started = time.perf_counter()
+        post(i)
+        times.append((time.perf_counter() - started) * 1000)
+    return common.median(times), max(times)
+
+
+for size in SIZES:
+    with tempfile.TemporaryDirectory() as directory:
+        os.chdir(directory)
+        # Readings one minute apart, ending before the server's clock
+        first = int(time.time()) - (size + 1000) * 60
+        with contextlib.redirect_stdout(io.StringIO()):
+            weather = weather_server.WeatherServer("ssid", "password", capacity=size)
+            station = weather.stations[0]
+            station.begin()
+            for i in range(size):
+                station.add(first + i * 60, 20 + i % 50 / 10)
+            station.commit()
+
+            def post_ring(i):
+                timestamp = first + (size + i) * 60
+                weather.handle_post_weather({"temperature": 21.5, "time": timestamp})
+
+            ring = latencies(post_ring, 200)
+
+        entries = [
+            {"temperature": 20 + i % 50 / 10, "time": "2024-04-27 14:00"}
+            for i in range(size)
+        ]
+        with open("weather.json", "w") as f:
+            json.dump({"weather": entries}, f)
+
+        def post_file(i):
+            entry = {"temperature": 21.5, "time": "2024-04-27 14:01"}
+            post_json("weather.json", entry, size)
+
+        rewrite = latencies(post_file, 200 if size < 10000 else 10)
+        os.chdir(common.HERE)
+
+    print(
+        f"{size:6d} readings, ring file: median {ring[0]:.3f} ms, max {ring[1]:.3f} ms"
+    )
+    print(
+        f"{size:6d} readings, JSON file: median {rewrite[0]:.3f} ms, max {rewrite[1]:.3f} ms"
+    )
@@ -0,0 +1,131 @@
+"""
+Compare EasyTemplate with f-strings for a dashboard-style page: a static
+head with CSS, one table row per reading and a static tail. The page is
+built as one f-string (the original dashboard), streamed as one f-string
+per row, and rendered by EasyTemplate. Each is sent through
+EasyServer.send_chunks(), as the server does. The script then times the
+WeatherServer dashboard itself.
+
+Reports the render time and the peak heap of one render.
+"""
+
+import contextlib
+import io
+import os
+import tempfile
+import time
+import tracemalloc
+
+import common
+from EasyServer import EasyServer
+from EasyTemplate import EasyTemplate
+
+STYLE = """
+        <style>
+            body { font-family: Arial, sans-serif; background-color: #f0f8ff; margin: 0; padding: 20px; }
+            h1 { text-align: center; color: #333; }
+            table { width: 100%; border-collapse: collapse; margin: 20px 0; }
+            th, td { padding: 12px; border: 1px solid #ddd; text-align: center; }
+            th { background-color: #4CAF50; color: white; }
+            tr:nth-child(even) { background-color: #f2f2f2; }
+        </style>"""
+HEAD = f"""<!DOCTYPE html>
+<html lang="en">
+    <head><meta charset="UTF-8"><title>Weather Dashboard</title>{STYLE}</head>
+    <body>
+        <h1>Weather Dashboard</h1>
+        <table>
+            <tr><th>Temperature</th><th>Time</th></tr>
+"""
+TAIL = """        </table>
+    </body>
+</html>
+"""
+TEMPLATE = EasyTemplate(
+    HEAD
+    + """{% for entry in weather %}<tr><td>{{ entry.temperature }}°F</td><td>{{ entry.time }}</td></tr>
+{% else %}<tr><td colspan='2'>No data available.</td></tr>{% endfor %}
+"""
+    + TAIL
+)
+READINGS = [
+    {
+        "temperature": 70.0 + i % 10 / 4,
+        "time": f"2024-04-27 {i // 60 % 24:02d}:{i % 60:02d}",
+    }
+    for i in range(360)
+]
+
+
+def render_one_fstring(weather):
+    """The whole page as one f-string."""
+    rows = "".join(
+        f"<tr><td>{entry['temperature']}°F</td><td>{entry['time']}</td></tr>\n"
+        for entry in weather
+    )
+    yield f"{HEAD}{rows or '<tr><td colspan=2>No data available.</td></tr>'}{TAIL}"
+
+
+def render_fstrings(weather):
+    """One f-string per row, streamed."""
+    yield HEAD
+    if not weather:
+        yield "<tr><td colspan='2'>No data available.</td></tr>"
+    for entry in weather:
+        yield f"<tr><td>{entry['temperature']}°F</td><td>{entry['time']}</td></tr>\n"
+    yield TAIL
+
+
+def render_template(weather):
+    return TEMPLATE.render({"weather": weather})
+
+
+def measure(server, render, rounds=200):
+    """Return the ms per render and the peak heap of one render, sent through `server`."""
+    server.client = common.MemoryClient(b"")
+
+    def timed():
+        started = time.perf_counter()
+        for _ in range(rounds):
+            server.send_chunks(render())
+        return (time.perf_counter() - started) / rounds * 1000
+
+    milliseconds = common.best_of(5, timed)
+    tracemalloc.start()
+    base = tracemalloc.get_traced_memory()[0]
+    tracemalloc.reset_peak()
+    server.send_chunks(render())
+    peak = tracemalloc.get_traced_memory()[1] - base
+    tracemalloc.stop()
+    return milliseconds, peak
+
+
+server = EasyServer("ssid", "password")
+for name, render in (
+    ("one f-string", render_one_fstring),
+    ("f-string rows", render_fstrings),
+    ("EasyTemplate", render_template),
+):
+    milliseconds, peak = measure(server, lambda: render(READINGS))
+    print(
+        f"{name:13s} 360 rows: {milliseconds:.3f} ms per render, peak heap {peak} bytes"
+    )
+
+# The real dashboard, one page of readings from the ring file
+with tempfile.TemporaryDirectory() as directory:
+    os.chdir(directory)
+    import weather_server
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        weather = weather_server.WeatherServer("ssid", "password", capacity=1000)
+        timestamp = 1714220000
+        for i in range(1000):
+            weather.add_reading(timestamp + i * 60, 20 + i % 50 / 10)
+    milliseconds, peak = measure(
+        weather.server, lambda: weather.handle_get_weather({}), rounds=50
+    )
+    rows = weather_server.DASHBOARD_ROWS
+    print(
+        f"WeatherServer dashboard ({rows} rows): {milliseconds:.3f} ms per render, peak heap {peak} bytes"
+    )
+    os.chdir(common.HERE)
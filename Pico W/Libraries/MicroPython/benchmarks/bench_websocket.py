@@ -0,0 +1,102 @@
+"""
+WebSocket echo benchmark: round-trip time of a small JSON command through an
+EasyServer WebSocket route, compared with one HTTP request per command.
+Runs with run() and with run_dual_core().
+"""
+
+import base64
+import hashlib
+import os
+import socket
+import struct
+import time
+
+import common
+from EasyServer import EasyServer
+
+MESSAGE = b'{"x": 512, "y": 300, "button": 0}'
+MESSAGES = 3000
+HTTP_REQUESTS = 500
+
+
+def frame(opcode, payload):
+    """Build a masked client frame."""
+    mask = os.urandom(4)
+    header = bytes([0x80 | opcode])
+    if len(payload) < 126:
+        header += bytes([0x80 | len(payload)])
+    else:
+        header += bytes([0x80 | 126]) + struct.pack(">H", len(payload))
+    masked = bytes(byte ^ mask[i & 3] for i, byte in enumerate(payload))
+    return header + mask + masked
+
+
+def receive_exactly(client, size):
+    data = b""
+    while len(data) < size:
+        chunk = client.recv(size - len(data))
+        if not chunk:
+            raise OSError("Connection closed")
+        data += chunk
+    return data
+
+
+def receive_frame(client):
+    """Return the payload of the next (unmasked) server frame."""
+    header = receive_exactly(client, 2)
+    size = header[1] & 0x7F
+    if size == 126:
+        size = struct.unpack(">H", receive_exactly(client, 2))[0]
+    return receive_exactly(client, size)
+
+
+def connect(port):
+    """Open a WebSocket to /ws and complete the handshake."""
+    client = socket.create_connection(("127.0.0.1", port))
+    client.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    key = base64.b64encode(os.urandom(16))
+    client.sendall(
+        b"GET /ws HTTP/1.1\r\nHost: pico\r\nUpgrade: websocket\r\n"
+        b"Connection: Upgrade\r\nSec-WebSocket-Key: "
+        + key
+        + b"\r\nSec-WebSocket-Version: 13\r\n\r\n"
+    )
+    response = b""
+    while b"\r\n\r\n" not in response:
+        response += client.recv(1)
+    accept = hashlib.sha1(key + b"258EAFA5-E914-47DA-95CA-C5AB0DC85B11").digest()
+    assert base64.b64encode(accept) in response, response
+    return client
+
+
+def echo(websocket, message):
+    return message
+
+
+for dual_core in (False, True):
+    server = EasyServer("ssid", "password", log_requests=False)
+    server.add_websocket("/ws", echo)
+    server.add_route("/command", lambda: "ok")
+    port = common.start(server, dual_core)
+    mode = "run_dual_core()" if dual_core else "run()"
+
+    client = connect(port)
+    latencies = []
+    for _ in range(MESSAGES):
+        started = time.perf_counter()
+        client.sendall(frame(1, MESSAGE))
+        assert receive_frame(client) == MESSAGE
+        latencies.append((time.perf_counter() - started) * 1000)
+    client.close()
+    latencies.sort()
+    print(
+        f"{mode:16s} WebSocket echo: median {common.median(latencies):.3f} ms, "
+        f"p99 {latencies[len(latencies) * 99 // 100]:.3f} ms"
+    )
+
+    latencies = []
+    for _ in range(HTTP_REQUESTS):
+        started = time.perf_counter()
+        common.http_request(port, b"GET /command HTTP/1.1\r\n\r\n")
+        latencies.append((time.perf_counter() - started) * 1000)
+    print(f"{mode:16s} HTTP request:   median {common.median(latencies):.3f} ms")
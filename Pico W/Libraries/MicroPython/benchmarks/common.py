@@ -0,0 +1,146 @@
+"""
+Helpers shared by the EasyServer and WeatherServer benchmarks.
+
+The benchmarks run on CPython. The machine, network, uos and micropython
+modules in this directory stand in for MicroPython's, and _thread runs the
+network core of EasyServer.run_dual_core() as a thread. Run a benchmark from
+any directory, e.g. `python3 bench_requests.py`.
+
+CPython numbers compare two versions of the code on the same machine; they
+are not Pico W timings. Take the best of several rounds, as the helpers
+below do, since desktop timings vary from run to run.
+"""
+
+import contextlib
+import io
+import os
+import socket
+import sys
+import threading
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+LIBRARIES = os.path.dirname(HERE)
+WEATHER_LCD = os.path.join(
+    LIBRARIES, os.pardir, os.pardir, "Projects", "MicroPython", "WeatherLCD"
+)
+sys.path[:0] = [HERE, LIBRARIES, os.path.normpath(WEATHER_LCD)]
+
+
+class MemoryClient:
+    """A client socket that sends one canned request and discards the response."""
+
+    def __init__(self, request):
+        self.request = memoryview(request)
+        self.position = 0
+        self.sent = 0
+
+    def recv_into(self, buffer, size=0):
+        count = min(len(buffer), len(self.request) - self.position)
+        buffer[:count] = self.request[self.position : self.position + count]
+        self.position += count
+        return count
+
+    def recv(self, size):
+        data = bytes(self.request[self.position : self.position + size])
+        self.position += len(data)
+        return data
+
+    def send(self, data):
+        self.sent += len(data)
+        return len(data)
+
+    def sendall(self, data):
+        self.sent += len(data)
+
+    def settimeout(self, timeout):
+        pass
+
+    def setsockopt(self, *args):
+        pass
+
+    def close(self):
+        pass
+
+
+class MemoryListener:
+    """
+    A listening socket that hands out `count` MemoryClients, then stops
+    EasyServer.run() with KeyboardInterrupt.
+    """
+
+    def __init__(self, request, count):
+        self.request = request
+        self.count = count
+
+    def accept(self):
+        self.count -= 1
+        if self.count < 0:
+            raise KeyboardInterrupt
+        return MemoryClient(self.request), ("127.0.0.1", 50000)
+
+    def settimeout(self, timeout):
+        pass
+
+    def close(self):
+        pass
+
+
+def serve_in_memory(server, request, count):
+    """
+    Answer a canned request `count` times with server.run(), without sockets.
+
+    :return: Seconds taken.
+    """
+    server.server = MemoryListener(request, count)
+    with contextlib.redirect_stdout(io.StringIO()):
+        started = time.perf_counter()
+        server.run()
+        return time.perf_counter() - started
+
+
+def best_of(rounds, function):
+    """Return the smallest of `rounds` results of function()."""
+    return min(function() for _ in range(rounds))
+
+
+def start(server, dual_core=False):
+    """
+    Start an EasyServer on a free localhost port and serve it from a thread.
+
+    :param dual_core: Serve with run_dual_core() instead of run().
+    :return: The port.
+    """
+    # Hide the start-up messages (redirect_stdout applies to every thread)
+    with contextlib.redirect_stdout(io.StringIO()):
+        if not server.start(port=0):
+            raise OSError("Could not start the server")
+        target = server.run_dual_core if dual_core else server.run
+        threading.Thread(target=target, daemon=True).start()
+        time.sleep(0.1)
+    return server.server.getsockname()[1]
+
+
+def http_request(port, raw):
+    """
+    Send a raw HTTP request to localhost and return the whole response.
+
+    :param raw: Request bytes, headers and body.
+    """
+    client = socket.create_connection(("127.0.0.1", port))
+    try:
+        client.sendall(raw)
+        response = b""
+        while True:
+            data = client.recv(65536)
+            if not data:
+                return response
+            response += data
+    finally:
+        client.close()
+
+
+def median(values):
+    """Return the median of a list of numbers."""
+    values = sorted(values)
+    return values[len(values) // 2]
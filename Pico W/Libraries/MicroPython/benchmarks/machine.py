@@ -0,0 +1,28 @@
+"""
+CPython stand-in for the parts of MicroPython's machine module used by the
+libraries, so the benchmarks can import them on a desktop.
+"""
+
+
+class Pin:
+    IN = 0
+    OUT = 1
+
+    def __init__(self, *args, **kwargs):
+        self.state = 0
+
+    def on(self):
+        self.state = 1
+
+    def off(self):
+        self.state = 0
+
+    def value(self, state=None):
+        if state is None:
+            return self.state
+        self.state = state
+
+
+class SPI:
+    def __init__(self, *args, **kwargs):
+        pass
@@ -0,0 +1,5 @@
+"""CPython stand-in for MicroPython's micropython module."""
+
+
+def const(value):
+    return value
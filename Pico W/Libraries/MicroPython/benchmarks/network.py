@@ -0,0 +1,33 @@
+"""
+CPython stand-in for MicroPython's network module. The WLAN reports that it
+is already connected, so EasyServer.start() only opens the listening socket.
+"""
+
+STA_IF = 0
+AP_IF = 1
+
+
+class WLAN:
+    def __init__(self, mode):
+        self.mode = mode
+        self.is_active = False
+
+    def active(self, state=None):
+        if state is None:
+            return self.is_active
+        self.is_active = state
+
+    def isconnected(self):
+        return True
+
+    def connect(self, ssid, password):
+        pass
+
+    def disconnect(self):
+        pass
+
+    def config(self, **kwargs):
+        pass
+
+    def ifconfig(self):
+        return ("127.0.0.1", "255.0.0.0", "127.0.0.1", "127.0.0.1")
@@ -0,0 +1,3 @@
+"""CPython stand-in for MicroPython's uos module."""
+
+from os import *  # noqa: F401,F403
@@ -12,7 +12,7 @@ import errno
 
 
 class WeatherLCD:
-    def __init__(self, ssid, password) -> WeatherLCD:
+    def __init__(self, ssid, password, station=0) -> WeatherLCD:
         self.is_connected = False
         self.lcd = EasyLCD()
         self.http = EasyHTTP(ssid, password)
@@ -25,6 +25,7 @@ class WeatherLCD:
         self.rtc = RTC()
         self.lat = None
         self.lon = None
+        self.station = station  # Station ID sent with every reading
 
     def start(self) -> bool:
         self.lcd.write(" Connecting to \n  WiFi now....  ", True)
@@ -108,7 +109,11 @@ class WeatherLCD:
                 if len(self.weather) <= 7:
                     temperature = self.weather.split()[0]
                     self.get_time() # update self.last_time
-                    data = {"temperature": temperature, "time": self.last_time}
+                    data = {
+                        "temperature": temperature,
+                        "time": self.last_time,
+                        "station": self.station,
+                    }
                     headers = {
                         "User-Agent": "micropython-urequests/1.1",
                         "Content-Type": "application/json",
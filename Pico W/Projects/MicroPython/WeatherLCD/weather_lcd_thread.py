@@ -17,7 +17,7 @@ stop_thread = False
 
 
 class WeatherLCD:
-    def __init__(self, ssid, password) -> WeatherLCD:
+    def __init__(self, ssid, password, station=0) -> WeatherLCD:
         self.is_connected = False
         self.lcd = EasyLCD()
         self.http = EasyHTTP(ssid, password)
@@ -30,6 +30,7 @@ class WeatherLCD:
         self.rtc = RTC()
         self.lat = None
         self.lon = None
+        self.station = station  # Station ID sent with every reading
 
     def start(self) -> bool:
         self.lcd.write(" Connecting to \n  WiFi now....  ", True)
@@ -112,7 +113,11 @@ class WeatherLCD:
                 # Write to LCD
                 if len(self.weather) <= 7:
                     temperature = self.weather.split()[0]
-                    data = {"temperature": temperature, "time": self.last_time}
+                    data = {
+                        "temperature": temperature,
+                        "time": self.last_time,
+                        "station": self.station,
+                    }
                     headers = {
                         "User-Agent": "micropython-urequests/1.1",
                         "Content-Type": "application/json",
@@ -6,16 +6,1387 @@ Use the weather_lcd.py script to display the weather data on an LCD screen and s
 
 import json
 import network
-from EasyServer import EasyServer
+import os
+import struct
+import time
+from array import array
+from EasyServer import EasyServer, find_bytes
 from EasySD import EasySD
+from EasyTemplate import EasyTemplate
 import gc
 
 
+# Weather dashboard, compiled once at import time
+WEATHER_TEMPLATE = EasyTemplate(
+    """
+        <!DOCTYPE html>
+        <html lang="en">
+        <head>
+            <meta charset="UTF-8">
+            <title>Weather Dashboard</title>
+            <style>
+                body {
+                    font-family: Arial, sans-serif;
+                    background-color: #f0f8ff;
+                    margin: 0;
+                    padding: 20px;
+                }
+                h1 {
+                    text-align: center;
+                    color: #333;
+                }
+                table {
+                    width: 100%;
+                    border-collapse: collapse;
+                    margin: 20px 0;
+                }
+                th, td {
+                    padding: 12px;
+                    border: 1px solid #ddd;
+                    text-align: center;
+                }
+                th {
+                    background-color: #4CAF50;
+                    color: white;
+                }
+                tr:nth-child(even) {
+                    background-color: #f2f2f2;
+                }
+                .form-container {
+                    background-color: #fff;
+                    padding: 20px;
+                    border-radius: 5px;
+                    box-shadow: 0 0 10px rgba(0,0,0,0.1);
+                    max-width: 500px;
+                    margin: 0 auto;
+                }
+                .form-container input[type="number"],
+                .form-container input[type="text"] {
+                    width: 100%;
+                    padding: 10px;
+                    margin: 5px 0 15px 0;
+                    border: 1px solid #ccc;
+                    border-radius: 4px;
+                }
+                .form-container input[type="submit"] {
+                    background-color: #4CAF50;
+                    color: white;
+                    padding: 10px 20px;
+                    border: none;
+                    border-radius: 4px;
+                    cursor: pointer;
+                }
+                .form-container input[type="submit"]:hover {
+                    background-color: #45a049;
+                }
+                .message {
+                    display: inline-block;
+                    padding: 20px;
+                    background-color: #d4edda;
+                    color: #155724;
+                    border: 1px solid #c3e6cb;
+                    border-radius: 5px;
+                    margin-top: 20px;
+                }
+                .pages, .chart {
+                    text-align: center;
+                }
+                .pages a {
+                    margin: 0 10px;
+                }
+            </style>
+        </head>
+        <body>
+            <h1>Weather Dashboard</h1>
+            {% if stations %}<h2>Station {{ station }}</h2>
+            <p class="pages">Stations:{% for other in stations %} <a href="{{ other.url }}">{{ other.station }}</a>{% endfor %}</p>{% endif %}
+            {% if live %}<p class="chart"><img src="{{ chart }}" alt="Temperature of the last day"></p>{% endif %}
+            <table id="weather">
+                <tr>
+                    <th>Temperature</th>
+                    <th>Time</th>
+                </tr>
+                {% for entry in weather %}<tr><td>{{ entry.temperature }}°F</td><td>{{ entry.time }}</td></tr>
+                {% else %}<tr id="no-data"><td colspan='2'>No data available.</td></tr>{% endfor %}
+            </table>
+            <p class="pages">
+                {% if newer %}<a href="{{ newer }}">&larr; Newer</a>{% endif %}
+                Page {{ page }} of {{ pages }}
+                {% if older %}<a href="{{ older }}">Older &rarr;</a>{% endif %}
+            </p>
+            <p class="pages"><a href="{{ export }}">Download CSV</a></p>
+
+            <div class="form-container">
+                <h2>Add New Weather Data</h2>
+                <form action="/weather" method="POST">
+                    <label for="temperature">Temperature (°F):</label>
+                    <input type="number" id="temperature" name="temperature" required>
+
+                    <label for="time">Time:</label>
+                    <input type="text" id="time" name="time" placeholder="e.g., 2024-04-27 14:00" required>
+                    <input type="hidden" name="station" value="{{ station }}">
+
+                    <input type="submit" value="Submit">
+                </form>
+            </div>
+            {% if live %}<script>
+                // Add new readings as they are posted instead of reloading the page
+                var events = new EventSource("/events");
+                events.addEventListener("reading", function (e) {
+                    var entry = JSON.parse(e.data);
+                    if (entry.station !== {{ station }}) {
+                        return;
+                    }
+                    var empty = document.getElementById("no-data");
+                    if (empty) {
+                        empty.remove();
+                    }
+                    var row = document.getElementById("weather").insertRow(1);
+                    row.insertCell(0).textContent = entry.temperature + "°F";
+                    row.insertCell(1).textContent = entry.time;
+                });
+            </script>{% endif %}
+        </body>
+        </html>
+        """,
+    missing="N/A",
+)
+
+LOGS_TEMPLATE = EasyTemplate(
+    """
+        <!DOCTYPE html>
+        <html lang="en">
+        <head>
+            <meta charset="UTF-8">
+            <meta name="viewport" content="width=device-width, initial-scale=1.0">
+            <title>Logs</title>
+            <style>
+                body {
+                    font-family: Arial, sans-serif;
+                    background-color: #f4f6f9;
+                    color: #333;
+                    padding: 20px;
+                    margin: 0;
+                }
+                h1 {
+                    text-align: center;
+                    color: #444;
+                }
+                .log-table {
+                    width: 100%;
+                    max-width: 100%;
+                    border-collapse: collapse;
+                    margin: 20px 0;
+                    background-color: #fff;
+                    box-shadow: 0 0 10px rgba(0, 0, 0, 0.1);
+                }
+                .log-table th, .log-table td {
+                    padding: 12px;
+                    border: 1px solid #ddd;
+                    text-align: left;
+                    white-space: pre-wrap;
+                    word-wrap: break-word;
+                }
+                .log-table th {
+                    background-color: #007bff;
+                    color: white;
+                }
+                .log-table tr:nth-child(even) {
+                    background-color: #f2f2f2;
+                }
+            </style>
+        </head>
+        <body>
+            <h1>Logs</h1>
+            <table class="log-table">
+                <tr>
+                    <th>Log Entry</th>
+                </tr>
+                {% for entry in logs %}<tr><td>{{ entry }}</td></tr>
+                {% else %}<tr><td>No logs available.</td></tr>{% endfor %}
+            </table>
+        </body>
+        </html>
+        """
+)
+
+
+# Binary ring files: a header, then `capacity` fixed-size records
+STORE_MAGIC = b"WRNG"
+STORE_VERSION = 2
+HEADER_FORMAT = "<4sHHI"  # magic, version, record size, capacity
+HEADER_SIZE = 32
+COMMIT_FORMAT = "<IIH"  # head, tail, check
+COMMIT_OFFSETS = (12, 22)  # Two commit slots in the header, written alternately
+READ_BATCH = 32  # Records read at once while iterating
+BATCH_BUFFER_SIZE = 1024  # Receive buffer of POST /weather/batch
+DASHBOARD_ROWS = 50  # Readings per dashboard page
+STATION_INDEX = "stations.bin"  # IDs of the stations that posted readings
+LOG_FILE = "logs.txt"  # Newest log segment; older ones are logs.txt.1, .2, ...
+LOG_SEGMENTS = 4
+LOG_SEGMENT_SIZE = 4096  # Bytes per log segment before it is rotated
+LOG_BUFFER_SIZE = 512  # Log lines buffered in RAM before they are appended
+LOG_LINES = 100  # Newest log lines shown at /logs
+MAX_STATIONS = 64
+MAX_CLOCK_SKEW = 300  # Seconds a reading may be ahead of the server's clock
+CLOCK_SET_AFTER = 1704067200  # 2024-01-01: an earlier clock was never set
+CHART_WIDTH = 480  # Default size of /weather/chart.svg in pixels
+CHART_HEIGHT = 200
+CHART_WINDOW = 86400  # Default time window of the chart (the last day)
+CHART_MARGIN = 40  # Space left of the plot for the temperature labels
+CHART_FOOTER = 20  # Space below the plot for the time labels
+
+# Rollup resolutions: name, period in seconds, periods kept
+# (a week of 5 minutes, about two months of hours and three years of days)
+ROLLUPS = (("5min", 300, 2016), ("hour", 3600, 1464), ("day", 86400, 1100))
+
+
+def days_from_civil(year, month, day):
+    """Return the number of days from 1970-01-01 to a date."""
+    year -= month <= 2
+    era = year // 400
+    year_of_era = year - era * 400
+    day_of_year = (153 * (month + (-3 if month > 2 else 9)) + 2) // 5 + day - 1
+    day_of_era = year_of_era * 365 + year_of_era // 4 - year_of_era // 100 + day_of_year
+    return era * 146097 + day_of_era - 719468
+
+
+def civil_from_days(days):
+    """Return the (year, month, day) of a number of days since 1970-01-01."""
+    days += 719468
+    era = days // 146097
+    day_of_era = days - era * 146097
+    year_of_era = (
+        day_of_era - day_of_era // 1460 + day_of_era // 36524 - day_of_era // 146096
+    ) // 365
+    day_of_year = day_of_era - (
+        365 * year_of_era + year_of_era // 4 - year_of_era // 100
+    )
+    month_index = (5 * day_of_year + 2) // 153
+    day = day_of_year - (153 * month_index + 2) // 5 + 1
+    month = month_index + 3 if month_index < 10 else month_index - 9
+    return year_of_era + era * 400 + (month <= 2), month, day
+
+
+def days_in_month(year, month):
+    """Return the number of days in a month of the Gregorian calendar."""
+    if month == 2:
+        return 29 if year % 4 == 0 and (year % 100 != 0 or year % 400 == 0) else 28
+    return 30 if month in (4, 6, 9, 11) else 31
+
+
+def parse_time(value) -> int:
+    """
+    Convert a reading's time to a Unix timestamp.
+
+    Accepts a timestamp, "YYYY-MM-DD HH:MM[:SS]", the WeatherLCD's
+    "M/D/YYYY H:M:S", or a time of day alone (dated with the server's clock).
+
+    :param value: Time as a number or string.
+    :return: Seconds since 1970-01-01.
+    :raises ValueError: If the time cannot be parsed or does not exist (e.g. 2/31).
+    """
+    if isinstance(value, (int, float)):
+        # Checked before int(), which raises OverflowError for inf and NaN
+        if not 0 <= value <= 0xFFFFFFFF:
+            raise ValueError(f"Invalid time '{value}'")
+        return int(value)
+    value = str(value).strip()
+    if value.isdigit():
+        return int(value)
+    parts = value.replace("T", " ").split()
+    if len(parts) == 1 and ":" in parts[0]:
+        year, month, day = time.localtime()[:3]
+        clock = parts[0]
+    elif len(parts) in (1, 2):
+        date = parts[0]
+        if "-" in date:
+            year, month, day = [int(part) for part in date.split("-")]
+        else:
+            month, day, year = [int(part) for part in date.split("/")]
+        clock = parts[1] if len(parts) == 2 else "0:0"
+    else:
+        raise ValueError(f"Invalid time '{value}'")
+    clock = [int(part) for part in clock.split(":")]
+    if len(clock) == 2:
+        clock.append(0)
+    hour, minute, second = clock
+    if not (
+        1 <= month <= 12
+        and 1 <= day <= days_in_month(year, month)
+        and 0 <= hour < 24
+        and 0 <= minute < 60
+        and 0 <= second < 60
+    ):
+        raise ValueError(f"Invalid time '{value}'")
+    return (
+        days_from_civil(year, month, day) * 86400 + hour * 3600 + minute * 60 + second
+    )
+
+
+def server_time():
+    """
+    Return the server's clock as a Unix timestamp, or None if it was never set.
+
+    Ports with a 2000 epoch are converted, so the result compares with the
+    timestamps of readings.
+    """
+    now = int(time.time())
+    if time.gmtime(0)[0] == 2000:
+        now += 946684800
+    return now if now >= CLOCK_SET_AFTER else None
+
+
+def check_clock(timestamp):
+    """
+    Reject a reading ahead of the server's clock.
+
+    Stores only accept newer readings, so a future one would block every
+    later reading of its station. Nothing is checked while the server's
+    clock is unset.
+
+    :param timestamp: Unix timestamp of the reading.
+    :raises ValueError: If the reading is more than MAX_CLOCK_SKEW ahead.
+    """
+    now = server_time()
+    if now is not None and timestamp > now + MAX_CLOCK_SKEW:
+        raise ValueError("Reading is ahead of the server's clock")
+
+
+def parse_temperature(value) -> float:
+    """
+    Convert a reading's temperature to a float.
+
+    :param value: Temperature as a number or decimal string.
+    :return: Temperature in degrees.
+    :raises ValueError: If the temperature is not finite or beyond +-327.67 degrees.
+    """
+    if isinstance(value, bool) or not isinstance(value, (int, float, str)):
+        raise ValueError(f"Invalid temperature '{value}'")
+    try:
+        temperature = float(value)
+    except OverflowError:  # Integers beyond the float range
+        raise ValueError(f"Invalid temperature '{value}'")
+    # Also false for NaN
+    if not -327.68 < temperature < 327.68:
+        raise ValueError(f"Invalid temperature '{value}'")
+    return temperature
+
+
+def parse_station(value) -> int:
+    """
+    Convert a reading's station ID to an int.
+
+    :param value: Station ID as an int or decimal string.
+    :raises ValueError: If the ID is not an integer.
+    """
+    if isinstance(value, bool) or not isinstance(value, (int, str)):
+        raise ValueError(f"Invalid station '{value}'")
+    return int(value)
+
+
+def format_time(timestamp) -> str:
+    """Format a Unix timestamp as "YYYY-MM-DD HH:MM:SS"."""
+    year, month, day = civil_from_days(timestamp // 86400)
+    seconds = timestamp % 86400
+    return "%04d-%02d-%02d %02d:%02d:%02d" % (
+        year,
+        month,
+        day,
+        seconds // 3600,
+        seconds // 60 % 60,
+        seconds % 60,
+    )
+
+
+def open_file(file_name, mode, sd=None):
+    """
+    Open a file on the internal flash or the SD card.
+
+    :param file_name: Name of the file.
+    :param mode: File mode (e.g., "rb").
+    :param sd: EasySD instance, or None to use the internal flash.
+    :raises OSError: If the file cannot be opened.
+    """
+    if sd is None:
+        return open(file_name, mode)
+    f = sd.with_open(file_name, mode)
+    if f is None:
+        raise OSError(f"Cannot open '{file_name}'")
+    return f
+
+
+def remove_file(file_name, sd=None):
+    """Remove a file on the internal flash or the SD card, if it exists."""
+    try:
+        os.remove(file_name if sd is None else f"/sd/{file_name}")
+    except OSError:
+        pass  # No such file
+
+
+def rename_file(old_name, new_name, sd=None):
+    """Rename a file on the internal flash or the SD card, if it exists."""
+    if sd is not None:
+        old_name, new_name = f"/sd/{old_name}", f"/sd/{new_name}"
+    try:
+        os.rename(old_name, new_name)
+    except OSError:
+        pass  # No such file
+
+
+class SegmentLog:
+    """
+    Append-only text log split into rotating segment files.
+
+    Lines are copied into a RAM buffer and appended to the newest segment
+    when the buffer is full, so logging a message is O(1) and never rewrites
+    a file. When the newest segment reaches `segment_size` bytes, the
+    segments are renamed down (logs.txt -> logs.txt.1 -> ...) and the oldest
+    one is dropped, which keeps the log under `segments` x `segment_size` bytes.
+    """
+
+    def __init__(
+        self,
+        file_name=LOG_FILE,
+        segments=LOG_SEGMENTS,
+        segment_size=LOG_SEGMENT_SIZE,
+        buffer_size=LOG_BUFFER_SIZE,
+        sd=None,
+    ):
+        """
+        Open the log.
+
+        :param file_name: Name of the newest segment (on the SD card if `sd` is given).
+        :param segments: Number of segment files kept.
+        :param segment_size: Size in bytes at which the newest segment is rotated.
+        :param buffer_size: Bytes of log lines buffered in RAM before an append.
+        :param sd: EasySD instance, or None to use the internal flash.
+        """
+        self.file_name = file_name
+        self.segments = segments
+        self.segment_size = segment_size
+        self.sd = sd
+        self.buffer = bytearray(buffer_size)
+        self.length = 0  # Bytes in the buffer
+        self.size = 0  # Bytes in the newest segment
+        self.write_count = 0  # Appends since boot
+        self.bytes_written = 0
+        try:
+            with open_file(file_name, "rb", sd) as f:
+                self.size = f.seek(0, 2)
+        except OSError:
+            pass  # No log yet
+
+    def segment(self, index):
+        """Return the file name of a segment, 0 being the newest."""
+        return self.file_name if index == 0 else f"{self.file_name}.{index}"
+
+    def write(self, message):
+        """
+        Add a line to the log.
+
+        :param message: Log message; newlines are replaced by spaces.
+        """
+        line = (message.replace("\n", " ") + "\n").encode("utf-8")
+        if self.length + len(line) > len(self.buffer):
+            self.flush()
+        if len(line) > len(self.buffer):
+            self.append(line)
+            return
+        self.buffer[self.length : self.length + len(line)] = line
+        self.length += len(line)
+
+    def flush(self):
+        """Append the buffered lines to the newest segment."""
+        if self.length:
+            self.append(memoryview(self.buffer)[: self.length])
+            self.length = 0
+
+    def append(self, data):
+        """Append bytes to the newest segment, rotating it once it is full."""
+        with open_file(self.file_name, "ab", self.sd) as f:
+            f.write(data)
+        self.size += len(data)
+        self.write_count += 1
+        self.bytes_written += len(data)
+        if self.size >= self.segment_size:
+            self.rotate()
+
+    def rotate(self):
+        """Drop the oldest segment and rename the others down by one."""
+        remove_file(self.segment(self.segments - 1), self.sd)
+        for index in range(self.segments - 2, -1, -1):
+            rename_file(self.segment(index), self.segment(index + 1), self.sd)
+        self.size = 0
+
+    def newest(self, limit=None):
+        """
+        Yield log lines newest first.
+
+        Buffered lines come first, then every segment is read backwards from
+        its end in blocks of the buffer size, so only the lines that are shown
+        are read.
+
+        :param limit: Maximum number of lines, or None for all of them.
+        """
+        if limit is None:
+            limit = -1  # Never reaches 0
+        lines = bytes(self.buffer[: self.length]).split(b"\n")
+        for line in reversed(lines):
+            if line:
+                yield line.decode("utf-8")
+                limit -= 1
+                if not limit:
+                    return
+        for index in range(self.segments):
+            try:
+                f = open_file(self.segment(index), "rb", self.sd)
+            except OSError:
+                continue  # Not rotated that far yet
+            with f:
+                position = f.seek(0, 2)
+                rest = b""  # Start of a line that began in an earlier block
+                while position:
+                    size = min(position, len(self.buffer))
+                    position -= size
+                    f.seek(position)
+                    lines = (f.read(size) + rest).split(b"\n")
+                    # The first line may continue in the previous block
+                    rest = lines[0] if position else b""
+                    for line in reversed(lines if not position else lines[1:]):
+                        if line:
+                            yield line.decode("utf-8")
+                            limit -= 1
+                            if not limit:
+                                return
+
+
+def commit_check(head, tail):
+    """Return the check value of a header commit slot (inverted Fletcher-16)."""
+    low = high = 0
+    for value in (head, tail):
+        for shift in (0, 8, 16, 24):
+            low = (low + (value >> shift & 0xFF)) % 255
+            high = (high + low) % 255
+    # Inverted, so a zero-filled slot is never valid
+    return (high << 8 | low) ^ 0xFFFF
+
+
+class RingFile:
+    """
+    Fixed-size records in a binary ring file.
+
+    The file holds a small header and `capacity` preallocated records, so
+    appending a record overwrites one record and the header in place instead
+    of rewriting the history. `head` and `tail` are sequence numbers: head
+    counts every record ever appended, tail is the sequence of the oldest one
+    still stored, and record n lives in slot n % capacity.
+
+    Every record starts with a Unix timestamp, and timestamps never decrease
+    from tail to head, so time ranges are found by binary search over the
+    records instead of a scan. Subclasses set the record layout and unpack
+    records in entry().
+
+    Appends between begin() and commit() form one transaction: they share
+    one open file and the header is written once, at commit. Records are
+    always written before the header that makes them visible, so a power cut
+    leaves the last committed state. write_count and bytes_written count the
+    writes since boot.
+
+    head and tail are committed to one of two checked slots in the header,
+    alternately, so a torn header write leaves the other slot valid. If
+    neither is, load() rebuilds head and tail from the record timestamps.
+    """
+
+    record_format = "<I"
+    record_size = 4
+
+    def __init__(self, file_name, capacity=360, sd=None):
+        """
+        Open the ring file, creating it if it does not exist.
+
+        :param file_name: Name of the file (on the SD card if `sd` is given).
+        :param capacity: Number of records kept when the file is created; an
+                         existing file keeps its own capacity.
+        :param sd: EasySD instance, or None to use the internal flash.
+        """
+        self.file_name = file_name
+        self.sd = sd
+        self.capacity = capacity
+        self.head = 0
+        self.tail = 0
+        self.last_timestamp = 0  # Timestamp of the newest record
+        self.header = bytearray(HEADER_SIZE)
+        self.commit_buffer = bytearray(struct.calcsize(COMMIT_FORMAT))
+        self.slot = 0  # Commit slot written last
+        self.record = bytearray(self.record_size)
+        self.stamp = bytearray(4)  # Timestamp read during a binary search
+        self.file = None  # Open file of the current transaction
+        self.write_count = 0
+        self.bytes_written = 0
+        self.load()
+
+    def __len__(self):
+        return self.head - self.tail
+
+    def open(self, mode):
+        """Open the ring file on flash or the SD card."""
+        return open_file(self.file_name, mode, self.sd)
+
+    def load(self):
+        """
+        Read the header of an existing ring file, or create a new one.
+
+        The history is only discarded when the file is missing or does not
+        hold records of this layout; a header without a valid commit slot is
+        rebuilt from the records instead.
+        """
+        try:
+            f = self.open("rb")
+        except OSError:
+            self.create()  # No ring file yet
+            return
+        with f:
+            version = None
+            if f.readinto(self.header) == HEADER_SIZE:
+                magic, version, record_size, capacity = struct.unpack_from(
+                    HEADER_FORMAT, self.header
+                )
+                if magic != STORE_MAGIC or record_size != self.record_size:
+                    version = None
+            if version not in (1, STORE_VERSION):
+                f.close()
+                print(f"Unrecognized ring file '{self.file_name}'. Creating a new one.")
+                self.create()
+                return
+            # The file size gives the capacity if the fixed fields were torn
+            stored = (f.seek(0, 2) - HEADER_SIZE) // self.record_size
+            self.capacity = capacity if capacity == stored else stored
+            if version == STORE_VERSION:
+                committed = self.read_commit()
+            else:
+                # Version 1 headers hold a single unchecked head and tail
+                head, tail = struct.unpack_from("<II", self.header, 12)
+                committed = tail <= head <= tail + self.capacity
+                if committed:
+                    self.head, self.tail = head, tail
+            if not committed:
+                print(f"Rebuilding the header of '{self.file_name}' from its records.")
+                self.rebuild(f)
+            if self.head != self.tail:
+                self.last_timestamp = self.timestamp_at(f, self.head - 1)
+        if version != STORE_VERSION or not committed:
+            with self.open("r+b") as f:
+                self.write_layout(f)
+
+    def read_commit(self):
+        """
+        Load head and tail from the newest valid commit slot of the header.
+
+        :return: True if a slot was valid.
+        """
+        found = False
+        for slot, offset in enumerate(COMMIT_OFFSETS):
+            head, tail, check = struct.unpack_from(COMMIT_FORMAT, self.header, offset)
+            if (
+                check == commit_check(head, tail)
+                and tail <= head <= tail + self.capacity
+                and (not found or head > self.head)
+            ):
+                self.head, self.tail, self.slot = head, tail, slot
+                found = True
+        return found
+
+    def rebuild(self, f):
+        """
+        Rebuild head and tail from the records of an open ring file.
+
+        Timestamps never decrease from tail to head, and slots without a
+        record (never written, or dropped by truncate()) are zero and form a
+        single run between the newest and the oldest record, wrapping around
+        the end of the file. With such a run, the records are the slots after
+        it up to the slots before it; without one, the ring is full and the
+        newest record is the one before the only decrease in slot order.
+
+        :param f: Open ring file.
+        """
+        size = self.record_size
+        buffer = bytearray(READ_BATCH * size)
+        view = memoryview(buffer)
+        first = None  # Timestamp of slot 0
+        previous = None
+        decrease = None  # First slot older than the slot before it
+        zero_start = None  # First slot of the zero run
+        zero_end = None  # First record after the zero run
+        slot = 0
+        f.seek(HEADER_SIZE)
+        while slot < self.capacity:
+            batch = min(READ_BATCH, self.capacity - slot)
+            f.readinto(view[: batch * size])
+            for index in range(batch):
+                stamp = struct.unpack_from("<I", buffer, index * size)[0]
+                if previous is None:
+                    first = stamp
+                elif not stamp and previous:
+                    zero_start = slot + index
+                elif stamp and not previous:
+                    zero_end = slot + index
+                elif stamp < previous and decrease is None:
+                    decrease = slot + index
+                previous = stamp
+            slot += batch
+        # The run may start or end at slot 0
+        if not first and previous:
+            zero_start = 0
+        elif first and not previous:
+            zero_end = 0
+        if zero_start is not None and zero_end is not None:
+            self.tail = zero_end
+            self.head = (
+                zero_start if zero_end < zero_start else self.capacity + zero_start
+            )
+        elif not first:
+            self.head = self.tail = 0  # No record
+        elif decrease is None:
+            self.head, self.tail = self.capacity, 0
+        else:
+            self.head, self.tail = self.capacity + decrease, decrease
+
+    def create(self):
+        """Create an empty ring file with every record preallocated."""
+        self.head = self.tail = self.last_timestamp = 0
+        zeros = bytearray(512)
+        remaining = self.capacity * self.record_size
+        with self.open("wb") as f:
+            self.write_layout(f)
+            while remaining:
+                count = min(remaining, len(zeros))
+                f.write(memoryview(zeros)[:count])
+                remaining -= count
+                self.write_count += 1
+                self.bytes_written += count
+
+    def write_layout(self, f):
+        """Write the whole header, with head and tail in the first commit slot."""
+        self.header[:] = bytes(HEADER_SIZE)
+        struct.pack_into(
+            HEADER_FORMAT,
+            self.header,
+            0,
+            STORE_MAGIC,
+            STORE_VERSION,
+            self.record_size,
+            self.capacity,
+        )
+        struct.pack_into(
+            COMMIT_FORMAT,
+            self.header,
+            COMMIT_OFFSETS[0],
+            self.head,
+            self.tail,
+            commit_check(self.head, self.tail),
+        )
+        self.slot = 0
+        f.seek(0)
+        f.write(self.header)
+        self.write_count += 1
+        self.bytes_written += HEADER_SIZE
+
+    def write_header(self, f):
+        """Commit head and tail to the older commit slot of an open ring file."""
+        self.slot ^= 1
+        struct.pack_into(
+            COMMIT_FORMAT,
+            self.commit_buffer,
+            0,
+            self.head,
+            self.tail,
+            commit_check(self.head, self.tail),
+        )
+        f.seek(COMMIT_OFFSETS[self.slot])
+        f.write(self.commit_buffer)
+        self.write_count += 1
+        self.bytes_written += len(self.commit_buffer)
+
+    def begin(self):
+        """Start a transaction: appends until commit() share one open file."""
+        self.file = self.open("r+b")
+
+    def commit(self):
+        """Write the header once for every append since begin() and close the file."""
+        if self.file is None:
+            return
+        try:
+            self.write_header(self.file)
+        finally:
+            self.file.close()
+            self.file = None
+
+    def write_record(self, timestamp, *values):
+        """
+        Append a record, overwriting the oldest one when the ring is full.
+
+        The record is written before the header, so an interrupted append
+        leaves the previous state intact. Inside a transaction the header is
+        written by commit().
+
+        :param timestamp: Unix timestamp of the record.
+        :param values: The other fields of the record.
+        :raises ValueError: If the timestamp is before 1970 or older than the newest record.
+        """
+        if not 0 <= timestamp <= 0xFFFFFFFF:
+            raise ValueError("Timestamp out of range")
+        if timestamp < self.last_timestamp:
+            raise ValueError("Reading is older than the newest stored reading")
+        struct.pack_into(self.record_format, self.record, 0, timestamp, *values)
+        if self.file is None:
+            with self.open("r+b") as f:
+                self.store_record(f)
+                self.write_header(f)
+        else:
+            self.store_record(self.file)
+        self.last_timestamp = timestamp
+
+    def store_record(self, f):
+        """Write the packed record to the head slot of an open ring file."""
+        if self.head - self.tail >= self.capacity:
+            # Full: release the oldest records in the header before they are
+            # overwritten, so an interrupted write never leaves a newer record
+            # at the tail (several at a time, to save header writes)
+            self.tail += max(1, min(READ_BATCH, self.capacity // 16))
+            self.write_header(f)
+        f.seek(HEADER_SIZE + self.head % self.capacity * self.record_size)
+        f.write(self.record)
+        self.head += 1
+        self.write_count += 1
+        self.bytes_written += self.record_size
+
+    def truncate(self, after):
+        """
+        Drop the records newer than a timestamp.
+
+        Both commit slots are written, so the dropped records never come back
+        from the slot with the higher head. The dropped slots are then zeroed,
+        as rebuild() expects of slots without a record; zeroing them after the
+        header means an interrupted truncate never exposes zeroed records.
+
+        :param after: Newest timestamp to keep.
+        :return: Number of records dropped.
+        """
+        with self.open("r+b") as f:
+            head = self.find(f, after, after=True)
+            dropped = self.head - head
+            if dropped:
+                self.head = head
+                self.last_timestamp = (
+                    self.timestamp_at(f, head - 1) if head != self.tail else 0
+                )
+                self.write_header(f)
+                self.write_header(f)
+                self.zero_records(f, head, dropped)
+        return dropped
+
+    def zero_records(self, f, sequence, count):
+        """Zero `count` record slots of an open ring file, from a sequence number on."""
+        zeros = bytearray(512)
+        while count:
+            slot = sequence % self.capacity
+            # Runs stop at the end of the file and continue at slot 0
+            run = min(count, self.capacity - slot, len(zeros) // self.record_size)
+            size = run * self.record_size
+            f.seek(HEADER_SIZE + slot * self.record_size)
+            f.write(memoryview(zeros)[:size])
+            self.write_count += 1
+            self.bytes_written += size
+            sequence += run
+            count -= run
+
+    def timestamp_at(self, f, sequence):
+        """Read the timestamp of a stored record from an open ring file."""
+        f.seek(HEADER_SIZE + sequence % self.capacity * self.record_size)
+        f.readinto(self.stamp)
+        return struct.unpack_from("<I", self.stamp)[0]
+
+    def find(self, f, timestamp, after=False):
+        """
+        Binary search for the first stored record at a timestamp or later.
+
+        :param f: Open ring file.
+        :param timestamp: Unix timestamp to look for.
+        :param after: Find the first record newer than the timestamp instead.
+        :return: Sequence number of the record, or head if there is none.
+        """
+        low, high = self.tail, self.head
+        while low < high:
+            middle = (low + high) // 2
+            stamp = self.timestamp_at(f, middle)
+            if stamp < timestamp or (after and stamp == timestamp):
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def entry(self, buffer, offset):
+        """Unpack a record into a dictionary."""
+        return {"timestamp": struct.unpack_from(self.record_format, buffer, offset)[0]}
+
+    def newest(self, limit=None, skip=0):
+        """
+        Yield stored records newest first, reading READ_BATCH records at a time.
+
+        :param limit: Maximum number of records, or None for all of them.
+        :param skip: Number of newest records to skip (e.g., earlier pages).
+        """
+        size = self.record_size
+        sequence = self.head - skip
+        # Nothing to yield when skip reaches past the oldest record
+        count = max(0, sequence - self.tail)
+        if limit is not None:
+            count = min(count, limit)
+        if count <= 0:
+            return
+        buffer = bytearray(READ_BATCH * size)
+        view = memoryview(buffer)
+        with self.open("rb") as f:
+            while count:
+                # Read a run of records that ends at the newest unread one
+                last = (sequence - 1) % self.capacity
+                batch = min(count, READ_BATCH, last + 1)
+                f.seek(HEADER_SIZE + (last - batch + 1) * size)
+                f.readinto(view[: batch * size])
+                for index in range(batch - 1, -1, -1):
+                    yield self.entry(buffer, index * size)
+                sequence -= batch
+                count -= batch
+
+    def select(self, start=None, end=None, limit=None):
+        """
+        Yield the records in a time range, oldest first.
+
+        The ends of the range are found with two binary searches, so only the
+        selected records are read.
+
+        :param start: Oldest timestamp to include, or None for the oldest record.
+        :param end: Newest timestamp to include, or None for the newest record.
+        :param limit: Maximum number of records, or None for all of them.
+        """
+        size = self.record_size
+        buffer = bytearray(READ_BATCH * size)
+        view = memoryview(buffer)
+        with self.open("rb") as f:
+            sequence = self.tail if start is None else self.find(f, start)
+            last = self.head if end is None else self.find(f, end, after=True)
+            if limit is not None:
+                last = min(last, sequence + limit)
+            while sequence < last:
+                # Read a run of records that does not wrap around the ring
+                slot = sequence % self.capacity
+                batch = min(last - sequence, READ_BATCH, self.capacity - slot)
+                f.seek(HEADER_SIZE + slot * size)
+                f.readinto(view[: batch * size])
+                for index in range(batch):
+                    yield self.entry(buffer, index * size)
+                sequence += batch
+
+
+class WeatherStore(RingFile):
+    """
+    Weather readings in a ring file of 8-byte records: Unix timestamp,
+    temperature in 1/100 degree and station ID. 8 divides the 512-byte
+    sector, so a record never straddles two.
+    """
+
+    record_format = "<IhH"
+    record_size = 8
+    columns = ("timestamp", "time", "temperature", "station")  # Of exports
+
+    def append(self, timestamp, temperature, station=0):
+        """
+        Store a reading, overwriting the oldest one when the ring is full.
+
+        :param timestamp: Unix timestamp of the reading.
+        :param temperature: Temperature in degrees.
+        :param station: Station ID (0-65535).
+        :raises ValueError: If the timestamp is before 1970 or older than the newest
+                            reading, or the temperature is outside +-327.67 degrees.
+        """
+        # Also false for NaN; checked first, as round() overflows on inf
+        if not -327.68 < temperature < 327.68:
+            raise ValueError("Temperature out of range")
+        hundredths = round(temperature * 100)
+        if not -32768 <= hundredths <= 32767:
+            raise ValueError("Temperature out of range")
+        self.write_record(timestamp, hundredths, station)
+
+    def entry(self, buffer, offset):
+        """Unpack a record into a reading dictionary."""
+        timestamp, hundredths, station = struct.unpack_from(
+            self.record_format, buffer, offset
+        )
+        return {
+            "temperature": hundredths / 100,
+            "time": format_time(timestamp),
+            "timestamp": timestamp,
+            "station": station,
+        }
+
+
+class RollupStore(RingFile):
+    """
+    Downsampled readings: the min, max and mean temperature per period.
+
+    The open period is aggregated in RAM and written as one 16-byte record
+    (start timestamp, count, min, max and mean in 1/100 degree) when the
+    first reading of the next period arrives, so each reading costs O(1)
+    time and the series uses constant memory.
+    """
+
+    record_format = "<IIhhhH"  # The last field is reserved
+    record_size = 16
+    columns = ("timestamp", "time", "count", "min", "max", "mean")  # Of exports
+
+    def __init__(self, file_name, period, capacity, sd=None):
+        """
+        Open the rollup ring file, creating it if it does not exist.
+
+        :param file_name: Name of the file (on the SD card if `sd` is given).
+        :param period: Length of one period in seconds.
+        :param capacity: Number of periods kept when the file is created.
+        :param sd: EasySD instance, or None to use the internal flash.
+        """
+        self.period = period
+        # Aggregate of the open period
+        self.start = 0
+        self.count = 0
+        self.low = 0
+        self.high = 0
+        self.total = 0
+        super().__init__(file_name, capacity, sd)
+
+    def add(self, timestamp, temperature):
+        """
+        Add a reading to its period, writing out the previous period if it ended.
+
+        :param timestamp: Unix timestamp of the reading (never older than the last one).
+        :param temperature: Temperature in degrees.
+        """
+        start = timestamp - timestamp % self.period
+        if self.count and start != self.start:
+            self.close_period()
+        hundredths = round(temperature * 100)
+        if not self.count:
+            self.start = start
+            self.low = self.high = hundredths
+            self.total = 0
+        elif hundredths < self.low:
+            self.low = hundredths
+        elif hundredths > self.high:
+            self.high = hundredths
+        self.total += hundredths
+        self.count += 1
+
+    def close_period(self):
+        """Write the open period to the ring file."""
+        mean = round(self.total / self.count)
+        self.write_record(self.start, self.count, self.low, self.high, mean, 0)
+        self.count = 0
+
+    def resume(self, store):
+        """
+        Rebuild the open period (or a new rollup) from the raw readings.
+
+        Only readings newer than the last written period are read, so at boot
+        this costs at most one period of readings.
+
+        :param store: WeatherStore holding the raw readings.
+        """
+        start = self.last_timestamp + self.period if len(self) else None
+        for entry in store.select(start):
+            self.add(entry["timestamp"], entry["temperature"])
+
+    def truncate(self, after, store=None):
+        """
+        Drop the periods holding readings newer than a timestamp.
+
+        :param after: Newest reading timestamp to keep.
+        :param store: WeatherStore to rebuild the open period from, or None.
+        :return: Number of periods dropped.
+        """
+        dropped = RingFile.truncate(self, after - self.period)
+        self.count = 0
+        if store is not None:
+            self.resume(store)
+        return dropped
+
+    def summary(self, start, count, low, high, mean):
+        """Return a period as a dictionary."""
+        return {
+            "time": format_time(start),
+            "timestamp": start,
+            "count": count,
+            "min": low / 100,
+            "max": high / 100,
+            "mean": mean / 100,
+        }
+
+    def entry(self, buffer, offset):
+        """Unpack a record into a period dictionary."""
+        return self.summary(*struct.unpack_from(self.record_format, buffer, offset)[:5])
+
+    def select(self, start=None, end=None, limit=None):
+        """
+        Yield the periods in a time range, oldest first, including the open one.
+
+        :param start: Oldest period start to include, or None for the oldest period.
+        :param end: Newest period start to include, or None for the newest period.
+        :param limit: Maximum number of periods, or None for all of them.
+        """
+        count = 0
+        for entry in RingFile.select(self, start, end, limit):
+            count += 1
+            yield entry
+        if (
+            self.count
+            and (start is None or self.start >= start)
+            and (end is None or self.start <= end)
+            and (limit is None or count < limit)
+        ):
+            yield self.summary(
+                self.start,
+                self.count,
+                self.low,
+                self.high,
+                round(self.total / self.count),
+            )
+
+
+class Station:
+    """
+    The ring files of one weather station: its readings and their rollups.
+
+    Station 0 keeps the file names of single-station versions (weather.bin,
+    weather_hour.bin, ...); other stations use station_<id>.bin,
+    station_<id>_hour.bin, ... Every station has its own files, so a
+    request only reads the files of the station it asks for.
+    """
+
+    def __init__(self, station_id, capacity, sd=None):
+        """
+        Open the ring files of a station, creating them if they do not exist.
+
+        :param station_id: Station ID (0-65535).
+        :param capacity: Number of readings kept when the store is created.
+        :param sd: EasySD instance, or None to use the internal flash.
+        """
+        self.id = station_id
+        prefix = f"station_{station_id}" if station_id else "weather"
+        self.store = WeatherStore(f"{prefix}.bin", capacity, sd)
+        # Rollup series, updated with every reading
+        self.rollups = {}
+        for name, period, periods in ROLLUPS:
+            rollup = RollupStore(f"{prefix}_{name}.bin", period, periods, sd)
+            rollup.resume(self.store)
+            self.rollups[name] = rollup
+
+    def add(self, timestamp, temperature):
+        """
+        Store a reading and add it to the rollups.
+
+        :param timestamp: Unix timestamp of the reading.
+        :param temperature: Temperature in degrees.
+        :raises ValueError: If the store rejects the reading.
+        """
+        self.store.append(timestamp, temperature, self.id)
+        for rollup in self.rollups.values():
+            rollup.add(timestamp, temperature)
+
+    def truncate(self, after):
+        """
+        Drop the readings newer than a timestamp, e.g. from a wrong clock.
+
+        :param after: Newest timestamp to keep.
+        :return: Number of readings dropped.
+        """
+        dropped = self.store.truncate(after)
+        for rollup in self.rollups.values():
+            rollup.truncate(after, self.store)
+        return dropped
+
+    def series(self, resolution):
+        """Return the store for "raw" or the rollup of a resolution, or None."""
+        if resolution == "raw":
+            return self.store
+        return self.rollups.get(resolution)
+
+    def ring_files(self):
+        """Return the store and the rollups."""
+        return [self.store] + list(self.rollups.values())
+
+    def begin(self):
+        """Start a transaction on the store and every rollup."""
+        for ring in self.ring_files():
+            ring.begin()
+
+    def commit(self):
+        """Commit the transaction of the store and every rollup."""
+        for ring in self.ring_files():
+            ring.commit()
+
+    def summary(self):
+        """Return the station's reading count and newest time, without reading files."""
+        timestamp = self.store.last_timestamp
+        return {
+            "station": self.id,
+            "readings": len(self.store),
+            "time": format_time(timestamp) if len(self.store) else None,
+            "timestamp": timestamp,
+        }
+
+
+def readings_json(readings):
+    """Yield readings (or rollup periods) as a JSON array, one chunk per entry."""
+    yield "["
+    separator = ""
+    for entry in readings:
+        yield separator + json.dumps(entry)
+        separator = ", "
+    yield "]"
+
+
+def chart_svg(entries, start, end, width, height):
+    """
+    Yield an SVG line chart of readings (or rollup periods) between two timestamps.
+
+    The readings are bucketed into one column per pixel that keeps the lowest
+    and highest temperature, so the polyline has at most two points per pixel
+    however many readings the window holds. Only the columns are kept in RAM;
+    the points are yielded one at a time.
+
+    :param entries: Readings or rollup periods, oldest first.
+    :param start: Timestamp at the left edge of the plot.
+    :param end: Timestamp at the right edge of the plot.
+    :param width: Width of the image in pixels.
+    :param height: Height of the image in pixels.
+    """
+    columns = width - CHART_MARGIN
+    span = max(1, end - start)
+    low = array("h", [0] * columns)
+    high = array("h", [0] * columns)
+    # 0: empty column, 1: the lowest value came first, 2: the highest came first
+    order = bytearray(columns)
+    for entry in entries:
+        column = (entry["timestamp"] - start) * (columns - 1) // span
+        if "min" in entry:
+            lowest = round(entry["min"] * 100)
+            highest = round(entry["max"] * 100)
+        else:
+            lowest = highest = round(entry["temperature"] * 100)
+        if not order[column]:
+            low[column] = lowest
+            high[column] = highest
+            order[column] = 1
+        else:
+            if lowest < low[column]:
+                low[column] = lowest
+                order[column] = 2
+            if highest > high[column]:
+                high[column] = highest
+                order[column] = 1
+
+    bottom = top = None
+    for column in range(columns):
+        if order[column]:
+            if bottom is None or low[column] < bottom:
+                bottom = low[column]
+            if top is None or high[column] > top:
+                top = high[column]
+
+    plot = height - CHART_FOOTER
+    yield (
+        '<svg xmlns="http://www.w3.org/2000/svg" '
+        f'width="{width}" height="{height}" viewBox="0 0 {width} {height}" '
+        'font-family="Arial, sans-serif" font-size="11">'
+        '<rect width="100%" height="100%" fill="#fff"/>'
+        f'<line x1="{CHART_MARGIN}" y1="{plot}" x2="{width}" y2="{plot}" stroke="#ccc"/>'
+        f'<text x="{CHART_MARGIN}" y="{height - 5}">{format_time(start)[:16]}</text>'
+        f'<text x="{width}" y="{height - 5}" text-anchor="end">'
+        f"{format_time(end)[:16]}</text>"
+    )
+    if bottom is None:
+        yield (
+            f'<text x="{(width + CHART_MARGIN) // 2}" y="{plot // 2}" '
+            'text-anchor="middle">No data available.</text></svg>'
+        )
+        return
+
+    yield (
+        f'<text x="{CHART_MARGIN - 4}" y="12" text-anchor="end">{top / 100}°F</text>'
+        f'<text x="{CHART_MARGIN - 4}" y="{plot - 4}" text-anchor="end">'
+        f"{bottom / 100}°F</text>"
+        '<polyline fill="none" stroke="#007BFF" stroke-width="1.5" points="'
+    )
+    # Leave 5 pixels above and below the line
+    inner = plot - 10
+    scale = max(1, top - bottom)
+    for column in range(columns):
+        if order[column]:
+            x = CHART_MARGIN + column
+            y_low = 5 + (top - low[column]) * inner // scale
+            y_high = 5 + (top - high[column]) * inner // scale
+            if y_low == y_high:
+                yield "%d,%d " % (x, y_low)
+            elif order[column] == 1:
+                yield "%d,%d %d,%d " % (x, y_low, x, y_high)
+            else:
+                yield "%d,%d %d,%d " % (x, y_high, x, y_low)
+    yield '"/></svg>'
+
+
+def readings_csv(readings, columns):
+    """
+    Yield readings (or rollup periods) as CSV, one chunk per line.
+
+    :param readings: Entries to export.
+    :param columns: Keys of the entries, in column order.
+    """
+    yield ",".join(columns) + "\n"
+    for entry in readings:
+        yield ",".join([str(entry[column]) for column in columns]) + "\n"
+
+
+def readings_ndjson(readings):
+    """Yield readings (or rollup periods) as NDJSON, one chunk per line."""
+    for entry in readings:
+        yield json.dumps(entry) + "\n"
+
+
 class WeatherServer:
-    def __init__(self, ssid, password):
+    def __init__(self, ssid, password, capacity=10080, station_capacity=1440):
+        """
+        Initialize the WeatherServer.
+
+        :param ssid: SSID of the Wi-Fi network.
+        :param password: Password of the Wi-Fi network.
+        :param capacity: Number of readings kept in the ring file of station 0
+                         (10080 is a week of one reading per minute, 80 KB).
+        :param station_capacity: Number of readings kept for each other station
+                                 (1440 is a day of one reading per minute, 11 KB).
+                                 With the rollups, a station takes about 85 KB,
+                                 so use an SD card for more than a few stations.
+        """
         self.ssid = ssid
         self.password = password
-        self.server = EasyServer(ssid, password, mode=network.STA_IF, use_led=True)
+        self.server = EasyServer(
+            ssid,
+            password,
+            mode=network.STA_IF,
+            use_led=True,
+            cache_size=24576,
+            compress=True,
+            log_requests=False,
+            access_log=64,
+            access_log_file="access.log",
+        )
         self.sd = None
 
         try:
@@ -24,29 +1395,86 @@ class WeatherServer:
             # No worries, save to SD card is optional
             self.sd = None
 
-    def write_to_file(self, data, filename) -> bool:
+        self.station_capacity = station_capacity
+        # Writes to the station index since boot
+        self.write_count = 0
+        self.bytes_written = 0
+        # Stations by ID, opened from the station index
+        self.stations = {0: Station(0, capacity, self.sd)}
+        self.logs = SegmentLog(sd=self.sd)
+        self.load_stations()
+        if not len(self.stations[0].store):
+            self.import_json("weather.json")
+
+    def load_stations(self):
+        """Open the ring files of every station listed in the station index."""
+        try:
+            with open_file(STATION_INDEX, "rb", self.sd) as f:
+                index = f.read()
+        except OSError:
+            return  # No station other than 0 has posted yet
+        for offset in range(0, len(index) - 1, 2):
+            station_id = struct.unpack_from("<H", index, offset)[0]
+            if station_id not in self.stations:
+                self.stations[station_id] = Station(
+                    station_id, self.station_capacity, self.sd
+                )
+
+    def get_station(self, station_id, create=False):
         """
-        Write a dictionary to a JSON file.
+        Return a station by ID.
 
-        :param data: Dictionary containing data to write.
-        :param filename: Name of the file.
-        :return: True if successful, False otherwise.
+        :param station_id: Station ID (int or decimal string).
+        :param create: Register the station if it has not posted before.
+        :raises ValueError: If the ID is invalid, the station is unknown (and
+                            `create` is False) or MAX_STATIONS is reached.
         """
-        gc.collect()
-        gc.mem_free()
-        if data is None:
-            print("Cannot write NULL data")
-            return False
-        try:
-            if not self.sd:
-                with open(filename, "w", encoding="utf-8") as f:
-                    json.dump(data, f)
-            else:
-                self.sd.write(filename, json.dumps(data))
-            return True
-        except Exception as e:
-            print(f"Failed to write to file '{filename}': {e}")
-            return False
+        station_id = int(station_id)
+        station = self.stations.get(station_id)
+        if station is None:
+            if not create:
+                raise ValueError(f"Unknown station {station_id}")
+            if not 0 < station_id <= 65535:
+                raise ValueError(f"Invalid station {station_id}")
+            if len(self.stations) >= MAX_STATIONS:
+                raise ValueError("Too many stations")
+            station = Station(station_id, self.station_capacity, self.sd)
+            # The index only grows, so new IDs are appended
+            with open_file(STATION_INDEX, "ab", self.sd) as f:
+                f.write(struct.pack("<H", station_id))
+            self.write_count += 1
+            self.bytes_written += 2
+            self.stations[station_id] = station
+        return station
+
+    def add_reading(self, timestamp, temperature, station=0):
+        """
+        Store a reading of a station and add it to the station's rollups.
+
+        :param timestamp: Unix timestamp of the reading.
+        :param temperature: Temperature in degrees.
+        :param station: Station ID; new stations are registered.
+        :raises ValueError: If the station or the reading is rejected, or the
+            reading is ahead of the server's clock.
+        """
+        check_clock(timestamp)
+        self.get_station(station, create=True).add(timestamp, temperature)
+
+    def import_json(self, filename):
+        """
+        Copy the readings of a weather.json file from earlier versions into the store.
+
+        :param filename: Name of the JSON file.
+        """
+        imported = 0
+        for entry in self.read_from_file(filename)["weather"]:
+            try:
+                self.add_reading(parse_time(entry["time"]), float(entry["temperature"]))
+                imported += 1
+            except (KeyError, TypeError, ValueError):
+                pass  # Skip entries the store cannot represent
+        if imported:
+            print(f"Imported {imported} readings from '{filename}'.")
 
     def read_from_file(self, filename) -> dict:
         """
@@ -95,150 +1523,411 @@ class WeatherServer:
             print(f"Unexpected error reading file '{filename}': {e}")
             return {"weather": []}
 
-    def handle_get_weather(self):
+    def handle_get_weather(self, params):
         """
         Handler for GET /weather.
-        Fetches weather data and returns the HTML dashboard.
-        Also logs the access.
+        Fetches weather data and streams the rendered HTML dashboard in chunks.
+        The route is cached, so this only runs when the dashboard is re-rendered
+        after new data was posted. Accesses are recorded in the server's access log.
+        The dashboard shows DASHBOARD_ROWS readings per page, newest first
+        (/weather?page=2 for the next ones).
+
+        With `from`, `to`, `limit` or `resolution` query parameters (times in
+        any format parse_time() accepts), the matching readings are streamed as
+        a JSON array instead, oldest first, e.g.
+        /weather?from=2024-04-27T14:00&to=2024-04-27T16:00. `resolution` is
+        "raw" (default), "5min", "hour" or "day"; rollups give the min, max and
+        mean temperature of each period.
+
+        Both show station 0 unless `station` selects another one
+        (/weather?station=2).
+
+        :param params: Query string parameters.
         """
-        # Log the GET /weather access
-        self.handle_logs("GET /weather accessed.")
         try:
-            filename = "weather.json"
-            data = self.read_from_file(filename)
-        except Exception as e:
-            data = {"weather": []}
-        # Validate data and get weather entries
-        weather_entries = data.get("weather") if isinstance(data, dict) else None
-        if not isinstance(weather_entries, list):
-            weather_entries = (
-                []
-            )  # Default to empty list if data is malformed or missing
-
-        # Generate HTML table rows
-        table_rows = ""
-        for entry in reversed(weather_entries):  # Safely reverse and iterate
-            temperature = entry.get("temperature", "N/A")
-            time_entry = entry.get("time", "N/A")
-            table_rows += f"""
-                <tr>
-                    <td>{temperature}°F</td>
-                    <td>{time_entry}</td>
-                </tr>
-            """
+            station = self.get_station(params.get("station", 0))
+        except ValueError:
+            return "<h1>404 Not Found</h1><p>Unknown station.</p>", "404 Not Found\r\n"
 
-        # Enhanced HTML with styling
-        weather_html = f"""
-        <!DOCTYPE html>
-        <html lang="en">
-        <head>
-            <meta charset="UTF-8">
-            <title>Weather Dashboard</title>
-            <style>
-                body {{
-                    font-family: Arial, sans-serif;
-                    background-color: #f0f8ff;
-                    margin: 0;
-                    padding: 20px;
-                }}
-                h1 {{
-                    text-align: center;
-                    color: #333;
-                }}
-                table {{
-                    width: 100%;
-                    border-collapse: collapse;
-                    margin: 20px 0;
-                }}
-                th, td {{
-                    padding: 12px;
-                    border: 1px solid #ddd;
-                    text-align: center;
-                }}
-                th {{
-                    background-color: #4CAF50;
-                    color: white;
-                }}
-                tr:nth-child(even) {{
-                    background-color: #f2f2f2;
-                }}
-                .form-container {{
-                    background-color: #fff;
-                    padding: 20px;
-                    border-radius: 5px;
-                    box-shadow: 0 0 10px rgba(0,0,0,0.1);
-                    max-width: 500px;
-                    margin: 0 auto;
-                }}
-                .form-container input[type="number"],
-                .form-container input[type="text"] {{
-                    width: 100%;
-                    padding: 10px;
-                    margin: 5px 0 15px 0;
-                    border: 1px solid #ccc;
-                    border-radius: 4px;
-                }}
-                .form-container input[type="submit"] {{
-                    background-color: #4CAF50;
-                    color: white;
-                    padding: 10px 20px;
-                    border: none;
-                    border-radius: 4px;
-                    cursor: pointer;
-                }}
-                .form-container input[type="submit"]:hover {{
-                    background-color: #45a049;
-                }}
-                .message {{
-                    display: inline-block;
-                    padding: 20px;
-                    background-color: #d4edda;
-                    color: #155724;
-                    border: 1px solid #c3e6cb;
-                    border-radius: 5px;
-                    margin-top: 20px;
-                }}
-            </style>
-        </head>
-        <body>
-            <h1>Weather Dashboard</h1>
-            <table>
-                <tr>
-                    <th>Temperature</th>
-                    <th>Time</th>
-                </tr>
-                {table_rows if table_rows else "<tr><td colspan='2'>No data available.</td></tr>"}
-            </table>
+        if (
+            "from" in params
+            or "to" in params
+            or "limit" in params
+            or "resolution" in params
+        ):
+            resolution = params.get("resolution", "raw")
+            series = station.series(resolution)
+            try:
+                if series is None:
+                    raise ValueError(f"Unknown resolution '{resolution}'")
+                start = parse_time(params["from"]) if "from" in params else None
+                end = parse_time(params["to"]) if "to" in params else None
+                limit = int(params["limit"]) if "limit" in params else None
+            except ValueError:
+                return (
+                    "<h1>400 Bad Request</h1><p>Invalid from, to, limit or resolution.</p>",
+                    "400 Bad Request\r\n",
+                )
+            return (
+                readings_json(series.select(start, end, limit)),
+                "200 OK\r\n",
+                {"Content-Type": "application/json"},
+            )
 
-            <div class="form-container">
-                <h2>Add New Weather Data</h2>
-                <form action="/weather" method="POST">
-                    <label for="temperature">Temperature (°F):</label>
-                    <input type="number" id="temperature" name="temperature" required>
+        try:
+            page = max(1, int(params.get("page", 1)))
+        except ValueError:
+            return "<h1>400 Bad Request</h1><p>Invalid page.</p>", "400 Bad Request\r\n"
+        pages = max(1, (len(station.store) + DASHBOARD_ROWS - 1) // DASHBOARD_ROWS)
+        page = min(page, pages)
+        query = ""
+        chart = "/weather/chart.svg"
+        export = "/weather/export.csv"
+        if station.id:
+            query = f"station={station.id}&"
+            chart += f"?station={station.id}"
+            export += f"?station={station.id}"
 
-                    <label for="time">Time:</label>
-                    <input type="text" id="time" name="time" placeholder="e.g., 2024-04-27 14:00" required>
+        # Stream one page of entries, read from the ring file while the page is sent
+        return WEATHER_TEMPLATE.render(
+            {
+                "weather": station.store.newest(
+                    DASHBOARD_ROWS, (page - 1) * DASHBOARD_ROWS
+                ),
+                "station": station.id,
+                # Links to the other stations, when there are any
+                "stations": (
+                    [
+                        {"station": other, "url": f"/weather?station={other}"}
+                        for other in sorted(self.stations)
+                    ]
+                    if len(self.stations) > 1
+                    else None
+                ),
+                "chart": chart,
+                "export": export,
+                "page": page,
+                "pages": pages,
+                "newer": f"/weather?{query}page={page - 1}" if page > 1 else None,
+                "older": f"/weather?{query}page={page + 1}" if page < pages else None,
+                # Only the first page shows readings as they are posted
+                "live": page == 1,
+            }
+        )
 
-                    <input type="submit" value="Submit">
-                </form>
-            </div>
-        </body>
-        </html>
+    def handle_get_chart(self, params):
+        """
+        Handler for GET /weather/chart.svg.
+        Streams a line chart of the temperature as an SVG image. The route is
+        cached like the dashboard, so the chart is only redrawn after new data
+        was posted.
+
+        The window defaults to the last day of readings and can be set with
+        `from` and `to` (any format parse_time() accepts). `resolution` is
+        "raw", "5min", "hour" or "day"; by default the coarsest series that
+        still has a value for every pixel is used, so at most a few readings
+        are read per pixel. `width` and `height` set the image size in pixels,
+        and `station` selects a station other than 0.
+
+        :param params: Query string parameters.
+        """
+        try:
+            station = self.get_station(params.get("station", 0))
+        except ValueError:
+            return "<h1>404 Not Found</h1><p>Unknown station.</p>", "404 Not Found\r\n"
+        try:
+            width = min(max(int(params.get("width", CHART_WIDTH)), 100), 1200)
+            height = min(max(int(params.get("height", CHART_HEIGHT)), 60), 800)
+            if "to" in params:
+                end = parse_time(params["to"])
+            else:
+                # Without readings, show an empty chart of the last day (or of
+                # 1970-01-01 while the server's clock is unset)
+                end = station.store.last_timestamp or server_time() or CHART_WINDOW
+            if "from" in params:
+                start = parse_time(params["from"])
+            else:
+                start = max(0, end - CHART_WINDOW)
+            if start >= end:
+                raise ValueError("Empty chart window")
+            resolution = params.get("resolution")
+            if resolution is None:
+                series = station.store
+                for name, period, periods in ROLLUPS:
+                    if period * (width - CHART_MARGIN) <= end - start:
+                        series = station.rollups[name]
+            else:
+                series = station.series(resolution)
+                if series is None:
+                    raise ValueError(f"Unknown resolution '{resolution}'")
+        except ValueError:
+            return (
+                "<h1>400 Bad Request</h1><p>Invalid from, to, resolution, width or height.</p>",
+                "400 Bad Request\r\n",
+            )
+        return (
+            chart_svg(series.select(start, end), start, end, width, height),
+            "200 OK\r\n",
+            {"Content-Type": "image/svg+xml"},
+        )
+
+    def export_range(self, params):
+        """
+        Return the records an export asks for.
+
+        :param params: Query string parameters: `station`, `resolution` ("raw",
+                       "5min", "hour" or "day"), `from` and `to` (inclusive)
+                       and `since` (exclusive, e.g. the newest timestamp of the
+                       previous export).
+        :return: Tuple of (records, columns). Rollup exports only include
+                 periods that are complete.
+        :raises ValueError: If a parameter is invalid or the station is unknown.
+        """
+        station = self.get_station(params.get("station", 0))
+        resolution = params.get("resolution", "raw")
+        series = station.series(resolution)
+        if series is None:
+            raise ValueError(f"Unknown resolution '{resolution}'")
+        start = parse_time(params["from"]) if "from" in params else None
+        if "since" in params:
+            since = parse_time(params["since"]) + 1
+            start = since if start is None else max(start, since)
+        end = parse_time(params["to"]) if "to" in params else None
+        # RingFile.select() skips the open period of a rollup, which would be
+        # exported again once complete
+        return RingFile.select(series, start, end), series.columns
+
+    def handle_export_csv(self, params):
+        """
+        Handler for GET /weather/export.csv.
+        Streams the stored readings as CSV, oldest first, straight from the
+        ring file in batches of READ_BATCH records, so memory use does not
+        depend on the history length. See export_range() for the parameters,
+        e.g. /weather/export.csv?since=1714220000 for the readings after the
+        previous export.
+
+        :param params: Query string parameters.
+        """
+        try:
+            records, columns = self.export_range(params)
+        except ValueError:
+            return (
+                "<h1>400 Bad Request</h1><p>Invalid station, resolution, from, to or since.</p>",
+                "400 Bad Request\r\n",
+            )
+        return (
+            readings_csv(records, columns),
+            "200 OK\r\n",
+            {
+                "Content-Type": "text/csv",
+                "Content-Disposition": 'attachment; filename="weather.csv"',
+            },
+        )
+
+    def handle_export_ndjson(self, params):
+        """
+        Handler for GET /weather/export.ndjson.
+        Streams the stored readings as newline-delimited JSON, like
+        handle_export_csv().
+
+        :param params: Query string parameters.
+        """
+        try:
+            records, columns = self.export_range(params)
+        except ValueError:
+            return (
+                "<h1>400 Bad Request</h1><p>Invalid station, resolution, from, to or since.</p>",
+                "400 Bad Request\r\n",
+            )
+        return (
+            readings_ndjson(records),
+            "200 OK\r\n",
+            {"Content-Type": "application/x-ndjson"},
+        )
+
+    def handle_delete_weather(self, params):
+        """
+        Handler for DELETE /weather?after=...&station=...
+        Drops the readings of a station newer than `after` (any time
+        parse_time() accepts), e.g. readings posted with a wrong clock, which
+        would otherwise make the station reject every later reading.
+        """
+        try:
+            station = self.get_station(params.get("station", 0))
+        except ValueError:
+            return "<h1>404 Not Found</h1><p>Unknown station.</p>", "404 Not Found\r\n"
+        try:
+            after = parse_time(params["after"])
+        except (KeyError, ValueError):
+            return (
+                "<h1>400 Bad Request</h1><p>Missing or invalid after.</p>",
+                "400 Bad Request\r\n",
+            )
+        try:
+            dropped = station.truncate(after)
+        except OSError as e:
+            print(f"Failed to drop readings: {e}")
+            return (
+                "<h1>500 Internal Server Error</h1><p>Failed to drop readings.</p>",
+                "500 Internal Server Error\r\n",
+            )
+        if dropped:
+            self.server.invalidate("weather")
+        self.handle_logs(
+            f"DELETE /weather: dropped {dropped} readings of station {station.id}"
+        )
+        return {"station": station.id, "dropped": dropped}
+
+    def handle_get_stations(self):
+        """
+        Handler for GET /stations.
+        Lists every station with its reading count and newest reading time,
+        from the stations' state in RAM.
+        """
+        return [
+            self.stations[station_id].summary() for station_id in sorted(self.stations)
+        ]
+
+    def handle_get_storage(self):
+        """
+        Handler for GET /storage.
+        Reports the writes and bytes written since boot to the ring files, the
+        log segments and the station index, to follow flash/SD wear.
+        """
+        ring_writes = ring_bytes = 0
+        for station in self.stations.values():
+            for ring in station.ring_files():
+                ring_writes += ring.write_count
+                ring_bytes += ring.bytes_written
+        file_writes = self.write_count + self.logs.write_count
+        file_bytes = self.bytes_written + self.logs.bytes_written
+        return {
+            "ring_writes": ring_writes,
+            "ring_bytes_written": ring_bytes,
+            "file_writes": file_writes,
+            "file_bytes_written": file_bytes,
+        }
+
+    def handle_post_batch(self, request):
+        """
+        Handler for POST /weather/batch.
+        Stores a JSON array or NDJSON stream of readings (objects with
+        "temperature", "time" and optionally "station"). The body is parsed
+        object by object through a fixed buffer as it arrives, and each
+        reading is stored as soon as it is parsed.
+
+        The batch is not atomic. A station's ring files are opened once for
+        each run of its readings and their headers are written when the run
+        ends, or earlier when a full ring releases its oldest records. A
+        failure or power loss therefore leaves every ring file consistent,
+        holding a prefix of the station's readings in the batch; the store
+        and the rollups of the interrupted station may hold different ones.
+
+        :param request: The Request, with its body still unread.
+        :return: Dictionary with the accepted and rejected counts, with a 500
+                 status if storing failed partway through the batch.
+        """
+        buffer = bytearray(BATCH_BUFFER_SIZE)
+        view = memoryview(buffer)
+        accepted = rejected = 0
+        end = 0  # Bytes in the buffer
+        current = None  # Station whose ring files are open
+        stations = []  # Stations that received readings
+        error = None
+        try:
+            while True:
+                count = request.stream.readinto(view[end:])
+                end += count
+                # Store every complete {...} object; "[", "," and newlines are skipped
+                position = 0
+                while True:
+                    start = find_bytes(buffer, b"{", position, end)
+                    if start == -1:
+                        position = end
+                        break
+                    stop = find_bytes(buffer, b"}", start, end)
+                    if stop == -1:
+                        position = start
+                        break
+                    try:
+                        station_id, timestamp, temperature = self.parse_json_reading(
+                            bytes(buffer[start : stop + 1])
+                        )
+                        check_clock(timestamp)
+                        station = self.get_station(station_id, create=True)
+                        if station is not current:
+                            # Commit the previous station before switching
+                            if current is not None:
+                                current.commit()
+                                current = None
+                            station.begin()
+                            current = station
+                            if station not in stations:
+                                stations.append(station)
+                        station.add(timestamp, temperature)
+                        accepted += 1
+                    except (ValueError, OverflowError, TypeError):
+                        rejected += 1
+                    position = stop + 1
+                if position == 0 and end == len(buffer):
+                    # An object larger than the buffer cannot be a reading
+                    rejected += 1
+                    position = end
+                # Keep an incomplete object for the next read
+                buffer[: end - position] = buffer[position:end]
+                end -= position
+                if not count:
+                    break
+        except OSError as e:
+            # Readings committed before the error are kept
+            print(f"Failed to store batch: {e}")
+            error = e
+        finally:
+            try:
+                if current is not None:
+                    current.commit()
+            finally:
+                if accepted:
+                    # The cached dashboard is now stale, even after a partial batch
+                    self.server.invalidate("weather")
+                    for station in stations:
+                        if len(station.store):
+                            newest = next(station.store.newest(1))
+                            self.server.publish("/events", newest, event="reading")
+        if error is not None:
+            return (
+                {"accepted": accepted, "rejected": rejected, "error": str(error)},
+                "500 Internal Server Error\r\n",
+            )
+        return {"accepted": accepted, "rejected": rejected}
+
+    def parse_json_reading(self, text):
         """
-        return weather_html
+        Parse one reading of a batch.
 
-    def handle_post_weather(self, data, max_values: int = 360):
+        :param text: JSON object with "temperature", "time" and optionally "station".
+        :return: Tuple of (station ID, timestamp, temperature).
+        :raises ValueError: If the reading is malformed or a value is invalid.
+        """
+        try:
+            reading = json.loads(text.decode("utf-8"))
+            return (
+                parse_station(reading.get("station", 0)),
+                parse_time(reading["time"]),
+                parse_temperature(reading["temperature"]),
+            )
+        except (AttributeError, KeyError, TypeError, OverflowError) as e:
+            raise ValueError(f"Invalid reading: {e}")
+
+    def handle_post_weather(self, data):
         """
         Handler for POST /weather.
-        Receives weather data and stores it.
+        Receives weather data and appends it to the ring file in O(1).
         Also logs the POST action.
 
         :param data: Parsed POST data (dict for JSON, dict for URL-encoded).
-        :param max_values: Maximum number of weather entries to store.
-        :return: HTML response string.
+        :return: HTML response, with a 400 status for invalid readings.
         """
-        filename = "weather.json"
-
         # Log the POST /weather action
         log_message = f"POST /weather: {data}"
         self.handle_logs(log_message)
@@ -249,6 +1938,7 @@ class WeatherServer:
                 # Data is parsed JSON
                 temperature = data.get("temperature")
                 time_entry = data.get("time")
+                station = data.get("station", 0)
             elif isinstance(data, str):
                 # Data is URL-encoded string; parse it into a dictionary
                 parsed_data = {}
@@ -258,95 +1948,104 @@ class WeatherServer:
                         parsed_data[key] = value.replace("+", " ")
                 temperature = parsed_data.get("temperature")
                 time_entry = parsed_data.get("time")
+                station = parsed_data.get("station", 0)
             else:
                 # Unsupported data type
                 print(f"Unsupported data type: {type(data)}")
-                return "<h1>400 Bad Request</h1><p>Unsupported data format.</p>"
+                return (
+                    "<h1>400 Bad Request</h1><p>Unsupported data format.</p>",
+                    "400 Bad Request\r\n",
+                )
 
             # Validate received data
             if temperature is None or time_entry is None:
                 print("Invalid POST data: Missing temperature or time.")
-                return "<h1>400 Bad Request</h1><p>Missing temperature or time.</p>"
+                return (
+                    "<h1>400 Bad Request</h1><p>Missing temperature or time.</p>",
+                    "400 Bad Request\r\n",
+                )
 
-            # Convert temperature to float
+            # Convert temperature to a finite float
             try:
-                temperature = float(temperature)
+                temperature = parse_temperature(temperature)
             except ValueError:
                 print("Invalid temperature value.")
-                return "<h1>400 Bad Request</h1><p>Invalid temperature value.</p>"
-
-            # Read existing data
-            existing_data = self.read_from_file(filename)
-            if not isinstance(existing_data, dict):
-                print(f"Malformed data structure in '{filename}'. Resetting data.")
-                existing_data = {"weather": []}
-
-            weather_array = existing_data.get("weather", [])
-            if not isinstance(weather_array, list):
-                print(
-                    f"Malformed weather data in '{filename}'. Resetting weather list."
+                return (
+                    "<h1>400 Bad Request</h1><p>Invalid temperature value.</p>",
+                    "400 Bad Request\r\n",
                 )
-                weather_array = []
 
-            # Append new entry with consistent data types
+            # Store the reading; the oldest one is overwritten when the ring is full
+            try:
+                timestamp = parse_time(time_entry)
+                station = parse_station(station)
+                self.add_reading(timestamp, temperature, station)
+            except (ValueError, OverflowError, TypeError) as e:
+                print(f"Invalid POST data: {e}")
+                return (
+                    "<h1>400 Bad Request</h1><p>Invalid station, or invalid, future or out-of-order time or temperature.</p>",
+                    "400 Bad Request\r\n",
+                )
+            except OSError as e:
+                print(f"Failed to store reading: {e}")
+                return (
+                    "<h1>500 Internal Server Error</h1><p>Failed to write data.</p>",
+                    "500 Internal Server Error\r\n",
+                )
             new_entry = {
-                "temperature": temperature,  # Stored as float
-                "time": str(time_entry),  # Stored as string
+                "temperature": temperature,
+                "time": format_time(timestamp),
+                "timestamp": timestamp,
+                "station": station,
             }
-            weather_array.append(new_entry)
-
-            # Ensure only the most recent `max_values` entries are kept
-            if len(weather_array) > max_values:
-                # Remove the oldest entries
-                weather_array = weather_array[-max_values:]
-
-            # Update the existing data
-            existing_data["weather"] = weather_array
-
-            # Write back to file
-            if self.write_to_file(existing_data, filename):
-
-                # Return success HTML with redirect
-                success_html = """
-                    <!DOCTYPE html>
-                    <html lang="en">
-                    <head>
-                        <meta http-equiv="refresh" content="2;url=/weather">
-                        <title>Success</title>
-                        <style>
-                            body {{
-                                font-family: Arial, sans-serif;
-                                background-color: #f0f8ff;
-                                text-align: center;
-                                padding-top: 50px;
-                            }}
-                            .message {{
-                                display: inline-block;
-                                padding: 20px;
-                                background-color: #d4edda;
-                                color: #155724;
-                                border: 1px solid #c3e6cb;
-                                border-radius: 5px;
-                            }}
-                        </style>
-                    </head>
-                    <body>
-                        <div class="message">
-                            <h2>Weather data submitted successfully!</h2>
-                            <p>Redirecting to the dashboard...</p>
-                        </div>
-                    </body>
-                    </html>
-                """
-                return success_html
-
-            return "<h1>500 Internal Server Error</h1><p>Failed to write data.</p>"
+
+            # The cached dashboard is now stale
+            self.server.invalidate("weather")
+            # Push the new reading to open dashboards
+            self.server.publish("/events", new_entry, event="reading")
+
+            # Return success HTML with redirect
+            success_html = """
+                <!DOCTYPE html>
+                <html lang="en">
+                <head>
+                    <meta http-equiv="refresh" content="2;url=/weather">
+                    <title>Success</title>
+                    <style>
+                        body {{
+                            font-family: Arial, sans-serif;
+                            background-color: #f0f8ff;
+                            text-align: center;
+                            padding-top: 50px;
+                        }}
+                        .message {{
+                            display: inline-block;
+                            padding: 20px;
+                            background-color: #d4edda;
+                            color: #155724;
+                            border: 1px solid #c3e6cb;
+                            border-radius: 5px;
+                        }}
+                    </style>
+                </head>
+                <body>
+                    <div class="message">
+                        <h2>Weather data submitted successfully!</h2>
+                        <p>Redirecting to the dashboard...</p>
+                    </div>
+                </body>
+                </html>
+            """
+            return success_html
 
         except Exception as e:
             print(f"Error handling POST data: {e}")
             # Log the error
             self.handle_logs(f"Error handling POST /weather: {e}")
-            return f"<h1>500 Internal Server Error</h1><p>{e}</p>"
+            return (
+                "<h1>500 Internal Server Error</h1><p>Failed to handle the reading.</p>",
+                "500 Internal Server Error\r\n",
+            )
 
     def redirect_to_weather(self):
         """
@@ -376,176 +2075,99 @@ class WeatherServer:
         If `last_log_message` is provided, it adds it to the logs.
         Accessing /logs does not add a log entry.
 
+        Messages are appended to a rotating segmented log (see SegmentLog), so
+        adding one costs O(1) and the page reads only the newest LOG_LINES
+        lines, newest first.
+
         :param last_log_message: Optional log message to add.
         :return: HTML string displaying the logs.
         """
-        filename = "logs.txt"
-        content = ""
-
-        # Add new log message if provided, limiting to the last 100 entries
         if last_log_message:
-            try:
-                # Read existing logs
-                try:
-                    if not self.sd:
-                        with open(filename, "r") as f:
-                            existing_logs = f.read().splitlines()
-                    else:
-                        existing_logs = self.sd.read(filename).splitlines()
-                except OSError as e:
-                    if (
-                        len(e.args) > 0 and e.args[0] == 2
-                    ):  # ENOENT: No such file or directory
-                        existing_logs = []
-                    else:
-                        print(e)
-                        existing_logs = []
-
-                # append the new message and limit to 100 entries
-                logs = [last_log_message] + existing_logs
-                # keep only the last 100 entries
-                logs = logs[:100]
-
-                # Write back to file
-                if not self.sd:
-                    with open(filename, "w") as f:
-                        f.write("\n".join(logs))
-                else:
-                    self.sd.write(filename, "\n".join(logs))
-
-                content = "\n".join(logs)
-            except Exception as e:
-                print(f"Error updating logs: {e}")
-                content = ""
-
-        else:
-            # Read existing logs from file
-            try:
-                if not self.sd:
-                    with open(filename, "r") as f:
-                        content = f.read()
-                else:
-                    content = self.sd.read(filename)
-            except OSError as e:
-                # File does not exist; create it
-                if len(e.args) > 0 and e.args[0] == 2:  # ENOENT
-                    if not self.sd:
-                        with open(filename, "w") as f:
-                            f.write("")
-                    else:
-                        self.sd.write(filename, "")
-                    content = ""
-                else:
-                    print(e)
-                    return """
-                    <!DOCTYPE html>
-                    <html lang="en">
-                    <head>
-                        <title>Logs</title>
-                    </head>
-                    <body>
-                        <h1>Logs</h1>
-                        <p>Error reading logs.</p>
-                    </body>
-                    </html>
-                    """
-            except Exception as e:
-                print(e)
-                return """
-                <!DOCTYPE html>
-                <html lang="en">
-                <head>
-                    <title>Logs</title>
-                </head>
-                <body>
-                    <h1>Logs</h1>
-                    <p>No logs available.</p>
-                </body>
-                </html>
-                """
+            self.logs.write(last_log_message)
 
-        # Create log entries as table rows
-        log_entries = "\n".join(
-            f"<tr><td>{entry}</td></tr>" for entry in content.splitlines()
-        )
+        # Render the log entries as table rows, read while the page is sent
+        return LOGS_TEMPLATE.render({"logs": self.logs.newest(LOG_LINES)})
 
-        # Generate the HTML, injecting the pre-built table rows
-        return f"""
-        <!DOCTYPE html>
-        <html lang="en">
-        <head>
-            <meta charset="UTF-8">
-            <meta name="viewport" content="width=device-width, initial-scale=1.0">
-            <title>Logs</title>
-            <style>
-                body {{
-                    font-family: Arial, sans-serif;
-                    background-color: #f4f6f9;
-                    color: #333;
-                    padding: 20px;
-                    margin: 0;
-                }}
-                h1 {{
-                    text-align: center;
-                    color: #444;
-                }}
-                .log-table {{
-                    width: 100%;
-                    max-width: 100%;
-                    border-collapse: collapse;
-                    margin: 20px 0;
-                    background-color: #fff;
-                    box-shadow: 0 0 10px rgba(0, 0, 0, 0.1);
-                }}
-                .log-table th, .log-table td {{
-                    padding: 12px;
-                    border: 1px solid #ddd;
-                    text-align: left;
-                    white-space: pre-wrap;
-                    word-wrap: break-word;
-                }}
-                .log-table th {{
-                    background-color: #007bff;
-                    color: white;
-                }}
-                .log-table tr:nth-child(even) {{
-                    background-color: #f2f2f2;
-                }}
-            </style>
-        </head>
-        <body>
-            <h1>Logs</h1>
-            <table class="log-table">
-                <tr>
-                    <th>Log Entry</th>
-                </tr>
-                {log_entries if log_entries else "<tr><td>No logs available.</td></tr>"}
-            </table>
-        </body>
-        </html>
+    def run(self, dual_core=False):
         """
+        Start the server and serve requests until stopped.
 
-    def run(self):
+        :param dual_core: Handle network I/O and SD card access on separate cores.
+                          The streamed pages and exports are still read from the
+                          ring files on the handler core (see EasyServer.run_dual_core()).
+        """
         # Start the server
         if not self.server.start(port=80):
             print("Failed to start the server. Exiting.")
             self.server.close()
 
-        # Register GET route for /weather
-        self.server.add_route("/weather", self.handle_get_weather, method="GET")
+        # Register GET route for /weather, cached until new data is posted
+        self.server.add_route(
+            "/weather",
+            self.handle_get_weather,
+            method="GET",
+            cache="weather",
+            query=True,
+        )
+
+        # Register GET route for the temperature chart, cached like the dashboard
+        self.server.add_route(
+            "/weather/chart.svg",
+            self.handle_get_chart,
+            method="GET",
+            cache="weather",
+            query=True,
+        )
+
+        # Register GET routes for exports, streamed from the ring files
+        self.server.add_route(
+            "/weather/export.csv", self.handle_export_csv, method="GET", query=True
+        )
+        self.server.add_route(
+            "/weather/export.ndjson",
+            self.handle_export_ndjson,
+            method="GET",
+            query=True,
+        )
+
+        # Register GET route for the station directory
+        self.server.add_route("/stations", self.handle_get_stations, method="GET")
+
+        # Register GET route for the write counters
+        self.server.add_route("/storage", self.handle_get_storage, method="GET")
 
         # Register POST route for /weather
         self.server.add_route("/weather", self.handle_post_weather, method="POST")
 
+        # Register DELETE route for readings posted with a wrong clock
+        self.server.add_route(
+            "/weather", self.handle_delete_weather, method="DELETE", query=True
+        )
+
+        # Register POST route for batches of readings, parsed while they arrive
+        self.server.add_route(
+            "/weather/batch",
+            self.handle_post_batch,
+            method="POST",
+            stream=True,
+            max_size=1048576,
+        )
+
         # Register root ("/") route to redirect to /weather
         self.server.add_route("/", self.redirect_to_weather, method="GET")
 
         # Register GET route for /logs without logging the access
         self.server.add_route("/logs", self.handle_logs, method="GET")
 
+        # Live updates for open dashboards
+        self.server.add_event_stream("/events")
+
         # Run the server
         try:
-            self.server.run()
+            if dual_core:
+                self.server.run_dual_core()
+            else:
+                self.server.run()
         except KeyboardInterrupt:
             print("KeyboardInterrupt")
         except OSError as e:
@@ -553,6 +2175,7 @@ class WeatherServer:
         except Exception as e:
             print(e)
         finally:
+            self.logs.flush()
             self.server.close()
             if self.server.led:
                 self.server.led.off()